@@ -0,0 +1,80 @@
+"""
+Compare generic marshmallow dumping with compiled schemas.
+
+Usage:
+
+    python benchmarks/bench_dumpers.py [--items 1000] [--repeat 5]
+
+"""
+from argparse import ArgumentParser
+from timeit import repeat
+from uuid import uuid4
+
+from microcosm.api import create_object_graph
+from microcosm_flask.conventions.compiled import compile_schema
+from microcosm_flask.conventions.crud import configure_crud
+from microcosm_flask.conventions.encoding import dump_response_data
+from microcosm_flask.namespaces import Namespace
+from microcosm_flask.operations import Operation
+from microcosm_flask.paging import Page, PageSchema, PaginatedList, make_paginated_list_schema
+from microcosm_flask.tests.conventions.fixtures import (
+    person_retrieve,
+    person_search,
+    Person,
+    PersonSchema,
+)
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=10)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    graph = create_object_graph(name="example", testing=True)
+    ns = Namespace(subject=Person)
+    configure_crud(graph, ns, {
+        Operation.Retrieve: (person_retrieve, PersonSchema()),
+        Operation.Search: (person_search, PageSchema(), PersonSchema()),
+    })
+
+    people = [
+        Person(uuid4(), "First{}".format(index), "Last{}".format(index))
+        for index in range(args.items)
+    ]
+    paginated_list = PaginatedList(ns, Page(0, args.items), people, args.items)
+
+    # link generation dominates with per-item links; measure without them as well
+    for label, item_schema in [
+        ("with links", PersonSchema()),
+        ("without links", PersonSchema(exclude=("_links",))),
+    ]:
+        schema = make_paginated_list_schema(ns, item_schema)()
+        compiled = compile_schema(schema)
+
+        with graph.flask.test_request_context():
+            generic_body = dump_response_data(schema, paginated_list).get_data()
+            compiled_body = dump_response_data(compiled, paginated_list).get_data()
+            assert generic_body == compiled_body, "Compiled output differs from generic output"
+
+            for name, dumper in [("generic", schema), ("compiled", compiled)]:
+                timings = repeat(
+                    lambda: dump_response_data(dumper, paginated_list),
+                    repeat=args.repeat,
+                    number=args.number,
+                )
+                print("{:>14} {:>9}: {:.2f} ms per {} item page".format(  # noqa
+                    label,
+                    name,
+                    1000 * min(timings) / args.number,
+                    args.items,
+                ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare JSON codec throughput for typical request and response payloads.
+
+Uses the `PersonSchema` and `AddressSchema` test fixtures; backends that are not
+installed are skipped.
+
+Usage:
+
+    python benchmarks/bench_json_codecs.py [--items 1000] [--repeat 5]
+
+"""
+from argparse import ArgumentParser
+from timeit import repeat
+from uuid import uuid4
+
+from microcosm.api import create_object_graph
+from microcosm_flask.conventions.crud import configure_crud
+from microcosm_flask.json_codec import BACKENDS, make_json_codec
+from microcosm_flask.namespaces import Namespace
+from microcosm_flask.operations import Operation
+from microcosm_flask.tests.conventions.fixtures import (
+    Address,
+    AddressSchema,
+    address_retrieve,
+    person_retrieve,
+    Person,
+    PersonSchema,
+)
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=10)
+    return parser.parse_args()
+
+
+def make_payloads(graph, items):
+    person_schema = PersonSchema()
+    address_schema = AddressSchema()
+    people, addresses = [], []
+
+    with graph.flask.test_request_context():
+        for index in range(items):
+            person = Person(uuid4(), "First{}".format(index), "Last{}".format(index))
+            address = Address(uuid4(), person.id, "{} Acme St., San Francisco CA 94110".format(index))
+            people.append(person_schema.dump(person).data)
+            addresses.append(address_schema.dump(address).data)
+
+    return dict(
+        person=dict(offset=0, limit=items, count=items, items=people),
+        address=dict(offset=0, limit=items, count=items, items=addresses),
+    )
+
+
+def main():
+    args = parse_args()
+
+    graph = create_object_graph(name="example", testing=True)
+    person_ns = Namespace(subject=Person)
+    address_ns = Namespace(subject=Address, path=person_ns.instance_path)
+    configure_crud(graph, person_ns, {
+        Operation.Retrieve: (person_retrieve, PersonSchema()),
+    })
+    configure_crud(graph, address_ns, {
+        Operation.Retrieve: (address_retrieve, AddressSchema()),
+    })
+
+    payloads = make_payloads(graph, args.items)
+
+    with graph.flask.test_request_context():
+        for backend in sorted(BACKENDS.keys()):
+            codec = make_json_codec(backend)
+            if codec.name != backend:
+                print("{:>8}: not installed".format(backend))  # noqa
+                continue
+
+            for name, payload in sorted(payloads.items()):
+                encoded = codec.dumps(payload)
+                encode_timings = repeat(lambda: codec.dumps(payload), repeat=args.repeat, number=args.number)
+                decode_timings = repeat(lambda: codec.loads(encoded), repeat=args.repeat, number=args.number)
+                print("{:>8} {:>8}: encode {:.2f} ms, decode {:.2f} ms per {} item page".format(  # noqa
+                    backend,
+                    name,
+                    1000 * min(encode_timings) / args.number,
+                    1000 * min(decode_timings) / args.number,
+                    args.items,
+                ))
+
+
+if __name__ == "__main__":
+    main()
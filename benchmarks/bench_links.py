@@ -0,0 +1,80 @@
+"""
+Compare link building with precomputed URL templates against `url_for`.
+
+Builds the `_links.self` href for each item in a page of people.
+
+Usage:
+
+    python benchmarks/bench_links.py [--items 1000] [--repeat 5]
+
+"""
+from argparse import ArgumentParser
+from timeit import repeat
+from uuid import uuid4
+
+from microcosm.api import create_object_graph
+from microcosm_flask.conventions.crud import configure_crud
+from microcosm_flask.linking import Link
+from microcosm_flask.namespaces import Namespace
+from microcosm_flask.operations import Operation
+from microcosm_flask.tests.conventions.fixtures import (
+    person_retrieve,
+    Person,
+    PersonSchema,
+)
+from microcosm_flask.url_templates import ROUTE_REGISTRY
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=10)
+    return parser.parse_args()
+
+
+def build_links(ns, people):
+    return [
+        Link.for_(Operation.Retrieve, ns, person_id=person.id).href
+        for person in people
+    ]
+
+
+def main():
+    args = parse_args()
+
+    graph = create_object_graph(name="example", testing=True)
+    ns = Namespace(subject=Person)
+    configure_crud(graph, ns, {
+        Operation.Retrieve: (person_retrieve, PersonSchema()),
+    })
+
+    people = [
+        Person(uuid4(), "First{}".format(index), "Last{}".format(index))
+        for index in range(args.items)
+    ]
+
+    route_registry = graph.flask.extensions[ROUTE_REGISTRY]
+
+    with graph.flask.test_request_context():
+        templated_links = build_links(ns, people)
+        templated_timings = repeat(lambda: build_links(ns, people), repeat=args.repeat, number=args.number)
+
+        # without the registry extension, links are built with `url_for`
+        del graph.flask.extensions[ROUTE_REGISTRY]
+        url_for_links = build_links(ns, people)
+        url_for_timings = repeat(lambda: build_links(ns, people), repeat=args.repeat, number=args.number)
+        graph.flask.extensions[ROUTE_REGISTRY] = route_registry
+
+    assert templated_links == url_for_links, "Templated links differ from url_for links"
+
+    for name, timings in [("url_for", url_for_timings), ("templates", templated_timings)]:
+        print("{:>9}: {:.2f} ms per {} item page".format(  # noqa
+            name,
+            1000 * min(timings) / args.number,
+            args.items,
+        ))
+
+
+if __name__ == "__main__":
+    main()
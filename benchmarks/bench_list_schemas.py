@@ -0,0 +1,108 @@
+"""
+Measure startup time with and without memoized paginated list schemas.
+
+Registers CRUD search and relation search endpoints for a number of subjects across
+several object graphs (as app factories and test suites do) and reports the time
+taken and the number of list schema classes created. As in most services, each subject's
+item schema instance is created once (e.g. at module level) and shared by its mappings.
+
+Usage:
+
+    python benchmarks/bench_list_schemas.py [--subjects 100] [--graphs 5]
+
+"""
+from argparse import ArgumentParser
+from time import time
+
+from marshmallow import fields, Schema
+from mock import patch
+
+from microcosm.api import create_object_graph
+from microcosm_flask.conventions.crud import configure_crud
+from microcosm_flask.conventions.relation import configure_relation
+from microcosm_flask.namespaces import Namespace
+from microcosm_flask.operations import Operation
+from microcosm_flask import paging
+from microcosm_flask.paging import PageSchema
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument("--subjects", type=int, default=100)
+    parser.add_argument("--graphs", type=int, default=5)
+    return parser.parse_args()
+
+
+def search(**kwargs):
+    return [], 0
+
+
+def search_for(**kwargs):
+    return [], 0, {}
+
+
+def make_item_schemas(count):
+    return [
+        type(
+            "Subject{}Schema".format(index),
+            (Schema,),
+            dict(
+                id=fields.UUID(),
+                name=fields.String(),
+                value=fields.Integer(),
+            ),
+        )()
+        for index in range(count)
+    ]
+
+
+def start(args, item_schemas):
+    """
+    Create graphs and register search endpoints for each subject.
+
+    """
+    for _ in range(args.graphs):
+        graph = create_object_graph(name="example", testing=True)
+        for index, item_schema in enumerate(item_schemas):
+            subject = "subject{}".format(index)
+            configure_crud(graph, Namespace(subject=subject), {
+                Operation.Search: (search, PageSchema(), item_schema),
+            })
+            configure_relation(graph, Namespace(subject="parent{}".format(index), object_=subject), {
+                Operation.SearchFor: (search_for, PageSchema(), item_schema),
+            })
+
+
+def measure(args, item_schemas, factory):
+    created = []
+
+    def counting_factory(ns, item_schema):
+        schema = factory(ns, item_schema)
+        created.append(schema)
+        return schema
+
+    with patch.object(paging, "make_paginated_list_schema", counting_factory):
+        start_time = time()
+        start(args, item_schemas)
+        elapsed = time() - start_time
+
+    return elapsed, len(set(created))
+
+
+def main():
+    args = parse_args()
+    item_schemas = make_item_schemas(args.subjects)
+
+    # warm up imports and shared state
+    start(args, item_schemas[:1])
+
+    uncached_time, uncached_count = measure(args, item_schemas, paging.make_paginated_list_schema.uncached)
+    cached_time, cached_count = measure(args, item_schemas, paging.make_paginated_list_schema)
+
+    print("{} subjects x {} graphs".format(args.subjects, args.graphs))  # noqa
+    print("uncached: {:.3f}s, {} list schema classes".format(uncached_time, uncached_count))  # noqa
+    print("memoized: {:.3f}s, {} list schema classes".format(cached_time, cached_count))  # noqa
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare sync file formats: pure Python YAML, libyaml (if available), and JSON lines.
+
+Usage:
+
+    python benchmarks/bench_sync_formats.py [--items 10000] [--repeat 3]
+
+"""
+from argparse import ArgumentParser
+from timeit import repeat
+from uuid import uuid4
+
+from six import StringIO
+from yaml import SafeDumper, SafeLoader
+
+from microcosm_flask.sync import formats
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def make_resources(items):
+    resources = []
+    for index in range(items):
+        href = "http://localhost/api/person/{}".format(uuid4())
+        resources.append((href, dict(
+            id=str(uuid4()),
+            firstName="First{}".format(index),
+            lastName="Last{}".format(index),
+            _links=dict(
+                self=dict(href=href),
+                addresses=[
+                    dict(href="{}/address/{}".format(href, address_index))
+                    for address_index in range(3)
+                ],
+            ),
+        )))
+    return resources
+
+
+def measure(resources, format_, number_of_runs):
+    def write():
+        destination = StringIO()
+        formats.dump(resources, destination, format_)
+        return destination.getvalue()
+
+    data = write()
+
+    def read():
+        return list(formats.load(StringIO(data), format_))
+
+    assert read() == resources, "Round trip differs for {}".format(format_)
+    return (
+        min(repeat(write, repeat=number_of_runs, number=1)),
+        min(repeat(read, repeat=number_of_runs, number=1)),
+    )
+
+
+def main():
+    args = parse_args()
+    resources = make_resources(args.items)
+
+    variants = [("yaml (python)", formats.YAML, SafeDumper, SafeLoader)]
+    if formats.SafeDumper is not SafeDumper:
+        variants.append(("yaml (libyaml)", formats.YAML, formats.SafeDumper, formats.SafeLoader))
+    else:
+        print("libyaml: not installed")  # noqa
+    variants.append(("jsonl", formats.JSONL, formats.SafeDumper, formats.SafeLoader))
+
+    for name, format_, dumper, loader in variants:
+        formats.SafeDumper, formats.SafeLoader = dumper, loader
+        write_time, read_time = measure(resources, format_, args.repeat)
+        print("{:>14}: write {:.2f} s, read {:.2f} s for {} resources".format(  # noqa
+            name,
+            write_time,
+            read_time,
+            args.items,
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,14 @@ Audit log support for Flask routes.
 from collections import namedtuple
 from functools import wraps
 from logging import getLogger
-from json import loads
+from random import random
+from threading import Lock, Thread
 from traceback import format_exc
 
-from flask import current_app, g, request
+from flask import current_app, g, has_app_context, request
+from six.moves.queue import Empty, Full, Queue
 from microcosm.api import defaults
+from microcosm_flask.json_codec import get_json_codec
 from microcosm_flask.errors import (
     extract_context,
     extract_error_message,
@@ -26,6 +29,10 @@ AuditOptions = namedtuple("AuditOptions", [
 
 SKIP_LOGGING = "_microcosm_flask_skip_audit_logging"
 
+AUDIT_SINK = "audit_sink"
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "sample")
+
 
 def skip_logging(func):
     """
@@ -78,17 +85,19 @@ def _audit_request(options, func, request_context, *args, **kwargs):  # noqa: C9
         method=request.method,
     )
 
+    codec = get_json_codec()
+
     # include request body on debug (if any)
     if all((
         current_app.debug,
         options.include_request_body,
-        request.get_json(force=True, silent=True),
+        codec.get_json(silent=True),
     )):
-        request_body = request.get_json(force=True)
+        request_body = codec.get_json()
     else:
         request_body = None
 
-    response_body = None
+    raw_response_body = None
 
     # include headers (conditionally)
     if request_context is not None:
@@ -117,41 +126,53 @@ def _audit_request(options, func, request_context, *args, **kwargs):  # noqa: C9
             status_code=status_code,
         )
 
-        # include response body on debug (if any)
+        # include response body on debug (if any); decoded when the record is formatted
         if all((
                 current_app.debug,
                 options.include_response_body,
                 body,
         )):
-            try:
-                response_body = loads(body)
-            except (TypeError, ValueError):
-                # not json
-                audit_dict["response_body"] = body
+            raw_response_body = body
 
         return response
     finally:
-        # determine whether to show/hide body based on the g values set during func
-        if not g.get("hide_body"):
-            if request_body:
-                for field in g.get("hide_request_fields", []):
-                    try:
-                        del request_body[field]
-                    except KeyError:
-                        pass
-                audit_dict["request_body"] = request_body
-
-            if response_body:
-                for field in g.get("hide_response_fields", []):
-                    try:
-                        del response_body[field]
-                    except KeyError:
-                        pass
-                audit_dict["response_body"] = response_body
-
-        # always log at INFO; a raised exception can be an error or expected behavior (e.g. 404)
         if not should_skip_logging(func):
-            logger.info(audit_dict)
+            # capture request state now; the sink may format the record on another thread
+            hide_body = g.get("hide_body")
+            hide_request_fields = g.get("hide_request_fields", [])
+            hide_response_fields = g.get("hide_response_fields", [])
+
+            def format_record():
+                response_body = None
+                if raw_response_body:
+                    try:
+                        response_body = codec.loads(raw_response_body)
+                    except (TypeError, ValueError):
+                        # not json
+                        audit_dict["response_body"] = raw_response_body
+
+                # determine whether to show/hide body based on the g values set during func
+                if not hide_body:
+                    if request_body:
+                        for field in hide_request_fields:
+                            try:
+                                del request_body[field]
+                            except KeyError:
+                                pass
+                        audit_dict["request_body"] = request_body
+
+                    if response_body:
+                        for field in hide_response_fields:
+                            try:
+                                del response_body[field]
+                            except KeyError:
+                                pass
+                        audit_dict["response_body"] = response_body
+
+                return audit_dict
+
+            # always log at INFO; a raised exception can be an error or expected behavior (e.g. 404)
+            get_audit_sink().emit(logger, format_record)
 
 
 def parse_response(response):
@@ -160,31 +181,199 @@ def parse_response(response):
 
     The returned value from a Flask view could be:
         * a tuple of (response, status) or (response, status, headers)
-        * a Response object
+        * a Response object (the body of streamed responses is not parsed)
         * a string
     """
     if isinstance(response, tuple) and len(response) > 1:
         return response[0], response[1]
     try:
+        if response.is_streamed:
+            # do not buffer streamed responses just to audit them
+            return None, response.status_code
         return response.data, response.status_code
     except AttributeError:
         return response, 200
 
 
+class AuditSink(object):
+    """
+    Writes audit records on the request thread.
+
+    """
+    def emit(self, logger, format_record):
+        """
+        Write an audit record.
+
+        :param logger: the audit logger
+        :param format_record: a function that returns the audit dictionary
+
+        """
+        logger.info(format_record())
+
+
+class ContextSnapshot(object):
+    """
+    A copy of the current application and its `g` values, taken on the request thread.
+
+    Entering the snapshot pushes an application context with the same `g` values, so that
+    records formatted (and logged) on another thread see the request's logging context.
+    Outside of an application context, the snapshot is empty and entering it does nothing.
+
+    """
+    def __init__(self):
+        self.app = current_app._get_current_object() if has_app_context() else None
+        self.values = dict(vars(g._get_current_object())) if has_app_context() else {}
+        self.context = None
+
+    def __enter__(self):
+        if self.app is not None:
+            self.context = self.app.app_context()
+            self.context.push()
+            vars(g._get_current_object()).update(self.values)
+        return self
+
+    def __exit__(self, *args):
+        if self.context is not None:
+            self.context.pop()
+            self.context = None
+
+
+class QueuedAuditSink(AuditSink):
+    """
+    Writes audit records from a background worker.
+
+    Records are pushed onto a bounded queue; when the queue is full, records are handled
+    according to an overflow policy:
+
+     -  "block" waits for space in the queue
+     -  "drop_oldest" discards the oldest queued record
+     -  "sample" discards the oldest queued record for a `sample_rate` fraction of new
+        records and discards the new record otherwise
+
+    """
+    def __init__(self, maxsize=1000, overflow="drop_oldest", sample_rate=0.1):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("Unsupported audit overflow policy: {}".format(overflow))
+
+        self.queue = Queue(maxsize=maxsize)
+        self.overflow = overflow
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self.emitted = 0
+        self.lock = Lock()
+        self.worker = None
+
+    def emit(self, logger, format_record):
+        self.start()
+        record = (logger, format_record, ContextSnapshot())
+
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+            return
+        except Full:
+            pass
+
+        if self.overflow == "sample" and random() >= self.sample_rate:
+            self.drop()
+            return
+
+        try:
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.drop()
+        except Empty:
+            pass
+
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            # lost a race with another request thread
+            self.drop()
+
+    def drop(self):
+        with self.lock:
+            self.dropped += 1
+
+    def start(self):
+        """
+        Start the worker on first use (e.g. after a pre-forking server forks workers).
+
+        """
+        if self.worker is not None:
+            return
+
+        with self.lock:
+            if self.worker is not None:
+                return
+            self.worker = Thread(target=self.run, name="audit-sink")
+            self.worker.daemon = True
+            self.worker.start()
+
+    def run(self):
+        while True:
+            logger, format_record, snapshot = self.queue.get()
+            try:
+                with snapshot:
+                    logger.info(format_record())
+                with self.lock:
+                    self.emitted += 1
+            except Exception:
+                getLogger("microcosm_flask.audit").exception("Unable to write audit record")
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """
+        Wait until all queued records are written.
+
+        """
+        if self.worker is not None:
+            self.queue.join()
+
+
+DEFAULT_AUDIT_SINK = AuditSink()
+
+
+def get_audit_sink():
+    """
+    Get the audit sink for the current application.
+
+    """
+    return current_app.extensions.get(AUDIT_SINK) or DEFAULT_AUDIT_SINK
+
+
 @defaults(
+    enable_queue=False,
     include_request_body=True,
     include_response_body=True,
+    overflow="drop_oldest",
+    queue_size=1000,
+    sample_rate=0.1,
 )
 def configure_audit_decorator(graph):
     """
     Configure the audit decorator.
 
+    Audit records are written on the request thread unless `audit.enable_queue` is set,
+    in which case they are written by a `QueuedAuditSink`.
+
     Example Usage:
 
         @graph.audit
         def login(username, password):
             ...
     """
+    if graph.config.audit.enable_queue:
+        graph.flask.extensions[AUDIT_SINK] = QueuedAuditSink(
+            maxsize=int(graph.config.audit.queue_size),
+            overflow=graph.config.audit.overflow,
+            sample_rate=float(graph.config.audit.sample_rate),
+        )
+
     include_request_body = graph.config.audit.include_request_body
     include_response_body = graph.config.audit.include_response_body
 
@@ -0,0 +1,55 @@
+"""
+In-process caching helpers.
+
+"""
+from collections import OrderedDict
+from threading import Lock
+from time import time
+
+
+class LRUCache(object):
+    """
+    A thread-safe, bounded mapping that evicts the least recently used key.
+
+    If `ttl` (seconds) is set, keys also expire that long after they were set.
+
+    """
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.items = OrderedDict()
+        self.lock = Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value, expires_at = self.items.pop(key)
+            except KeyError:
+                return default
+            if expires_at is not None and expires_at <= time():
+                return default
+            self.items[key] = value, expires_at
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time() + ttl if ttl is not None else None
+        with self.lock:
+            self.items.pop(key, None)
+            self.items[key] = value, expires_at
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
@@ -0,0 +1,271 @@
+"""
+Negotiated compression for request and response bodies.
+
+Compression is opt-in; enable it with `graph.use("compression")`.
+
+Request bodies with a supported `Content-Encoding` are decompressed transparently. Bodies
+are decompressed incrementally and rejected (with 413) as soon as they exceed the application's
+`MAX_CONTENT_LENGTH` or, if that is not set, `max_request_size` bytes.
+
+Response compression is opt-in as well:
+
+    compression:
+      enable_responses: true
+      min_size: 1024
+
+Responses of at least `min_size` bytes are compressed with the first of `encodings` that
+the client accepts. `br` (brotli) and `zstd` (zstandard) are used only when installed.
+
+"""
+from io import BytesIO
+import zlib
+
+from flask import current_app, request
+from werkzeug.datastructures import Accept
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge, UnsupportedMediaType
+from werkzeug.http import parse_accept_header
+
+from microcosm.api import defaults
+
+
+COMPRESSION = "compression"
+
+# bound the output of each brotli call; brotli cannot limit its output directly
+BROTLI_CHUNK_SIZE = 256
+ZSTD_READ_SIZE = 65536
+
+
+class DecompressedSizeExceeded(Exception):
+    """
+    Decompressed data exceeded its maximum size.
+
+    """
+    pass
+
+
+class Codec(object):
+    """
+    A content coding.
+
+    `decompress(data, max_size)` must raise `DecompressedSizeExceeded` without producing
+    (much) more than `max_size` bytes of output.
+
+    """
+    def __init__(self, name, compress, decompress):
+        self.name = name
+        self.compress = compress
+        self.decompress = decompress
+
+
+def make_zlib_codec(name, wbits, level=6):
+    def compress(data):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(data, max_size):
+        decompressor = zlib.decompressobj(wbits)
+        result = decompressor.decompress(data, max_size + 1)
+        if len(result) > max_size:
+            raise DecompressedSizeExceeded()
+        # input past the end of a complete stream is saved in `unused_data` (on py2 and py3);
+        # for a truncated stream, a trailing sentinel is consumed as more compressed data
+        decompressor.decompress(b"\0", 1)
+        if not decompressor.unused_data:
+            raise zlib.error("Incomplete or truncated stream")
+        return result
+
+    return Codec(name, compress, decompress)
+
+
+def make_brotli_codec():
+    import brotli
+
+    def decompress(data, max_size):
+        # feed small chunks so that output can be checked before it grows far past the limit
+        decompressor = brotli.Decompressor()
+        chunks, size = [], 0
+        for offset in range(0, len(data), BROTLI_CHUNK_SIZE):
+            chunk = decompressor.process(data[offset:offset + BROTLI_CHUNK_SIZE])
+            size += len(chunk)
+            if size > max_size:
+                raise DecompressedSizeExceeded()
+            chunks.append(chunk)
+        if not decompressor.is_finished():
+            raise brotli.error("Incomplete or truncated stream")
+        return b"".join(chunks)
+
+    return Codec(
+        "br",
+        lambda data: brotli.compress(data, quality=4),
+        decompress,
+    )
+
+
+def make_zstd_codec():
+    import zstandard
+
+    # (de)compressors are not thread safe; create them per call
+    def compress(data):
+        return zstandard.ZstdCompressor(level=3).compress(data)
+
+    def decompress(data, max_size):
+        # frames written without a content size need a streaming reader
+        reader = zstandard.ZstdDecompressor().stream_reader(BytesIO(data))
+        chunks, size = [], 0
+        while True:
+            chunk = reader.read(ZSTD_READ_SIZE)
+            if not chunk:
+                return b"".join(chunks)
+            size += len(chunk)
+            if size > max_size:
+                raise DecompressedSizeExceeded()
+            chunks.append(chunk)
+
+    return Codec("zstd", compress, decompress)
+
+
+def make_codecs():
+    """
+    Create codecs for all available encodings.
+
+    """
+    codecs = dict(
+        deflate=make_zlib_codec("deflate", zlib.MAX_WBITS),
+        gzip=make_zlib_codec("gzip", 16 + zlib.MAX_WBITS),
+    )
+    for factory in (make_brotli_codec, make_zstd_codec):
+        try:
+            codec = factory()
+        except ImportError:
+            continue
+        codecs[codec.name] = codec
+    return codecs
+
+
+CODECS = make_codecs()
+
+DEFAULT_MAX_REQUEST_SIZE = 10 * 1024 * 1024
+
+
+def gzip_compress(data):
+    return CODECS["gzip"].compress(data)
+
+
+class Compression(object):
+    """
+    Compresses responses and decompresses requests.
+
+    """
+    def __init__(
+        self,
+        encodings=("gzip", "deflate"),
+        min_size=1024,
+        enable_responses=False,
+        max_request_size=DEFAULT_MAX_REQUEST_SIZE,
+        codecs=CODECS,
+    ):
+        self.codecs = codecs
+        self.encodings = [encoding for encoding in encodings if encoding in codecs]
+        self.min_size = min_size
+        self.enable_responses = enable_responses
+        self.max_request_size = max_request_size
+
+    def choose_encoding(self, accept_encoding):
+        """
+        Choose the preferred (configured) encoding that the client accepts.
+
+        """
+        if not accept_encoding:
+            return None
+        accept = parse_accept_header(accept_encoding, Accept)
+        for encoding in self.encodings:
+            if accept[encoding]:
+                return encoding
+        return None
+
+    def decompress_request(self):
+        """
+        Replace the (cached) body of the current request with its decompressed content.
+
+        """
+        encoding = request.headers.get("Content-Encoding", "").strip().lower()
+        if not encoding or encoding == "identity":
+            return
+
+        try:
+            codec = self.codecs[encoding]
+        except KeyError:
+            raise UnsupportedMediaType("Unsupported content encoding: {}".format(encoding))
+
+        max_size = current_app.config.get("MAX_CONTENT_LENGTH")
+        if max_size is None:
+            max_size = self.max_request_size
+
+        try:
+            data = codec.decompress(request.get_data(cache=True), max_size)
+        except DecompressedSizeExceeded:
+            raise RequestEntityTooLarge()
+        except Exception:
+            raise BadRequest("Could not decode {} request body".format(encoding))
+
+        request._cached_data = data
+
+    def compress_response(self, response):
+        """
+        Compress a response if it is large enough and the client accepts a supported encoding.
+
+        """
+        if not self.enable_responses:
+            return response
+
+        if any((
+            response.direct_passthrough,
+            response.is_streamed,
+            response.status_code < 200,
+            response.status_code in (204, 206, 304),
+            "Content-Encoding" in response.headers,
+        )):
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        encoding = self.choose_encoding(request.headers.get("Accept-Encoding"))
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        response.set_data(self.codecs[encoding].compress(data))
+        response.headers["Content-Encoding"] = encoding
+
+        # the compressed body is a different representation of the same resource
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
+
+
+@defaults(
+    enable_responses=False,
+    encodings=["br", "zstd", "gzip", "deflate"],
+    max_request_size=DEFAULT_MAX_REQUEST_SIZE,
+    min_size=1024,
+)
+def configure_compression(graph):
+    """
+    Configure request decompression and (optionally) response compression.
+
+    """
+    compression = Compression(
+        encodings=graph.config.compression.encodings,
+        min_size=int(graph.config.compression.min_size),
+        enable_responses=graph.config.compression.enable_responses,
+        max_request_size=int(graph.config.compression.max_request_size),
+    )
+    graph.flask.extensions[COMPRESSION] = compression
+    graph.flask.before_request(compression.decompress_request)
+    graph.flask.after_request(compression.compress_response)
+    return compression
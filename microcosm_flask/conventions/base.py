@@ -2,6 +2,7 @@
 Convention base class.
 
 """
+from microcosm_flask.conventions.compiled import compile_schema
 from microcosm_flask.operations import Operation
 
 
@@ -57,6 +58,18 @@ class Convention(object):
             else:
                 configure_func(ns, self._make_definition(definition))
 
+    def dumper_for(self, response_schema):
+        """
+        Get the object used to dump response data for a response schema.
+
+        Precompiles the schema's serialization plan if compiled dumpers are enabled;
+        the original schema should still be used for route (e.g. swagger) metadata.
+
+        """
+        if self.graph.config.route.enable_compiled_dumpers:
+            return compile_schema(response_schema)
+        return response_schema
+
     def _find_func(self, operation):
         """
         Find the function to use to configure the given operation.
@@ -0,0 +1,183 @@
+"""
+Precompiled serialization plans for response schemas.
+
+Marshmallow's `Schema.dump()` is generic: every call builds a new marshaller and error
+store, checks for processors, re-evaluates which fields apply, and wraps every field
+access in error handling. For the (common) case of schemas that just map fields from an
+object, most of this work can be done once, when the route is registered.
+
+A compiled schema produces exactly the same data as `Schema.dump()`; any schema that
+uses features outside of the compiled subset (processors, implicit fields, prefixes,
+`extra` data, ...) is left uncompiled and any object that fails to serialize cleanly
+is re-serialized using the original schema (so that errors are reported identically).
+
+"""
+from marshmallow import fields, MarshalResult, Schema, ValidationError
+from marshmallow.utils import is_collection, missing
+from six import string_types
+
+
+class CompiledSchema(object):
+    """
+    A wrapper around a marshmallow schema that dumps using a precomputed plan.
+
+    Only `dump()` is accelerated; use the wrapped `schema` for everything else
+    (e.g. for loading or for swagger generation).
+
+    """
+    def __init__(self, schema, plan):
+        self.schema = schema
+        self.plan = plan
+
+    def dump(self, obj):
+        try:
+            data = self.plan(obj)
+        except ValidationError:
+            # let marshmallow handle (and report) the error exactly as it normally would
+            return self.schema.dump(obj)
+        return MarshalResult(data, {})
+
+
+def is_compilable(schema):
+    """
+    Can the given schema be dumped using a precomputed plan?
+
+    """
+    return all((
+        not schema.many,
+        not schema.extra,
+        not schema.prefix,
+        # NB: older marshmallow versions may not track processors; assume the worst
+        not getattr(schema, "_has_processors", True),
+        # implicit fields depend on the type of the dumped object
+        not schema.opts.fields,
+        not schema.opts.additional,
+        # deprecated hooks
+        getattr(schema, "__accessor__", None) is None,
+        getattr(schema, "__error_handler__", None) is None,
+    ))
+
+
+def make_plan(schema):
+    """
+    Build a serialization plan (a function from object to dict) for a schema.
+
+    :returns: a plan or None if the schema cannot be compiled
+
+    """
+    if not is_compilable(schema):
+        return None
+
+    accessor = schema.get_attribute
+    dict_class = schema.dict_class
+    steps = [
+        (field_obj.dump_to or attr_name, make_step(attr_name, field_obj, accessor))
+        for attr_name, field_obj in schema.fields.items()
+        if not getattr(field_obj, "load_only", False)
+    ]
+
+    def plan(obj):
+        items = []
+        for key, step in steps:
+            value = step(obj)
+            if value is missing:
+                continue
+            items.append((key, value))
+        return dict_class(items)
+
+    return plan
+
+
+def make_nested_plan(field_obj):
+    """
+    Build a plan for a nested field's schema, if possible.
+
+    The returned plan accepts a nested value and handles `None` and `many`.
+
+    """
+    if isinstance(field_obj.only, string_types):
+        # field plucking
+        return None
+
+    if isinstance(field_obj.nested, string_types):
+        # registry lookups and (possibly recursive) self-nesting
+        return None
+
+    schema = field_obj.schema
+    if schema.many:
+        return None
+
+    plan = make_plan(schema)
+    if plan is None:
+        return None
+
+    if field_obj.many:
+        def nested_plan(value):
+            if value is None:
+                return None
+            return [plan(item) for item in value]
+    else:
+        def nested_plan(value):
+            if value is None:
+                return None
+            return plan(value)
+
+    return nested_plan
+
+
+def make_step(attr_name, field_obj, accessor):
+    """
+    Build a single step of a serialization plan.
+
+    Most fields delegate to `Field.serialize()`, which skips marshmallow's per-call
+    bookkeeping without changing any field behavior. Nested schemas are compiled
+    recursively.
+
+    """
+    def serialize(obj):
+        return field_obj.serialize(attr_name, obj, accessor=accessor)
+
+    if isinstance(field_obj, fields.Nested):
+        transform = make_nested_plan(field_obj)
+    elif isinstance(field_obj, fields.List) and isinstance(field_obj.container, fields.Nested):
+        nested_plan = make_nested_plan(field_obj.container)
+        if nested_plan is None:
+            transform = None
+        else:
+            def transform(value):
+                if value is None:
+                    return None
+                if is_collection(value):
+                    return [nested_plan(item) for item in value]
+                return [nested_plan(value)]
+    else:
+        transform = None
+
+    if transform is None:
+        return serialize
+
+    def step(obj):
+        value = field_obj.get_value(attr_name, obj, accessor=accessor)
+        if value is missing:
+            # defer default handling to the field
+            return serialize(obj)
+        return transform(value)
+
+    return step
+
+
+def compile_schema(schema):
+    """
+    Compile a response schema, if possible.
+
+    :returns: a `CompiledSchema` or the original value (if it cannot be compiled)
+
+    """
+    if not isinstance(schema, Schema):
+        return schema
+
+    plan = make_plan(schema)
+    if plan is None:
+        return schema
+
+    return CompiledSchema(schema, plan)
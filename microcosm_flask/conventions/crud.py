@@ -9,21 +9,62 @@ from microcosm_flask.conventions.encoding import (
     dump_response_data,
     load_query_string_data,
     load_request_data,
+    make_json_encoder,
     merge_data,
     require_response_data,
+    stream_response_data,
 )
 from microcosm_flask.conventions.registry import qs, request, response
+from microcosm_flask.conventions.response_cache import RESPONSE_CACHES
 from microcosm_flask.namespaces import Namespace
 from microcosm_flask.operations import Operation
-from microcosm_flask.paging import Page, PaginatedList, make_paginated_list_schema
+from microcosm_flask.paging import make_batch_list_schema, make_list_schema_for, Page, PaginatedList
+
+
+def identity(func):
+    return func
 
 
 class CRUDConvention(Convention):
 
+    def __init__(self, graph, response_cache=None):
+        super(CRUDConvention, self).__init__(graph)
+        self.response_cache = response_cache
+
     @property
     def page_cls(self):
         return Page
 
+    @property
+    def paginated_list_cls(self):
+        """
+        The paginated list class for searches; use `CursorPaginatedList` with `CursorPage`.
+
+        """
+        return PaginatedList
+
+    @property
+    def enable_etags(self):
+        return self.graph.config.route.enable_etags
+
+    def cached(self, ns):
+        """
+        Cache successful responses of a read endpoint, if a response cache is configured.
+
+        """
+        if self.response_cache is None:
+            return identity
+        return self.response_cache.cached(ns, conditional=self.enable_etags)
+
+    def invalidating(self, ns):
+        """
+        Invalidate cached responses when a write endpoint succeeds.
+
+        """
+        if self.response_cache is None:
+            return identity
+        return self.response_cache.invalidating(ns)
+
     def configure_search(self, ns, definition):
         """
         Register a search endpoint.
@@ -31,19 +72,27 @@ class CRUDConvention(Convention):
         The definition's func should be a search function, which must:
         - accept kwargs for the query string (minimally for pagination)
         - return a tuple of (items, count) where count is the total number of items
-          available (in the case of pagination)
+          available (in the case of pagination) or None if not counted
 
         The definition's request_schema will be used to process query string arguments.
 
+        If `route.enable_streaming_search` is configured, the response is streamed and
+        items may be any iterable (e.g. a generator); items are dumped one at a time.
+
+        If `route.enable_etags` is configured, (non-streamed) responses carry an ETag and
+        matching `If-None-Match` requests are answered with 304.
+
         :param ns: the namespace
         :param definition: the endpoint definition
 
         """
-        paginated_list_schema = make_paginated_list_schema(ns, definition.response_schema)()
+        paginated_list_schema = make_list_schema_for(self.paginated_list_cls, ns, definition.response_schema)()
+        dumper = self.dumper_for(paginated_list_schema)
 
         @self.graph.route(ns.collection_path, Operation.Search, ns)
         @qs(definition.request_schema)
         @response(paginated_list_schema)
+        @self.cached(ns)
         def search(**path_data):
             request_data = load_query_string_data(definition.request_schema)
             page = self.page_cls.from_query_string(request_data)
@@ -55,7 +104,7 @@ class CRUDConvention(Convention):
                 context = {}
                 items, count = return_value
 
-            response_data = PaginatedList(
+            response_data = self.paginated_list_cls(
                 ns=ns,
                 page=page,
                 items=items,
@@ -64,7 +113,9 @@ class CRUDConvention(Convention):
                 operation=Operation.Search,
                 **context
             )
-            return dump_response_data(paginated_list_schema, response_data)
+            if self.graph.config.route.enable_streaming_search:
+                return stream_response_data(response_data.iter_json(make_json_encoder()))
+            return dump_response_data(dumper, response_data, conditional=self.enable_etags)
 
         search.__doc__ = "Search the collection of all {}".format(pluralize(ns.subject_name))
 
@@ -80,16 +131,76 @@ class CRUDConvention(Convention):
         :param definition: the endpoint definition
 
         """
+        dumper = self.dumper_for(definition.response_schema)
+
         @self.graph.route(ns.collection_path, Operation.Create, ns)
         @request(definition.request_schema)
         @response(definition.response_schema)
+        @self.invalidating(ns)
         def create(**path_data):
             request_data = load_request_data(definition.request_schema)
             response_data = definition.func(**merge_data(path_data, request_data))
-            return dump_response_data(definition.response_schema, response_data, Operation.Create.value.default_code)
+            return dump_response_data(dumper, response_data, Operation.Create.value.default_code)
 
         create.__doc__ = "Create a new {}".format(ns.subject_name)
 
+    def configure_createbatch(self, ns, definition):
+        """
+        Register a create batch endpoint.
+
+        The definition's func should be a batch create function, which must:
+        - accept kwargs for the request and path data (minimally, a list of `items`)
+        - return the new items (e.g. as a dictionary of `items`)
+
+        The whole batch is passed to a single call. Because POST to the collection path
+        creates a single item, the endpoint uses the namespace's batch path.
+
+        :param ns: the namespace
+        :param definition: the endpoint definition
+
+        """
+        operation = Operation.CreateBatch
+        dumper = self.dumper_for(definition.response_schema)
+
+        @self.graph.route(ns.batch_path, operation, ns)
+        @request(definition.request_schema)
+        @response(definition.response_schema)
+        @self.invalidating(ns)
+        def create_batch(**path_data):
+            request_data = load_request_data(definition.request_schema)
+            response_data = definition.func(**merge_data(path_data, request_data))
+            return dump_response_data(dumper, response_data, operation.value.default_code)
+
+        create_batch.__doc__ = "Create a batch of {}".format(pluralize(ns.subject_name))
+
+    def configure_deletebatch(self, ns, definition):
+        """
+        Register a delete batch endpoint.
+
+        The definition's func should be a batch delete function, which must:
+        - accept kwargs for the request and path data (minimally, a list of `items`)
+        - return truthy/falsey
+
+        The whole batch is passed to a single call. Because DELETE on the collection path
+        would (conventionally) delete the whole collection, the endpoint uses the namespace's
+        batch path: `DELETE /foo/batch`.
+
+        :param ns: the namespace
+        :param definition: the endpoint definition
+
+        """
+        operation = Operation.DeleteBatch
+
+        @self.graph.route(ns.batch_path, operation, ns)
+        @request(definition.request_schema)
+        @self.invalidating(ns)
+        def delete_batch(**path_data):
+            request_data = load_request_data(definition.request_schema)
+            require_response_data(definition.func(**merge_data(path_data, request_data)))
+            return "", operation.value.default_code
+
+        delete_batch.__doc__ = "Delete a batch of {}".format(pluralize(ns.subject_name))
+
     def configure_updatebatch(self, ns, definition):
         """
         Register an update batch endpoint.
@@ -103,14 +214,16 @@ class CRUDConvention(Convention):
 
         """
         operation = Operation.UpdateBatch
+        dumper = self.dumper_for(definition.response_schema)
 
         @self.graph.route(ns.collection_path, operation, ns)
         @request(definition.request_schema)
         @response(definition.response_schema)
+        @self.invalidating(ns)
         def update_batch(**path_data):
             request_data = load_request_data(definition.request_schema)
             response_data = definition.func(**merge_data(path_data, request_data))
-            return dump_response_data(definition.response_schema, response_data, operation.value.default_code)
+            return dump_response_data(dumper, response_data, operation.value.default_code)
 
         update_batch.__doc__ = "Update a batch of {}".format(ns.subject_name)
 
@@ -122,18 +235,57 @@ class CRUDConvention(Convention):
         - accept kwargs for path data
         - return an item or falsey
 
+        If `route.enable_etags` is configured, responses carry an ETag and matching
+        `If-None-Match` requests are answered with 304.
+
         :param ns: the namespace
         :param definition: the endpoint definition
 
         """
+        dumper = self.dumper_for(definition.response_schema)
+
         @self.graph.route(ns.instance_path, Operation.Retrieve, ns)
         @response(definition.response_schema)
+        @self.cached(ns)
         def retrieve(**path_data):
             response_data = require_response_data(definition.func(**path_data))
-            return dump_response_data(definition.response_schema, response_data)
+            return dump_response_data(dumper, response_data, conditional=self.enable_etags)
 
         retrieve.__doc__ = "Retrieve a {} by id".format(ns.subject_name)
 
+    def configure_retrievebatch(self, ns, definition):
+        """
+        Register a retrieve batch endpoint.
+
+        The definition's func should be a batch retrieve function, which must:
+        - accept kwargs for the query string (minimally, a list of `ids`) and path data
+        - return a list of items
+
+        The definition's request_schema will be used to process query string arguments
+        (e.g. using `QueryStringList` for `ids`); the response_schema is the item schema.
+
+        Because GET on the collection path searches, the endpoint uses the namespace's
+        batch path: `GET /foo/batch?ids=a,b,c`.
+
+        :param ns: the namespace
+        :param definition: the endpoint definition
+
+        """
+        operation = Operation.RetrieveBatch
+        batch_list_schema = make_batch_list_schema(ns, definition.response_schema)()
+        dumper = self.dumper_for(batch_list_schema)
+
+        @self.graph.route(ns.batch_path, operation, ns)
+        @qs(definition.request_schema)
+        @response(batch_list_schema)
+        @self.cached(ns)
+        def retrieve_batch(**path_data):
+            request_data = load_query_string_data(definition.request_schema)
+            items = definition.func(**merge_data(path_data, request_data))
+            return dump_response_data(dumper, dict(items=items), conditional=self.enable_etags)
+
+        retrieve_batch.__doc__ = "Retrieve a batch of {} by id".format(pluralize(ns.subject_name))
+
     def configure_delete(self, ns, definition):
         """
         Register a delete endpoint.
@@ -147,6 +299,7 @@ class CRUDConvention(Convention):
 
         """
         @self.graph.route(ns.instance_path, Operation.Delete, ns)
+        @self.invalidating(ns)
         def delete(**path_data):
             require_response_data(definition.func(**path_data))
             return "", Operation.Delete.value.default_code
@@ -165,16 +318,19 @@ class CRUDConvention(Convention):
         :param definition: the endpoint definition
 
         """
+        dumper = self.dumper_for(definition.response_schema)
+
         @self.graph.route(ns.instance_path, Operation.Replace, ns)
         @request(definition.request_schema)
         @response(definition.response_schema)
+        @self.invalidating(ns)
         def replace(**path_data):
             request_data = load_request_data(definition.request_schema)
             # Replace/put should create a resource if not already present, but we do not
             # enforce these semantics at the HTTP layer. If `func` returns falsey, we
             # will raise a 404.
             response_data = require_response_data(definition.func(**merge_data(path_data, request_data)))
-            return dump_response_data(definition.response_schema, response_data)
+            return dump_response_data(dumper, response_data)
 
         replace.__doc__ = "Create or update a {} by id".format(ns.subject_name)
 
@@ -190,19 +346,22 @@ class CRUDConvention(Convention):
         :param definition: the endpoint definition
 
         """
+        dumper = self.dumper_for(definition.response_schema)
+
         @self.graph.route(ns.instance_path, Operation.Update, ns)
         @request(definition.request_schema)
         @response(definition.response_schema)
+        @self.invalidating(ns)
         def update(**path_data):
             # NB: using partial here means that marshmallow will not validate required fields
             request_data = load_request_data(definition.request_schema, partial=True)
             response_data = require_response_data(definition.func(**merge_data(path_data, request_data)))
-            return dump_response_data(definition.response_schema, response_data)
+            return dump_response_data(dumper, response_data)
 
         update.__doc__ = "Update some or all of a {} by id".format(ns.subject_name)
 
 
-def configure_crud(graph, ns, mappings, path_prefix=""):
+def configure_crud(graph, ns, mappings, path_prefix="", response_cache=None):
     """
     Register CRUD endpoints for a resource object.
 
@@ -218,7 +377,12 @@ def configure_crud(graph, ns, mappings, path_prefix=""):
             Operation.Retrieve: (retrieve_foo, FooSchema()),
         }
 
+    :param response_cache: an optional `ResponseCache` for read endpoints; it is registered
+                           (by collection path) in the app's `response_caches` extension
+
     """
     ns = Namespace.make(ns, path=path_prefix)
-    convention = CRUDConvention(graph)
+    if response_cache is not None:
+        graph.flask.extensions.setdefault(RESPONSE_CACHES, {})[ns.collection_path] = response_cache
+    convention = CRUDConvention(graph, response_cache=response_cache)
     convention.configure(ns, mappings)
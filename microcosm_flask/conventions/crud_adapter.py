@@ -2,7 +2,13 @@
 Adapter between conventional crud functions and the `microcosm_postgres.store.Store` interface.
 
 """
+from collections import OrderedDict
+
+from werkzeug.exceptions import NotFound
+
+from microcosm_flask.conventions.encoding import merge_data
 from microcosm_flask.naming import name_for
+from microcosm_flask.paging import COUNT_EXACT, COUNT_NONE
 
 
 class CRUDStoreAdapter(object):
@@ -11,6 +17,10 @@ class CRUDStoreAdapter(object):
 
     Does NOT impose transactions; use the `microcosm_postgres.context.transactional` decorator.
 
+    Batch operations use the store's bulk methods (`create_batch`, `delete_batch`,
+    `replace_batch`, and `retrieve_batch`), if any, and otherwise fall back to one store
+    call per item.
+
     """
     def __init__(self, graph, store):
         self.graph = graph
@@ -24,10 +34,53 @@ class CRUDStoreAdapter(object):
         model = self.store.model_class(**kwargs)
         return self.store.create(model)
 
+    def create_batch(self, **kwargs):
+        """
+        Batch create operation.
+
+        Path data (if any) applies to every item.
+
+        """
+        items = kwargs.pop("items")
+        models = [
+            self.store.model_class(**merge_data(kwargs, item))
+            for item in items
+        ]
+
+        if hasattr(self.store, "create_batch"):
+            created = self.store.create_batch(models)
+        else:
+            created = [self.store.create(model) for model in models]
+
+        return dict(
+            items=created,
+        )
+
     def delete(self, **kwargs):
         identifier = kwargs.pop(self.identifier_key)
         return self.store.delete(identifier)
 
+    def delete_batch(self, **kwargs):
+        """
+        Batch delete operation.
+
+        Assumes that request items define a primary key identifier, either under the
+        adapter's identifier key (e.g. `person_id`) or as a plain `id`.
+
+        """
+        identifiers = [
+            item[self.identifier_key] if self.identifier_key in item else item["id"]
+            for item in kwargs.pop("items")
+        ]
+
+        if hasattr(self.store, "delete_batch"):
+            return self.store.delete_batch(identifiers)
+
+        return all([
+            self.store.delete(identifier)
+            for identifier in identifiers
+        ])
+
     def replace(self, **kwargs):
         identifier = kwargs.pop(self.identifier_key)
         model = self.store.model_class(id=identifier, **kwargs)
@@ -37,10 +90,58 @@ class CRUDStoreAdapter(object):
         identifier = kwargs.pop(self.identifier_key)
         return self.store.retrieve(identifier)
 
-    def search(self, offset, limit, **kwargs):
-        items = self.store.search(offset=offset, limit=limit, **kwargs)
-        count = self.store.count(**kwargs)
-        return items, count
+    def retrieve_batch(self, ids, **kwargs):
+        """
+        Batch retrieve operation.
+
+        Uses a single store call (e.g. an `IN` query) if the store supports `retrieve_batch`.
+        Like retrieve, fails if any item does not exist; items are returned in the order
+        of the (distinct) ids.
+
+        """
+        identifiers = list(OrderedDict.fromkeys(ids))
+
+        if not hasattr(self.store, "retrieve_batch"):
+            return [self.store.retrieve(identifier) for identifier in identifiers]
+
+        items_by_id = {
+            str(item.id): item
+            for item in self.store.retrieve_batch(identifiers)
+        }
+        missing = [identifier for identifier in identifiers if str(identifier) not in items_by_id]
+        if missing:
+            raise NotFound("Could not find {}: {}".format(
+                name_for(self.store.model_class),
+                ", ".join(str(identifier) for identifier in missing),
+            ))
+        return [items_by_id[str(identifier)] for identifier in identifiers]
+
+    def search(self, offset, limit, count_hint=COUNT_EXACT, **kwargs):
+        """
+        Search operation.
+
+        Uses a single store call for items and count (`search_with_count`) if the store
+        supports it.
+
+        The count hint (see `CountHintPageSchema`) may skip counting or use the store's
+        `estimate_count`, if any; either way, one extra item is fetched so that the
+        paginated list can tell whether there is a next page.
+
+        """
+        if count_hint == COUNT_EXACT:
+            if hasattr(self.store, "search_with_count"):
+                return self.store.search_with_count(offset=offset, limit=limit, **kwargs)
+
+            items = self.store.search(offset=offset, limit=limit, **kwargs)
+            count = self.store.count(**kwargs)
+            return items, count
+
+        items = self.store.search(offset=offset, limit=limit + 1, **kwargs)
+        if count_hint == COUNT_NONE:
+            return items, None
+        if hasattr(self.store, "estimate_count"):
+            return items, self.store.estimate_count(**kwargs)
+        return items, self.store.count(**kwargs)
 
     def update(self, **kwargs):
         identifier = kwargs.pop(self.identifier_key)
@@ -49,7 +150,7 @@ class CRUDStoreAdapter(object):
 
     def update_batch(self, **kwargs):
         """
-        Simplistic batch update operation implemented in terms of `replace()`.
+        Batch update operation implemented in terms of replace.
 
         Assumes that:
 
@@ -60,6 +161,15 @@ class CRUDStoreAdapter(object):
         """
         items = kwargs.pop("items")
 
+        if hasattr(self.store, "replace_batch"):
+            models = [
+                self.store.model_class(**merge_data(kwargs, item))
+                for item in items
+            ]
+            return dict(
+                items=self.store.replace_batch(models),
+            )
+
         def transform(item):
             """
             Transform the dictionary expected for replace (which uses the URI path's id)
@@ -5,7 +5,6 @@ A discovery endpoint provides links to other endpoints.
 from microcosm.api import defaults
 from microcosm_flask.conventions.base import Convention
 from microcosm_flask.conventions.encoding import load_query_string_data, make_response
-from microcosm_flask.conventions.registry import iter_endpoints
 from microcosm_flask.linking import Link, Links
 from microcosm_flask.namespaces import Namespace
 from microcosm_flask.paging import Page, PageSchema
@@ -42,10 +41,7 @@ class DiscoveryConvention(Convention):
         Evaluated as a property to defer evaluation.
 
         """
-        def match_func(operation, ns, rule):
-            return operation in self.matching_operations
-
-        return list(iter_endpoints(self.graph, match_func))
+        return self.graph.route_registry.find(operations=self.matching_operations)
 
     def configure_discover(self, ns, definition):
         """
@@ -2,10 +2,12 @@
 Support for encoding and decoding request/response content.
 
 """
-from flask import jsonify, request
+from flask import request, Response, stream_with_context
 from werkzeug import Headers
 from werkzeug.exceptions import NotFound, UnprocessableEntity
 
+from microcosm_flask.json_codec import get_json_codec
+
 
 def with_headers(error, headers):
     setattr(error, "headers", headers)
@@ -27,7 +29,7 @@ def load_request_data(request_schema, partial=False):
     HTTP 400 and 415 errors.
 
     """
-    json_data = request.get_json(force=True) or {}
+    json_data = get_json_codec().get_json() or {}
     request_data = request_schema.load(json_data, partial=partial)
     if request_data.errors:
         # pass the validation errors back in the context
@@ -68,7 +70,7 @@ def remove_null_values(data):
     return data
 
 
-def dump_response_data(response_schema, response_data, status_code=200, headers=None):
+def dump_response_data(response_schema, response_data, status_code=200, headers=None, conditional=False):
     """
     Dumps response data as JSON using the given schema.
 
@@ -77,11 +79,17 @@ def dump_response_data(response_schema, response_data, status_code=200, headers=
     This is friendlier to client and test software, even at the cost of not distinguishing
     HTTP 400 and 406 errors.
 
+    If `conditional` is set, the response gets an ETag computed from the encoded body and
+    requests with a matching `If-None-Match` (or `If-Modified-Since`) get a 304 instead.
+
     """
     if response_schema:
         response_data = response_schema.dump(response_data).data
 
-    return make_response(response_data, status_code, headers)
+    response = make_response(response_data, status_code, headers)
+    if conditional:
+        return make_conditional_response(response)
+    return response
 
 
 def make_response(response_data, status_code=200, headers=None):
@@ -94,12 +102,57 @@ def make_response(response_data, status_code=200, headers=None):
         # Specify JSON as the response content type by default
         headers["Content-Type"] = "application/json"
 
-    response = jsonify(response_data)
+    response = get_json_codec().jsonify(response_data)
     response.headers = Headers(headers)
     response.status_code = status_code
     return response
 
 
+def make_conditional_response(response):
+    """
+    Tag a response with an ETag and answer conditional requests with 304 Not Modified.
+
+    """
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def make_json_encoder():
+    """
+    Create a function that encodes (streamed) response data for the current request.
+
+    """
+    skip_null = request.headers.get("X-Response-Skip-Null")
+    codec = get_json_codec()
+
+    def encode(data):
+        if skip_null:
+            data = remove_null_values(data)
+        return codec.dumps(data)
+
+    return encode
+
+
+def stream_response_data(chunks, status_code=200, headers=None):
+    """
+    Stream response data from an iterable of JSON-encoded chunks.
+
+    Chunks are generated while the response is being sent (in the current request context);
+    errors raised by later chunks can no longer change the status code and will truncate
+    the response instead.
+
+    """
+    headers = headers or {}
+    if "Content-Type" not in headers:
+        headers["Content-Type"] = "application/json"
+
+    return Response(
+        stream_with_context(chunks),
+        status=status_code,
+        headers=Headers(headers),
+    )
+
+
 def merge_data(path_data, request_data):
     """
     Merge data from the URI path and the request.
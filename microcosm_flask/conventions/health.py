@@ -4,7 +4,25 @@ Health check convention.
 Reports service health and basic information from the "/api/health" endpoint,
 using HTTP 200/503 status codes to indicate healthiness.
 
+Checks run sequentially in the request thread by default. Optionally, checks may
+run concurrently on a bounded thread pool (each with a timeout), results may be
+cached for a TTL, and a background thread may keep cached results warm:
+
+    health_convention:
+      max_workers: 4
+      timeout: 2.0
+      cache_ttl: 5.0
+      refresh_interval: 5.0
+
+Setting `timeout` without `max_workers` uses a pool of `DEFAULT_MAX_WORKERS` threads;
+checks cannot be timed out while running in the request thread.
+
 """
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import Event, Lock, Thread
+from time import time
+
 from microcosm.api import defaults
 from microcosm_flask.audit import skip_logging
 from microcosm_flask.conventions.base import Convention
@@ -14,6 +32,9 @@ from microcosm_flask.namespaces import Namespace
 from microcosm_flask.operations import Operation
 
 
+DEFAULT_MAX_WORKERS = 4
+
+
 class HealthResult(object):
     def __init__(self, error=None):
         self.error = error
@@ -52,21 +73,36 @@ class Health(object):
     The overall health is OK if all checks are OK.
 
     """
-    def __init__(self, graph):
+    def __init__(self, graph, max_workers=0, timeout=0, cache_ttl=0, refresh_interval=0):
         self.graph = graph
         self.name = graph.metadata.name
         self.checks = {}
 
+        self.timeout = float(timeout or 0)
+        self.cache_ttl = float(cache_ttl or 0)
+        self.refresh_interval = float(refresh_interval or 0)
+        if max_workers or self.timeout:
+            self.executor = ThreadPoolExecutor(max_workers=int(max_workers or DEFAULT_MAX_WORKERS))
+        else:
+            self.executor = None
+
+        # in-flight check evaluations by check name; never submitted twice so that
+        # hung checks cannot exhaust the thread pool
+        self.pending = {}
+        self.pending_lock = Lock()
+        # the most recent check results and when they were evaluated
+        self.results = None
+        self.evaluated_at = None
+        self.lock = Lock()
+        self.refresher = None
+        self.stopped = Event()
+
     def to_dict(self):
         """
         Encode the name, the status of all checks, and the current overall status.
 
         """
-        # evaluate checks
-        checks = {
-            key: HealthResult.evaluate(func, self.graph)
-            for key, func in self.checks.items()
-        }
+        checks = self.get_results()
         dct = dict(
             # return the service name helps for routing debugging
             name=self.name,
@@ -79,12 +115,107 @@ class Health(object):
             }
         return dct
 
+    def get_results(self):
+        """
+        Get check results, using cached results if they are fresh enough.
+
+        """
+        if not self.cache_ttl and not self.refresh_interval:
+            return self.evaluate()
+
+        self.start_refresher()
+
+        with self.lock:
+            if self.results is None or (
+                self.refresher is None and time() - self.evaluated_at >= self.cache_ttl
+            ):
+                self.results, self.evaluated_at = self.evaluate(), time()
+            return self.results
+
+    def evaluate(self):
+        """
+        Evaluate all checks.
+
+        """
+        if self.executor is None:
+            return {
+                key: HealthResult.evaluate(func, self.graph)
+                for key, func in self.checks.items()
+            }
+
+        futures = {
+            key: self.submit(key, func)
+            for key, func in self.checks.items()
+        }
+        deadline = time() + self.timeout if self.timeout else None
+        return {
+            key: self.get_result(future, deadline)
+            for key, future in futures.items()
+        }
+
+    def submit(self, key, func):
+        with self.pending_lock:
+            future = self.pending.get(key)
+            if future is None or future.done():
+                future = self.pending[key] = self.executor.submit(self.evaluate_in_app_context, func)
+            return future
+
+    def evaluate_in_app_context(self, func):
+        """
+        Evaluate a check off the request thread, where checks may still use `current_app` and `g`.
+
+        """
+        with self.graph.flask.app_context():
+            return HealthResult.evaluate(func, self.graph)
+
+    def get_result(self, future, deadline):
+        try:
+            return future.result(timeout=None if deadline is None else max(deadline - time(), 0))
+        except FutureTimeoutError:
+            return HealthResult("timed out after {} seconds".format(self.timeout))
+
+    def start_refresher(self):
+        """
+        Start the background refresher, if configured.
+
+        Started lazily (on first use) rather than on construction so that the thread is
+        created in the serving process (e.g. after a pre-forking server forks workers).
+
+        """
+        if not self.refresh_interval or self.refresher is not None:
+            return
+
+        with self.lock:
+            if self.refresher is not None:
+                return
+            self.refresher = Thread(target=self.run_refresher, name="health-refresher")
+            self.refresher.daemon = True
+            self.refresher.start()
+
+    def run_refresher(self):
+        while not self.stopped.wait(self.refresh_interval):
+            with self.graph.flask.app_context():
+                results = self.evaluate()
+            with self.lock:
+                self.results, self.evaluated_at = results, time()
+
+    def stop(self):
+        self.stopped.set()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
 
 class HealthConvention(Convention):
 
     def __init__(self, graph):
         super(HealthConvention, self).__init__(graph)
-        self.health = Health(graph)
+        self.health = Health(
+            graph,
+            max_workers=graph.config.health_convention.max_workers,
+            timeout=graph.config.health_convention.timeout,
+            cache_ttl=graph.config.health_convention.cache_ttl,
+            refresh_interval=graph.config.health_convention.refresh_interval,
+        )
 
     def configure_retrieve(self, ns, definition):
 
@@ -97,7 +228,11 @@ class HealthConvention(Convention):
 
 
 @defaults(
+    cache_ttl=0,
+    max_workers=0,
     path_prefix="",
+    refresh_interval=0,
+    timeout=0,
 )
 def configure_health(graph):
     """
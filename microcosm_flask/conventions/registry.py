@@ -2,7 +2,11 @@
 Support for registering function metadata.
 
 """
+from collections import defaultdict, namedtuple
+from functools import wraps
+
 from microcosm_flask.namespaces import Namespace
+from microcosm_flask.url_templates import ROUTE_REGISTRY, URLTemplate
 from werkzeug.exceptions import InternalServerError
 
 
@@ -36,6 +40,178 @@ def iter_endpoints(graph, match_func):
                 yield operation, ns, rule, func
 
 
+class RouteEntry(namedtuple("RouteEntry", ["operation", "ns", "rule", "func"])):
+    """
+    A registered route; unpacks like the tuples generated by `iter_endpoints`.
+
+    Also records the route's request, response, and query string schemas.
+
+    """
+    def __new__(cls, operation, ns, rule, func):
+        entry = super(RouteEntry, cls).__new__(cls, operation, ns, rule, func)
+        entry.request_schema = get_request_schema(func)
+        entry.response_schema = get_response_schema(func)
+        entry.qs_schema = get_qs_schema(func)
+        return entry
+
+
+class RouteRegistry(object):
+    """
+    An index of conventional routes, recorded as routes are registered.
+
+    Supports lookups by operation, subject, version, and path prefix without
+    walking (and parsing) every rule in the Flask URL map. Also precomputes the
+    URL template used to build links for each route.
+
+    The `generation` changes whenever a route is registered, so that anything
+    derived from the registry knows when to rebuild.
+
+    """
+    def __init__(self):
+        self.generation = 0
+        self.entries = []
+        # ids of the rules seen so far; rules are registered at most once
+        self.rule_ids = set()
+        self.templates = {}
+        self.by_endpoint = {}
+        self.by_operation = defaultdict(list)
+        self.by_subject = defaultdict(list)
+        self.by_version = defaultdict(list)
+        self.by_path_prefix = defaultdict(list)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def register(self, rule, func):
+        """
+        Record a route for a (conventional) URL rule.
+
+        Rules whose endpoints do not follow the `Operation` naming convention are ignored.
+
+        """
+        if id(rule) in self.rule_ids:
+            return self.by_endpoint.get(rule.endpoint)
+        self.rule_ids.add(id(rule))
+
+        try:
+            operation, ns = Namespace.parse_endpoint(rule.endpoint)
+        except (IndexError, ValueError, InternalServerError):
+            return None
+
+        entry = RouteEntry(operation, ns, rule, func)
+        self.generation += 1
+        # templates only apply if an endpoint has a single rule
+        self.templates[rule.endpoint] = None if rule.endpoint in self.by_endpoint else URLTemplate.for_rule(rule)
+        self.entries.append(entry)
+        self.by_endpoint[rule.endpoint] = entry
+        self.by_operation[operation].append(entry)
+        self.by_subject[ns.subject_name].append(entry)
+        self.by_version[ns.version].append(entry)
+        for path_prefix in iter_path_prefixes(rule.rule):
+            self.by_path_prefix[path_prefix].append(entry)
+        return entry
+
+    def get(self, endpoint):
+        return self.by_endpoint.get(endpoint)
+
+    def find(self, operations=None, subject=None, version=None, path_prefix=None):
+        """
+        Find routes matching all of the given criteria.
+
+        :param operations: an optional collection of `Operation` values
+        :param subject: an optional subject name
+        :param version: an optional namespace version (e.g. "v1")
+        :param path_prefix: an optional (full) rule path prefix
+        :returns: a list of `RouteEntry` values, in URL map order
+
+        """
+        candidates = [
+            index_entries
+            for index_entries in (
+                None if operations is None else [
+                    entry
+                    for operation in operations
+                    for entry in self.by_operation.get(operation, [])
+                ],
+                None if subject is None else self.by_subject.get(subject, []),
+                None if version is None else self.by_version.get(version, []),
+                None if path_prefix is None else self.by_path_prefix.get(path_prefix.rstrip("/")),
+            )
+            if index_entries is not None
+        ]
+        entries = min(candidates, key=len) if candidates else self.entries
+
+        matches = [
+            entry
+            for entry in entries
+            if all((
+                operations is None or entry.operation in operations,
+                subject is None or entry.ns.subject_name == subject,
+                version is None or entry.ns.version == version,
+                path_prefix is None or entry.rule.rule.startswith(path_prefix),
+            ))
+        ]
+        return sort_entries(matches)
+
+
+def iter_path_prefixes(path):
+    """
+    Generate the path segment prefixes of a rule path.
+
+    For example: "/api/v1/foo" => "", "/api", "/api/v1", "/api/v1/foo"
+
+    """
+    parts = path.rstrip("/").split("/")
+    for index in range(len(parts)):
+        yield "/".join(parts[:index + 1])
+
+
+def sort_entries(entries):
+    """
+    Sort entries in the same order as the (bound) URL map iterates over its rules.
+
+    """
+    sequence = {
+        id(entry): index
+        for index, entry in enumerate(entries)
+    }
+    try:
+        return sorted(entries, key=lambda entry: (entry.rule.match_compare_key(), sequence[id(entry)]))
+    except AttributeError:
+        # rule ordering is not exposed by all werkzeug versions; fall back to registration order
+        return entries
+
+
+def configure_route_registry(graph):
+    """
+    Configure the route registry.
+
+    Records the app's existing rules and every rule added later (via `graph.route`,
+    `app.route`, or blueprints), since these all go through `add_url_rule`.
+
+    """
+    app = graph.flask
+    route_registry = RouteRegistry()
+
+    for rule in app.url_map.iter_rules():
+        route_registry.register(rule, app.view_functions.get(rule.endpoint))
+
+    add_url_rule = app.add_url_rule
+
+    @wraps(add_url_rule)
+    def add_and_register_url_rule(rule, endpoint=None, view_func=None, **options):
+        add_url_rule(rule, endpoint, view_func, **options)
+        # flask names endpoints after their view functions by default
+        endpoint = endpoint or view_func.__name__
+        for url_rule in app.url_map.iter_rules(endpoint):
+            if url_rule.rule == rule:
+                route_registry.register(url_rule, app.view_functions.get(endpoint))
+
+    app.add_url_rule = add_and_register_url_rule
+    app.extensions[ROUTE_REGISTRY] = route_registry
+    return route_registry
+
+
 def request(schema):
     """
     Decorate a function with a request schema.
@@ -13,21 +13,29 @@ from microcosm_flask.conventions.encoding import (
     dump_response_data,
     load_query_string_data,
     load_request_data,
+    make_json_encoder,
     merge_data,
     require_response_data,
+    stream_response_data,
 )
 from microcosm_flask.conventions.registry import qs, request, response
 from microcosm_flask.namespaces import Namespace
 from microcosm_flask.operations import Operation
-from microcosm_flask.paging import Page, PaginatedList, make_paginated_list_schema
+from microcosm_flask.paging import make_list_schema_for, Page, PaginatedList
 
 
 class RelationConvention(Convention):
 
-    def __init__(self, graph, paginated_list_class=PaginatedList):
+    def __init__(self, graph, paginated_list_class=PaginatedList, page_class=Page):
+        """
+        :param paginated_list_class: the paginated list class for searches
+        :param page_class: the page class for searches; use `CursorPage` with `CursorPaginatedList`
+
+        """
         super(RelationConvention, self).__init__(graph)
 
         self.paginated_list_class = paginated_list_class
+        self.page_class = page_class
 
     def configure_createfor(self, ns, definition):
         """
@@ -41,13 +49,15 @@ class RelationConvention(Convention):
         :param definition: the endpoint definition
 
         """
+        dumper = self.dumper_for(definition.response_schema)
+
         @self.graph.route(ns.relation_path, Operation.CreateFor, ns)
         @request(definition.request_schema)
         @response(definition.response_schema)
         def create(**path_data):
             request_data = load_request_data(definition.request_schema)
             response_data = require_response_data(definition.func(**merge_data(path_data, request_data)))
-            return dump_response_data(definition.response_schema, response_data, Operation.CreateFor.value.default_code)
+            return dump_response_data(dumper, response_data, Operation.CreateFor.value.default_code)
 
         create.__doc__ = "Create a new {} relative to a {}".format(pluralize(ns.object_name), ns.subject_name)
 
@@ -89,6 +99,8 @@ class RelationConvention(Convention):
         :param definition: the endpoint definition
 
         """
+        dumper = self.dumper_for(definition.response_schema)
+
         @self.graph.route(ns.relation_path, Operation.ReplaceFor, ns)
         @request(definition.request_schema)
         @response(definition.response_schema)
@@ -96,7 +108,7 @@ class RelationConvention(Convention):
             request_data = load_request_data(definition.request_schema)
             response_data = require_response_data(definition.func(**merge_data(path_data, request_data)))
             return dump_response_data(
-                definition.response_schema,
+                dumper,
                 response_data,
                 Operation.ReplaceFor.value.default_code,
             )
@@ -118,6 +130,7 @@ class RelationConvention(Convention):
 
         """
         request_schema = definition.request_schema or Schema()
+        dumper = self.dumper_for(definition.response_schema)
 
         @self.graph.route(ns.relation_path, Operation.RetrieveFor, ns)
         @qs(request_schema)
@@ -125,7 +138,7 @@ class RelationConvention(Convention):
         def retrieve(**path_data):
             request_data = load_query_string_data(request_schema)
             response_data = require_response_data(definition.func(**merge_data(path_data, request_data)))
-            return dump_response_data(definition.response_schema, response_data)
+            return dump_response_data(dumper, response_data)
 
         retrieve.__doc__ = "Retrieve {} relative to a {}".format(pluralize(ns.object_name), ns.subject_name)
 
@@ -141,18 +154,26 @@ class RelationConvention(Convention):
 
         The definition's request_schema will be used to process query string arguments.
 
+        If `route.enable_streaming_search` is configured, the response is streamed and
+        items may be any iterable (e.g. a generator); items are dumped one at a time.
+
         :param ns: the namespace
         :param definition: the endpoint definition
 
         """
-        paginated_list_schema = make_paginated_list_schema(ns.object_ns, definition.response_schema)()
+        paginated_list_schema = make_list_schema_for(
+            self.paginated_list_class,
+            ns.object_ns,
+            definition.response_schema,
+        )()
+        dumper = self.dumper_for(paginated_list_schema)
 
         @self.graph.route(ns.relation_path, Operation.SearchFor, ns)
         @qs(definition.request_schema)
         @response(paginated_list_schema)
         def search(**path_data):
             request_data = load_query_string_data(definition.request_schema)
-            page = Page.from_query_string(request_data)
+            page = self.page_class.from_query_string(request_data)
             items, count, context = definition.func(**merge_data(path_data, request_data))
 
             response_data = self.paginated_list_class(
@@ -164,7 +185,9 @@ class RelationConvention(Convention):
                 operation=Operation.SearchFor,
                 **context
             )
-            return dump_response_data(paginated_list_schema, response_data)
+            if self.graph.config.route.enable_streaming_search:
+                return stream_response_data(response_data.iter_json(make_json_encoder()))
+            return dump_response_data(dumper, response_data)
 
         search.__doc__ = "Search for {} relative to a {}".format(pluralize(ns.object_name), ns.subject_name)
 
@@ -0,0 +1,151 @@
+"""
+Opt-in response caching for CRUD reads.
+
+A response cache is declared per namespace, alongside its CRUD mappings:
+
+    configure_crud(graph, ns, mappings, response_cache=ResponseCache(ttl=30))
+
+Successful retrieve, retrieve batch and (non-streamed) search responses are cached by
+endpoint, path data, normalized query string and selected request headers. Successful
+writes (create, update, replace, delete and their batch variants) on the same namespace
+invalidate all of its cached responses.
+
+Responses are cached in-process by default. A shared backend (e.g. a thin wrapper around
+memcached or redis) may be used instead; it must implement `get(key)` and
+`set(key, value, ttl=None)` and store picklable values. Invalidation only changes a
+per-namespace generation token, so shared backends never need to enumerate keys.
+
+Cached responses must not depend on the caller: add any header that affects the response
+(e.g. `Authorization`) to `headers`.
+
+"""
+from functools import wraps
+from hashlib import sha1
+from json import dumps
+from threading import Lock
+from uuid import uuid4
+
+from flask import request
+from werkzeug.wrappers import Response
+
+from microcosm_flask.caching import LRUCache
+
+
+RESPONSE_CACHES = "response_caches"
+
+
+class ResponseCache(object):
+    """
+    Caches responses for a namespace and counts hits, misses and invalidations.
+
+    """
+    def __init__(self, backend=None, ttl=60, maxsize=1024, headers=("X-Response-Skip-Null",), prefix=""):
+        self.backend = backend if backend is not None else LRUCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.headers = headers
+        self.prefix = prefix
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self):
+        with self.lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                invalidations=self.invalidations,
+            )
+
+    def generation_key(self, ns):
+        return "{}{}:generation".format(self.prefix, ns.collection_path)
+
+    def generation(self, ns):
+        """
+        Get the namespace's current generation token, creating one if needed.
+
+        Tokens are never reused, so responses cached before an invalidation (or before the
+        token itself was evicted) can never be served again.
+
+        """
+        key = self.generation_key(ns)
+        generation = self.backend.get(key)
+        if generation is None:
+            generation = uuid4().hex
+            self.backend.set(key, generation, ttl=self.ttl)
+        return generation
+
+    def invalidate(self, ns):
+        self.backend.set(self.generation_key(ns), uuid4().hex, ttl=self.ttl)
+        with self.lock:
+            self.invalidations += 1
+
+    def key_for(self, ns, generation, path_data):
+        """
+        Build a cache key for the current request.
+
+        """
+        parts = [
+            request.endpoint,
+            sorted((key, str(value)) for key, value in path_data.items()),
+            sorted(request.args.items(multi=True)),
+            [request.headers.get(header) for header in self.headers],
+        ]
+        digest = sha1(dumps(parts).encode("utf-8")).hexdigest()
+        return "{}{}:{}:{}".format(self.prefix, ns.collection_path, generation, digest)
+
+    def count(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def cached(self, ns, conditional=False):
+        """
+        Decorate a read endpoint so that successful responses are cached.
+
+        If `conditional` is set, cached responses still answer `If-None-Match` with 304.
+
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(**path_data):
+                # read the generation once so a concurrent write cannot be cached as current
+                key = self.key_for(ns, self.generation(ns), path_data)
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self.count(hit=True)
+                    status_code, headers, data = entry
+                    response = Response(data, status=status_code, headers=headers)
+                    if conditional:
+                        return response.make_conditional(request)
+                    return response
+
+                self.count(hit=False)
+                response = func(**path_data)
+                if all((
+                    isinstance(response, Response),
+                    response.status_code == 200,
+                    not response.is_streamed,
+                    not response.direct_passthrough,
+                )):
+                    entry = response.status_code, list(response.headers.items()), response.get_data()
+                    self.backend.set(key, entry, ttl=self.ttl)
+                return response
+            return wrapper
+        return decorator
+
+    def invalidating(self, ns):
+        """
+        Decorate a write endpoint so that success invalidates the namespace.
+
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(**path_data):
+                response = func(**path_data)
+                self.invalidate(ns)
+                return response
+            return wrapper
+        return decorator
@@ -4,12 +4,13 @@ Swagger (OpenAPI) convention.
 Exposes swagger definitions for matching operations.
 
 """
-from flask import g
+from hashlib import sha1
+
+from flask import current_app, g, request
 
 from microcosm.api import defaults
 from microcosm_flask.conventions.base import Convention
 from microcosm_flask.conventions.encoding import make_response
-from microcosm_flask.conventions.registry import iter_endpoints
 from microcosm_flask.namespaces import Namespace
 from microcosm_flask.operations import Operation
 from microcosm_flask.routing import make_path
@@ -18,6 +19,12 @@ from microcosm_flask.swagger.definitions import build_swagger
 
 class SwaggerConvention(Convention):
 
+    def __init__(self, graph):
+        super(SwaggerConvention, self).__init__(graph)
+        # encoded swagger documents and etags, keyed by request variant
+        self.documents = {}
+        self.generation = None
+
     @property
     def matching_operations(self):
         return {
@@ -32,14 +39,11 @@ class SwaggerConvention(Convention):
         Evaluated as a property to defer evaluation.
 
         """
-        def match_func(operation, ns, rule):
-            # only expose endpoints that have the correct path prefix and operation
-            return (
-                rule.rule.startswith(make_path(self.graph, swagger_ns.path)) and
-                operation in self.matching_operations
-            )
-
-        return list(iter_endpoints(self.graph, match_func))
+        # only expose endpoints that have the correct path prefix and operation
+        return self.graph.route_registry.find(
+            operations=self.matching_operations,
+            path_prefix=make_path(self.graph, swagger_ns.path),
+        )
 
     def configure_discover(self, ns, definition):
         """
@@ -48,20 +52,47 @@ class SwaggerConvention(Convention):
         """
         @self.graph.route(ns.singleton_path, Operation.Discover, ns)
         def discover():
-            swagger = build_swagger(self.graph, ns, self.find_matching_endpoints(ns))
             g.hide_body = True
-            return make_response(swagger)
+            data, etag = self.get_document(ns)
+            response = current_app.response_class(data, headers={"Content-Type": "application/json"})
+            response.set_etag(etag)
+            return response.make_conditional(request)
+
+    def get_document(self, ns):
+        """
+        Get the encoded swagger document and its etag.
+
+        The document only changes if routes are added, so it is built once (per variant
+        of response encoding) and rebuilt only when the route registry's generation changes.
+
+        """
+        generation = self.graph.route_registry.generation
+        if generation != self.generation:
+            self.documents = {}
+            self.generation = generation
+
+        key = bool(request.headers.get("X-Response-Skip-Null"))
+        try:
+            return self.documents[key]
+        except KeyError:
+            swagger = build_swagger(self.graph, ns, self.find_matching_endpoints(ns))
+            data = make_response(swagger).get_data()
+            self.documents[key] = data, sha1(data).hexdigest()
+            return self.documents[key]
 
 
 @defaults(
     name="swagger",
     operations=[
         "create",
+        "create_batch",
         "create_for",
         "delete",
+        "delete_batch",
         "replace",
         "replace_for",
         "retrieve",
+        "retrieve_batch",
         "retrieve_for",
         "search",
         "search_for",
@@ -10,6 +10,7 @@ import microcosm.opaque  # noqa
 
 @defaults(
     port=5000,
+    secret_key=None,
 )
 def configure_flask(graph):
     """
@@ -21,6 +22,8 @@ def configure_flask(graph):
     app = Flask(graph.metadata.import_name)
     app.debug = graph.metadata.debug
     app.testing = graph.metadata.testing
+    # signs sessions and pagination cursors
+    app.secret_key = graph.config.flask.secret_key
 
     # copy in the graph's configuration for non-nested keys
     app.config.update({
@@ -42,6 +45,7 @@ def configure_flask_app(graph):
         "request_context",
         "basic_auth",
         "error_handlers",
+        "json_codec",
         "logger",
         "opaque",
     )
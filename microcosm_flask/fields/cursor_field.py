@@ -0,0 +1,67 @@
+"""
+A field for opaque, signed pagination cursors.
+
+Cursors encode the sort key of the last item on a page (as a JSON list) and are signed
+with the application's secret key, so clients cannot forge or alter them.
+
+"""
+from json import dumps, loads
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from marshmallow.fields import Field, ValidationError
+
+
+CURSOR_SALT = "microcosm_flask.cursor"
+
+
+class CursorJSON(object):
+    """
+    Compact JSON for sort keys; values without a JSON type (e.g. UUIDs) become strings.
+
+    """
+    @staticmethod
+    def dumps(value):
+        return dumps(value, default=str, separators=(",", ":"))
+
+    @staticmethod
+    def loads(value):
+        return loads(value)
+
+
+def get_cursor_serializer():
+    secret_key = current_app.secret_key
+    if not secret_key:
+        raise RuntimeError("Signed cursors require a secret key; configure `flask.secret_key`")
+    return URLSafeSerializer(secret_key, salt=CURSOR_SALT, serializer=CursorJSON)
+
+
+def encode_cursor(sort_key):
+    return get_cursor_serializer().dumps(list(sort_key))
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor into its sort key.
+
+    :raises BadSignature: if the cursor was not signed by this application
+
+    """
+    return get_cursor_serializer().loads(cursor)
+
+
+class CursorField(Field):
+    """
+    Loads a cursor into its sort key (a list of values); dumps a sort key as a cursor.
+
+    """
+    def _serialize(self, value, attr, obj):
+        if value is None:
+            return None
+        return encode_cursor(value)
+
+    def _deserialize(self, value, attr, data):
+        try:
+            return decode_cursor(value)
+        except BadSignature:
+            raise ValidationError("Invalid cursor")
@@ -0,0 +1,66 @@
+"""
+A list of nested objects that are dumped in a single batch.
+
+"""
+from marshmallow.fields import List, Nested
+from six import string_types
+
+
+def can_dump_many(schema):
+    """
+    Check whether dumping a list with `many=True` is equivalent to dumping each item.
+
+    Processors registered with `pass_many=True` see the whole list instead of each item.
+
+    """
+    return not schema.many and not any(
+        pass_many and processors
+        for (tag, pass_many), processors in schema.__processors__.items()
+    )
+
+
+def dump_many(schema, items):
+    """
+    Dump a list of items in a single call, falling back to dumping each item.
+
+    """
+    if can_dump_many(schema):
+        return schema.dump(items, many=True).data
+
+    return [
+        schema.dump(item).data
+        for item in items
+    ]
+
+
+class NestedList(List):
+    """
+    A `List` of `Nested` objects.
+
+    Dumps the whole list with one `many=True` call to the nested schema instead of one call
+    per item, which avoids repeating marshmallow's per-call setup for every item.
+
+    """
+    def __init__(self, cls_or_instance, **kwargs):
+        super(NestedList, self).__init__(cls_or_instance, **kwargs)
+        if not isinstance(self.container, Nested):
+            raise ValueError("NestedList requires a Nested container")
+
+    def _serialize(self, value, attr, obj):
+        if not self.is_batchable(value):
+            return super(NestedList, self)._serialize(value, attr, obj)
+
+        data, errors = self.container.schema.dump(list(value), many=True)
+        if errors:
+            # report errors exactly as item by item serialization would
+            return super(NestedList, self)._serialize(value, attr, obj)
+        return data
+
+    def is_batchable(self, value):
+        return all((
+            isinstance(value, (list, tuple)),
+            not self.container.many,
+            # plucking a single field by name is handled per item
+            not isinstance(self.container.only, string_types),
+            can_dump_many(self.container.schema),
+        ))
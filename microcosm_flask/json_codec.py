@@ -0,0 +1,167 @@
+"""
+Pluggable JSON encoding/decoding.
+
+By default, JSON is handled by Flask (and therefore the stdlib `json` module). Faster
+backends (`orjson`, `ujson`) can be selected by configuration when they are installed:
+
+    json_codec:
+      backend: orjson
+
+Use "auto" to select the fastest installed backend. Unavailable backends fall back to
+the stdlib with a warning; values that a fast backend cannot encode (e.g. `UUID` values
+in raw data) fall back to the stdlib per call.
+
+"""
+from logging import getLogger
+
+from flask import current_app, json, jsonify, request
+
+from microcosm.api import defaults
+
+
+JSON_CODEC = "json_codec"
+
+logger = getLogger("microcosm_flask.json_codec")
+
+
+class JSONCodec(object):
+    """
+    The default codec: defers to Flask's JSON support.
+
+    """
+    name = "json"
+
+    def dumps(self, data):
+        return json.dumps(data)
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def get_json(self, silent=False):
+        """
+        Decode the current request's body, regardless of content type.
+
+        """
+        return request.get_json(force=True, silent=silent)
+
+    def jsonify(self, data):
+        return jsonify(data)
+
+
+class FastJSONCodec(JSONCodec):
+    """
+    A codec that uses a third-party backend.
+
+    """
+    def __init__(self, name, dumps, loads):
+        self.name = name
+        self._dumps = dumps
+        self._loads = loads
+
+    def dumps(self, data):
+        sort_keys = current_app.config["JSON_SORT_KEYS"]
+        try:
+            return self._dumps(data, sort_keys)
+        except (OverflowError, TypeError, ValueError):
+            return super(FastJSONCodec, self).dumps(data)
+
+    def loads(self, data):
+        return self._loads(data)
+
+    def get_json(self, silent=False):
+        try:
+            return request._cached_fast_json
+        except AttributeError:
+            pass
+
+        try:
+            data = self.loads(request.get_data(cache=True))
+        except ValueError as error:
+            if silent:
+                return None
+            return request.on_json_loading_failed(error)
+
+        request._cached_fast_json = data
+        return data
+
+    def jsonify(self, data):
+        return current_app.response_class(
+            self.dumps(data),
+            mimetype="application/json",
+        )
+
+
+def make_orjson_codec():
+    import orjson
+
+    def dumps(data, sort_keys):
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode("utf-8")
+
+    return FastJSONCodec("orjson", dumps, orjson.loads)
+
+
+def make_ujson_codec():
+    import ujson
+
+    def dumps(data, sort_keys):
+        return ujson.dumps(data, sort_keys=sort_keys, escape_forward_slashes=False, ensure_ascii=False)
+
+    return FastJSONCodec("ujson", dumps, ujson.loads)
+
+
+BACKENDS = dict(
+    json=JSONCodec,
+    orjson=make_orjson_codec,
+    ujson=make_ujson_codec,
+)
+
+# preference order when using the "auto" backend
+AUTO_BACKENDS = ["orjson", "ujson", "json"]
+
+
+def make_json_codec(backend):
+    """
+    Create a codec for a backend, falling back to the stdlib if the backend is not available.
+
+    """
+    if backend == "auto":
+        for name in AUTO_BACKENDS:
+            try:
+                return BACKENDS[name]()
+            except ImportError:
+                continue
+
+    try:
+        factory = BACKENDS[backend]
+    except KeyError:
+        raise ValueError("Unsupported JSON backend: {}".format(backend))
+
+    try:
+        return factory()
+    except ImportError:
+        logger.warning("JSON backend {} is not installed; falling back to stdlib json".format(backend))
+        return JSONCodec()
+
+
+def get_json_codec():
+    """
+    Get the codec for the current application.
+
+    """
+    return current_app.extensions.get(JSON_CODEC) or DEFAULT_JSON_CODEC
+
+
+DEFAULT_JSON_CODEC = JSONCodec()
+
+
+@defaults(
+    backend="json",
+)
+def configure_json_codec(graph):
+    """
+    Configure the JSON codec used for request decoding and response encoding.
+
+    """
+    codec = make_json_codec(graph.config.json_codec.backend)
+    graph.flask.extensions[JSON_CODEC] = codec
+    return codec
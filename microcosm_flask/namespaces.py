@@ -5,13 +5,13 @@ In conjunction with the `Operation` enum, defines a naming convention for HTTP e
 which in turn provides a discovery mechanism API routes.
 
 """
-from re import match
-
 from flask import request, url_for
 from six.moves.urllib.parse import urlencode, urljoin
 from werkzeug.exceptions import InternalServerError
 
+from microcosm_flask.caching import LRUCache
 from microcosm_flask.naming import (
+    batch_path_for,
     collection_path_for,
     instance_path_for,
     name_for,
@@ -19,6 +19,38 @@ from microcosm_flask.naming import (
     singleton_path_for,
 )
 from microcosm_flask.operations import Operation
+from microcosm_flask.url_templates import build_href
+
+
+# parsed endpoint names; bounded because endpoints are parsed for arbitrary rules
+PARSED_ENDPOINTS = LRUCache(maxsize=4096)
+
+
+def parse_endpoint_parts(endpoint):
+    """
+    Convert an endpoint name into an (operation, namespace kwargs) tuple.
+
+    Results are memoized; callers must not modify the returned kwargs.
+
+    """
+    parsed = PARSED_ENDPOINTS.get(endpoint)
+    if parsed is not None:
+        return parsed
+
+    # compute the operation
+    parts = endpoint.split(".")
+    operation = Operation.from_name(parts[1])
+
+    # extract its parts
+    matcher = operation.endpoint_regex.match(endpoint)
+    if not matcher:
+        raise InternalServerError("Malformed operation endpoint: {}".format(endpoint))
+    kwargs = matcher.groupdict()
+    del kwargs["operation"]
+
+    parsed = operation, kwargs
+    PARSED_ENDPOINTS.set(endpoint, parsed)
+    return parsed
 
 
 class Namespace(object):
@@ -88,6 +120,10 @@ class Namespace(object):
     def collection_path(self):
         return self.path + collection_path_for(self.subject)
 
+    @property
+    def batch_path(self):
+        return self.path + batch_path_for(self.subject)
+
     @property
     def instance_path(self):
         return self.path + instance_path_for(self.subject)
@@ -123,16 +159,8 @@ class Namespace(object):
         Convert an endpoint name into an (operation, ns) tuple.
 
         """
-        # compute the operation
-        parts = endpoint.split(".")
-        operation = Operation.from_name(parts[1])
-
-        # extract its parts
-        matcher = match(operation.endpoint_pattern, endpoint)
-        if not matcher:
-            raise InternalServerError("Malformed operation endpoint: {}".format(endpoint))
-        kwargs = matcher.groupdict()
-        del kwargs["operation"]
+        operation, kwargs = parse_endpoint_parts(endpoint)
+        # namespaces are mutable; always return a new instance
         return operation, Namespace(**kwargs)
 
     def url_for(self, operation, _external=True, **kwargs):
@@ -152,7 +180,9 @@ class Namespace(object):
         :parm qs: the query string dictionary, if any
         :param kwargs: additional arguments for path expansion
         """
-        url = urljoin(request.url_root, self.url_for(operation, **kwargs))
+        url = build_href(self.endpoint_for(operation), kwargs)
+        if url is None:
+            url = urljoin(request.url_root, self.url_for(operation, **kwargs))
         qs_character = "?" if url.find("?") == -1 else "&"
 
         return "{}{}".format(
@@ -36,6 +36,16 @@ def collection_path_for(name):
     )
 
 
+def batch_path_for(name):
+    """
+    Get a path for a batch of things.
+
+    """
+    return "/{}/batch".format(
+        name_for(name),
+    )
+
+
 def singleton_path_for(name):
     """
     Get a path for a singleton thing.
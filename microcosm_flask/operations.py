@@ -6,6 +6,7 @@ allowing easy construction of links or audit trails for external consumption.
 
 """
 from collections import namedtuple
+from re import compile as compile_regex
 
 from enum import Enum, unique
 
@@ -32,6 +33,9 @@ class Operation(Enum):
     # collection operations
     Search = OperationInfo("search", "GET", NODE_PATTERN, 200)
     Create = OperationInfo("create", "POST", NODE_PATTERN, 201)
+    CreateBatch = OperationInfo("create_batch", "POST", NODE_PATTERN, 201)
+    DeleteBatch = OperationInfo("delete_batch", "DELETE", NODE_PATTERN, 204)
+    RetrieveBatch = OperationInfo("retrieve_batch", "GET", NODE_PATTERN, 200)
     UpdateBatch = OperationInfo("update_batch", "PATCH", NODE_PATTERN, 200)
 
     # instance operations
@@ -54,10 +58,9 @@ class Operation(Enum):
 
     @classmethod
     def from_name(cls, name):
-        for operation in cls:
-            if operation.value.name.lower() == name.lower():
-                return operation
-        else:
+        try:
+            return OPERATIONS_BY_NAME[name.lower()]
+        except KeyError:
             raise ValueError(name)
 
     @property
@@ -71,3 +74,22 @@ class Operation(Enum):
             "(?P<{}>[^.]*)".format(part[1:-1])
             for part in parts
         )
+
+    @property
+    def endpoint_regex(self):
+        """
+        The (precompiled) regex for the operation's endpoint pattern.
+
+        """
+        return ENDPOINT_REGEXES[self]
+
+
+# lookup tables; operations are immutable so these can be computed once
+OPERATIONS_BY_NAME = {
+    operation.value.name.lower(): operation
+    for operation in Operation
+}
+ENDPOINT_REGEXES = {
+    operation: compile_regex(operation.endpoint_pattern)
+    for operation in Operation
+}
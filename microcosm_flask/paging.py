@@ -2,38 +2,160 @@
 Pagination support.
 
 """
+from functools import wraps
+from threading import Lock
+
 from marshmallow import fields, Schema
+from marshmallow.utils import missing
+from marshmallow.validate import OneOf
 
+from microcosm_flask.fields.cursor_field import CursorField, encode_cursor
+from microcosm_flask.fields.nested_list import dump_many, NestedList
 from microcosm_flask.linking import Link, Links
 from microcosm_flask.operations import Operation
 
 
+# count hints: whether a search should count all matching items exactly, estimate the
+# count, or skip counting entirely; without an exact count, search functions should
+# return one item more than the page limit (if available) to signal a next page
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+
+COUNT_HINTS = [COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE]
+
+
 class PageSchema(Schema):
     offset = fields.Integer(missing=0, default=0)
     limit = fields.Integer(missing=20, limit=20)
 
 
+class CountHintPageSchema(PageSchema):
+    """
+    A page schema that lets clients trade count accuracy for speed.
+
+    Search functions receive the hint as the `count_hint` kwarg (if given) and, unless
+    the hint is "exact", should look ahead by returning up to `limit + 1` items.
+
+    """
+    count_hint = fields.String(validate=OneOf(COUNT_HINTS))
+
+
+class CursorPageSchema(Schema):
+    cursor = CursorField()
+    limit = fields.Integer(missing=20, default=20)
+
+
+def memoize_list_schema(func):
+    """
+    Memoize a list schema factory by namespace subject name and item schema.
+
+    Item schemas are compared by identity: options (`only`, `extra`, `context`, ...) and
+    custom constructor state affect dump output, so only the same class or instance is
+    known to be equivalent. Generated schema classes are reused (and never evicted), so
+    that each subject has one list schema class per item schema, no matter how many
+    endpoints (or object graphs) use it.
+
+    """
+    schemas = {}
+    lock = Lock()
+
+    @wraps(func)
+    def wrapper(ns, item_schema):
+        key = (ns.subject_name, item_schema)
+        with lock:
+            try:
+                return schemas[key]
+            except KeyError:
+                schema = schemas[key] = func(ns, item_schema)
+                return schema
+
+    wrapper.schemas = schemas
+    wrapper.uncached = func
+    return wrapper
+
+
+class CountedListSchema(Schema):
+    """
+    Base schema for paginated lists; counts that are not known are omitted (not null).
+
+    """
+    count = fields.Integer(description="The number of items (omitted if not counted)")
+    count_estimated = fields.Boolean(description="Whether the number of items is an estimate")
+
+    def get_attribute(self, attr, obj, default):
+        value = super(CountedListSchema, self).get_attribute(attr, obj, default)
+        if value is None and attr in ("count", "count_estimated"):
+            return missing
+        return value
+
+
+@memoize_list_schema
 def make_paginated_list_schema(ns, item_schema):
     """
     Generate a paginated list schema.
 
+    Schemas are memoized; see `memoize_list_schema`.
+
     :param ns: a `Namespace` for the list's item type
     :param item_schema: a `Schema` for the list's item type
 
     """
 
-    class PaginatedListSchema(Schema):
+    class PaginatedListSchema(CountedListSchema):
         __alias__ = "{}_list".format(ns.subject_name)
 
         offset = fields.Integer(required=True)
         limit = fields.Integer(required=True)
-        count = fields.Integer(required=True)
-        items = fields.List(fields.Nested(item_schema), required=True)
+        items = NestedList(fields.Nested(item_schema), required=True)
         _links = fields.Raw()
 
     return PaginatedListSchema
 
 
+@memoize_list_schema
+def make_cursor_paginated_list_schema(ns, item_schema):
+    """
+    Generate a (cursor) paginated list schema.
+
+    Schemas are memoized; see `memoize_list_schema`.
+
+    :param ns: a `Namespace` for the list's item type
+    :param item_schema: a `Schema` for the list's item type
+
+    """
+
+    class CursorPaginatedListSchema(CountedListSchema):
+        __alias__ = "{}_cursor_list".format(ns.subject_name)
+
+        cursor = fields.String()
+        limit = fields.Integer(required=True)
+        items = NestedList(fields.Nested(item_schema), required=True)
+        _links = fields.Raw()
+
+    return CursorPaginatedListSchema
+
+
+@memoize_list_schema
+def make_batch_list_schema(ns, item_schema):
+    """
+    Generate a (non-paginated) list schema for batches of items.
+
+    Schemas are memoized; see `memoize_list_schema`.
+
+    :param ns: a `Namespace` for the list's item type
+    :param item_schema: a `Schema` for the list's item type
+
+    """
+
+    class BatchListSchema(Schema):
+        __alias__ = "{}_batch_list".format(ns.subject_name)
+
+        items = NestedList(fields.Nested(item_schema), required=True)
+
+    return BatchListSchema
+
+
 class Page(object):
 
     def __init__(self, offset, limit, **rest):
@@ -89,6 +211,60 @@ class Page(object):
         ]
 
 
+class CursorPage(object):
+    """
+    A page of items after a cursor (the sort key of the last item on the previous page).
+
+    Unlike offsets, cursors let the backing store seek directly to the start of a page.
+
+    """
+    def __init__(self, cursor, limit, **rest):
+        self.cursor = cursor
+        self.limit = limit
+        self.rest = rest
+
+    @classmethod
+    def from_query_string(cls, qs):
+        """
+        Create a page from a query string dictionary.
+
+        This dictionary should probably come from `CursorPageSchema`; cursors are
+        therefore already verified and decoded.
+
+        """
+        dct = qs.copy()
+        cursor = dct.pop("cursor", None)
+        limit = dct.pop("limit", None)
+        return cls(
+            cursor=cursor,
+            limit=limit,
+            **dct
+        )
+
+    def next(self, sort_key):
+        return CursorPage(
+            cursor=sort_key,
+            limit=self.limit,
+            **self.rest
+        )
+
+    def to_dict(self):
+        return dict(self.to_tuples())
+
+    def to_tuples(self):
+        """
+        Convert to tuples for deterministic order when passed to urlencode.
+
+        """
+        cursor = [("cursor", encode_cursor(self.cursor))] if self.cursor is not None else []
+        return cursor + [
+            ("limit", self.limit),
+        ] + [
+            (key, str(self.rest[key]))
+            for key in sorted(self.rest.keys())
+        ]
+
+
 class PaginatedList(object):
 
     def __init__(self,
@@ -107,16 +283,112 @@ class PaginatedList(object):
         self.operation = operation
         self.extra = extra
 
+        if self.lookahead:
+            # the search function fetched (up to) one extra item to detect a next page
+            items = list(items)
+            self.has_more = len(items) > self.page.limit
+            self.items = items[:self.page.limit]
+
+    @classmethod
+    def make_schema(cls, ns, item_schema):
+        return make_paginated_list_schema(ns, item_schema)
+
+    @property
+    def lookahead(self):
+        return self.page.rest.get("count_hint", COUNT_EXACT) != COUNT_EXACT
+
+    @property
+    def count_is_exact(self):
+        return self.count is not None and not self.lookahead
+
+    @property
+    def count_estimated(self):
+        """
+        True if there is a count that is not exact; None (omitted) otherwise.
+
+        """
+        if self.count is None or self.count_is_exact:
+            return None
+        return True
+
+    def count_tuples(self):
+        """
+        Describe the count: omitted if not counted, flagged if not exact.
+
+        """
+        return [
+            (key, value)
+            for key, value in (("count", self.count), ("count_estimated", self.count_estimated))
+            if value is not None
+        ]
+
+    @property
+    def has_next(self):
+        """
+        Whether there is (or may be) a next page.
+
+        Without an exact count, the extra (lookahead) item indicates a successor; failing
+        that, a full page is assumed to have one.
+
+        """
+        if self.count_is_exact:
+            return self.page.offset + self.page.limit < self.count
+        if self.lookahead:
+            return self.has_more
+        try:
+            return len(self.items) >= self.page.limit
+        except TypeError:
+            # items are not materialized (e.g. when streaming)
+            return True
+
     def to_dict(self):
-        return dict(
-            count=self.count,
-            items=[
-                self.schema.dump(item).data if self.schema else item
-                for item in self.items
-            ],
+        dct = dict(
+            items=self.dump_items(),
             _links=self._links,
             **self.page.to_dict()
         )
+        dct.update(self.count_tuples())
+        return dct
+
+    def dump_items(self):
+        """
+        Dump all items, in a single batch if the schema allows.
+
+        """
+        if isinstance(self.schema, Schema):
+            return dump_many(self.schema, list(self.items))
+
+        return [
+            self.dump_item(item)
+            for item in self.items
+        ]
+
+    def dump_item(self, item):
+        return self.schema.dump(item).data if self.schema else item
+
+    def iter_json(self, encode):
+        """
+        Generate the JSON encoding of this list incrementally.
+
+        Paging metadata is written first; items are then dumped and encoded one at a
+        time as they are consumed from `items`, so that the items iterable (e.g. a
+        generator or a server-side cursor) is never materialized in full.
+
+        :param encode: a function that encodes a value as a JSON string
+
+        """
+        yield "{"
+        for key, value in self.page.to_tuples() + self.count_tuples() + [
+            ("_links", self._links),
+        ]:
+            yield "{}: {}, ".format(encode(key), encode(value))
+
+        yield "{}: [".format(encode("items"))
+        for index, item in enumerate(self.items):
+            if index:
+                yield ", "
+            yield encode(self.dump_item(item))
+        yield "]}"
 
     @property
     def offset(self):
@@ -134,8 +406,84 @@ class PaginatedList(object):
     def links(self):
         links = Links()
         links["self"] = Link.for_(self.operation, self.ns, qs=self.page.to_tuples(), **self.extra)
-        if self.page.offset + self.page.limit < self.count:
+        if self.has_next:
             links["next"] = Link.for_(self.operation, self.ns, qs=self.page.next().to_tuples(), **self.extra)
         if self.page.offset > 0:
             links["prev"] = Link.for_(self.operation, self.ns, qs=self.page.prev().to_tuples(), **self.extra)
         return links
+
+
+def make_list_schema_for(paginated_list_class, ns, item_schema):
+    """
+    Generate the list schema for a paginated list class.
+
+    Classes without `make_schema` (e.g. that do not extend `PaginatedList`) use
+    `make_paginated_list_schema`.
+
+    """
+    make_schema = getattr(paginated_list_class, "make_schema", make_paginated_list_schema)
+    return make_schema(ns, item_schema)
+
+
+class CursorPaginatedList(PaginatedList):
+    """
+    A paginated list for a `CursorPage`.
+
+    The `next` link carries the sort key of the last item, as given by `sort_attributes`;
+    search functions receive it as the `cursor` kwarg (a list of values, with non-JSON
+    values such as UUIDs as strings) and should return the items that sort after it.
+
+    Items are materialized, since the `next` link depends on the last one.
+
+    """
+    sort_attributes = ("id",)
+
+    def __init__(self,
+                 ns,
+                 page,
+                 items,
+                 count=None,
+                 schema=None,
+                 operation=Operation.Search,
+                 **extra):
+        super(CursorPaginatedList, self).__init__(
+            ns,
+            page,
+            list(items),
+            count,
+            schema=schema,
+            operation=operation,
+            **extra
+        )
+
+    @classmethod
+    def make_schema(cls, ns, item_schema):
+        return make_cursor_paginated_list_schema(ns, item_schema)
+
+    @property
+    def cursor(self):
+        return encode_cursor(self.page.cursor) if self.page.cursor is not None else None
+
+    @property
+    def offset(self):
+        return None
+
+    @property
+    def has_next(self):
+        if self.lookahead:
+            return self.has_more
+        return bool(self.items) and len(self.items) >= self.page.limit
+
+    def sort_key(self, item):
+        if isinstance(item, dict):
+            return [item[attribute] for attribute in self.sort_attributes]
+        return [getattr(item, attribute) for attribute in self.sort_attributes]
+
+    @property
+    def links(self):
+        links = Links()
+        links["self"] = Link.for_(self.operation, self.ns, qs=self.page.to_tuples(), **self.extra)
+        if self.has_next:
+            next_page = self.page.next(self.sort_key(self.items[-1]))
+            links["next"] = Link.for_(self.operation, self.ns, qs=next_page.to_tuples(), **self.extra)
+        return links
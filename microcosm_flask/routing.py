@@ -20,7 +20,10 @@ def make_path(graph, path):
     ],
     enable_audit=True,
     enable_basic_auth=False,
+    enable_compiled_dumpers=False,
     enable_cors=True,
+    enable_etags=False,
+    enable_streaming_search=False,
     log_with_context=True,
     path_prefix="/api",
 )
@@ -40,6 +43,9 @@ def configure_route_decorator(graph):
     """
     # routes depends on converters
     graph.use(*graph.config.route.converters)
+    # the route registry indexes rules as they are added, so that conventions can
+    # find routes without scanning the url map
+    graph.use("route_registry")
 
     def route(path, operation, ns):
         """
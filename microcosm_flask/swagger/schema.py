@@ -8,8 +8,10 @@ from six import string_types
 from marshmallow import fields
 
 from microcosm_flask.fields import (
+    CursorField,
     EnumField,
     LanguageField,
+    NestedList,
     QueryStringList,
     URIField,
 )
@@ -22,8 +24,10 @@ logger = getLogger("microcosm_flask.swagger")
 
 # see: https://github.com/marshmallow-code/apispec/blob/dev/apispec/ext/marshmallow/swagger.py
 FIELD_MAPPINGS = {
+    CursorField: ("string", None),
     EnumField: (None, None),
     LanguageField: ("string", "language"),
+    NestedList: ("array", None),
     QueryStringList: ("array", None),
     URIField: ("string", "uri"),
     fields.Boolean: ("boolean", None),
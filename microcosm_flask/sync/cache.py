@@ -0,0 +1,95 @@
+"""
+Conditional fetch support for pulls.
+
+"""
+from json import dumps, loads
+from logging import getLogger
+from os import rename
+from os.path import exists
+from threading import Lock
+
+
+logger = getLogger("sync.cache")
+
+
+class ResponseCache(object):
+    """
+    Caches the validators (ETag and Last-Modified) and bodies of fetched resources by URI.
+
+    Repeated pulls send conditional GETs; a 304 response reuses the cached body, so
+    unchanged resources cost a round trip but no transfer or encoding on the server.
+
+    The cache is stored as JSON lines (one `{uri: entry}` object per line) and only keeps
+    URIs fetched by the most recent pull.
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self.previous = {}
+        self.entries = {}
+        self.lock = Lock()
+        self.unchanged = 0
+        self.changed = 0
+
+        if exists(path):
+            with open(path) as file_:
+                for line in file_:
+                    if line.strip():
+                        self.previous.update(loads(line))
+            logger.info("Loaded {} cached responses".format(len(self.previous)))
+
+    def headers_for(self, uri):
+        """
+        Build conditional request headers for a URI.
+
+        """
+        entry = self.previous.get(uri)
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def hit(self, uri):
+        """
+        Reuse the cached body for a URI that was not modified.
+
+        """
+        entry = self.previous[uri]
+        with self.lock:
+            self.entries[uri] = entry
+            self.unchanged += 1
+        logger.debug("Resource not modified: {}".format(uri))
+        return entry["data"]
+
+    def store(self, uri, headers, data):
+        """
+        Record the body of a (modified) response if it can be revalidated later.
+
+        """
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        with self.lock:
+            self.changed += 1
+            if etag or last_modified:
+                self.entries[uri] = dict(
+                    etag=etag,
+                    last_modified=last_modified,
+                    data=data,
+                )
+
+    def save(self):
+        """
+        Write the cache atomically (replacing the previous one).
+
+        """
+        temporary_path = "{}.tmp".format(self.path)
+        with open(temporary_path, "w") as file_:
+            for uri, entry in self.entries.items():
+                file_.write(dumps({uri: entry}, default=str))
+                file_.write("\n")
+        rename(temporary_path, self.path)
+        logger.info("Fetched {} changed and {} unchanged resources".format(self.changed, self.unchanged))
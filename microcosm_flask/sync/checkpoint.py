@@ -0,0 +1,76 @@
+"""
+Checkpointing for resumable pushes.
+
+"""
+from logging import getLogger
+from os.path import exists
+from threading import Lock
+
+
+logger = getLogger("sync.checkpoint")
+
+
+class Checkpoint(object):
+    """
+    Records the hrefs of pushed resources in an append-only file.
+
+    Hrefs are written in batches so that checkpoint I/O stays off the critical path; if
+    a sync is killed before a batch is written, those resources are pushed again (which
+    is safe because pushes use PUT/PATCH replace semantics).
+
+    """
+    def __init__(self, path, resume=False, flush_size=1000):
+        self.path = path
+        self.flush_size = flush_size
+        self.completed = set()
+        self.pending = []
+        self.lock = Lock()
+
+        if resume and exists(path):
+            with open(path) as file_:
+                self.completed.update(line.strip() for line in file_ if line.strip())
+            logger.info("Resuming after {} pushed resources".format(len(self.completed)))
+
+        self.file_ = open(path, "a" if resume else "w")
+
+    def __contains__(self, href):
+        return href in self.completed
+
+    def __len__(self):
+        return len(self.completed)
+
+    def add(self, hrefs):
+        """
+        Record hrefs as pushed.
+
+        """
+        with self.lock:
+            self.completed.update(hrefs)
+            self.pending.extend(hrefs)
+            if len(self.pending) >= self.flush_size:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        self.file_.write("".join("{}\n".format(href) for href in self.pending))
+        self.file_.flush()
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        self.file_.close()
+
+    def skip_completed(self, inputs):
+        """
+        Filter out (href, resource) pairs that have already been pushed.
+
+        """
+        for href, resource in inputs:
+            if href in self.completed:
+                continue
+            yield href, resource
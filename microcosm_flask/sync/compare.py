@@ -1,27 +1,74 @@
 """
-Compare resources from two YAML files.
+Compare resources from two YAML (or JSON lines) files.
 
 Useful for validating that a sync in/out retains the same state.
 
 """
+from __future__ import print_function
+
 from argparse import ArgumentParser
+from hashlib import sha1
+from json import dumps
+
+from microcosm_flask.sync.formats import get_format, load
 
-from yaml import load_all
+
+def iter_resources(path):
+    """
+    Iterate over (href, resource) pairs, parsing one resource at a time.
+
+    """
+    with open(path) as file_:
+        for href, resource in load(file_, get_format(path)):
+            yield href, resource
 
 
-def to_dict(path):
+def digest(resource):
     """
-    Normalize each resource as a dictionary for smarter comparison.
+    Compute a digest of a resource's content.
 
     Relies on link sorting performed by the pull script.
 
     """
-    with open(path) as file_:
-        return {
-            key: value
-            for dct in load_all(file_)
-            for key, value in dct.items()
-        }
+    return sha1(dumps(resource, sort_keys=True, default=str).encode("utf-8")).digest()
+
+
+def to_index(path):
+    """
+    Index each resource's content digest by href.
+
+    Only digests are kept in memory, so memory use depends on the number of resources,
+    not on their size.
+
+    """
+    return {
+        href: digest(resource)
+        for href, resource in iter_resources(path)
+    }
+
+
+def compare(left, right):
+    """
+    Compare two indexes.
+
+    :returns: a tuple of sorted hrefs that are only in the left, only in the right,
+              and in both but with different values
+
+    """
+    only_left = sorted(href for href in left if href not in right)
+    only_right = sorted(href for href in right if href not in left)
+    different = sorted(
+        href
+        for href, value in left.items()
+        if href in right and right[href] != value
+    )
+    return only_left, only_right, different
+
+
+def report(label, hrefs):
+    print("{}: {}".format(label, len(hrefs)))  # noqa
+    for href in hrefs:
+        print(" - {}".format(href))  # noqa
 
 
 def main():
@@ -30,28 +77,14 @@ def main():
     parser.add_argument("right")
     args = parser.parse_args()
 
-    left, right = to_dict(args.left), to_dict(args.right)
-
-    left_keys = set(left.keys())
-    right_keys = set(right.keys())
-    if left_keys != right_keys:
-        print "Only in left:"  # noqa
-        for key in left_keys - right_keys:
-            print " - {}".format(key)  # noqa
-        print "Only in right:"  # noqa
-        for key in right_keys - left_keys:
-            print " - {}".format(key)  # noqa
-        exit(1)
+    only_left, only_right, different = compare(to_index(args.left), to_index(args.right))
+
+    report("Only in left", only_left)
+    report("Only in right", only_right)
+    report("Different values", different)
 
-    for key in left.keys():
-        if left[key] != right[key]:
-            print "Different values for: {}".format(key)  # noqa
-            print "-" * 20  # noqa
-            print "Left:"  # noqa
-            print left[key]  # noqa
-            print "Right:"  # noqa
-            print right[key]  # noqa
-            exit(1)
+    if only_left or only_right or different:
+        exit(1)
 
 
 if __name__ == '__main__':
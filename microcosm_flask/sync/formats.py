@@ -0,0 +1,95 @@
+"""
+File formats for resource definitions.
+
+Supports:
+
+ -  YAML: one `{href: resource}` document per resource; uses libyaml if available
+ -  JSON lines: one `{href: resource}` object per line
+
+Both formats are read and written incrementally.
+
+"""
+from json import dumps, loads
+
+from yaml import dump_all, load_all
+
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+
+JSONL = "jsonl"
+YAML = "yaml"
+
+EXTENSIONS = {
+    ".jsonl": JSONL,
+    ".ndjson": JSONL,
+}
+
+
+def get_format(path, format_=None):
+    """
+    Select a format explicitly or by file extension, defaulting to YAML.
+
+    """
+    if format_:
+        return format_
+    for extension, extension_format in EXTENSIONS.items():
+        if path.endswith(extension):
+            return extension_format
+    return YAML
+
+
+def load_yaml(source):
+    for dct in load_all(source, Loader=SafeLoader):
+        for item in dct.items():
+            yield item
+
+
+def dump_yaml(inputs, destination):
+    dump_all(
+        ({href: resource} for href, resource in inputs),
+        destination,
+        Dumper=SafeDumper,
+    )
+
+
+def load_jsonl(source):
+    for line in source:
+        if line.strip():
+            for item in loads(line).items():
+                yield item
+
+
+def dump_jsonl(inputs, destination):
+    for href, resource in inputs:
+        destination.write(dumps({href: resource}, default=str))
+        destination.write("\n")
+
+
+LOADERS = {
+    JSONL: load_jsonl,
+    YAML: load_yaml,
+}
+
+DUMPERS = {
+    JSONL: dump_jsonl,
+    YAML: dump_yaml,
+}
+
+
+def load(source, format_=YAML):
+    """
+    Iterate over (href, resource) pairs in a file-like object.
+
+    """
+    return LOADERS[format_](source)
+
+
+def dump(inputs, destination, format_=YAML):
+    """
+    Write (href, resource) pairs to a file-like object.
+
+    """
+    DUMPERS[format_](inputs, destination)
@@ -9,6 +9,7 @@ from argparse import ArgumentParser
 from logging import basicConfig, DEBUG, ERROR, getLogger, INFO, WARN
 import re
 
+from microcosm_flask.sync.formats import JSONL, YAML
 from microcosm_flask.sync.pull import pull
 from microcosm_flask.sync.push import push
 from microcosm_flask.sync.toposort import toposorted
@@ -66,6 +67,42 @@ def parse_args():
         "--enable-sessions",
         action="store_true",
     )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=1,
+        help="Number of resources to fetch concurrently when pulling from a server",
+    )
+    parser.add_argument(
+        "--cache",
+        help="Cache ETag/Last-Modified values and send conditional requests when pulling from a server",
+    )
+    parser.add_argument(
+        "--push-concurrency",
+        type=int,
+        default=1,
+        help="Number of requests to send concurrently when pushing to a server (one topological level at a time)",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Send large request bodies gzip-encoded when pushing to a server (requires backend support)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Record pushed resources in a checkpoint file (when pushing to a server)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip resources recorded as pushed in the checkpoint file",
+    )
+    parser.add_argument(
+        "--format",
+        choices=[JSONL, YAML],
+        help="File format for input and output files (default: by file extension, otherwise YAML)",
+    )
     parser.add_argument(
         "input",
         help="Input location for resources",
@@ -74,7 +111,10 @@ def parse_args():
         "output",
         help="Output location for resources",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error("--resume requires --checkpoint")
+    return args
 
 
 def set_relation_patterns(args):
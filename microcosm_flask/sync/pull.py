@@ -2,11 +2,15 @@
 Pull resource definitions from an input source.
 
 """
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
 from sys import stdin
 
-from requests import get
-from yaml import load_all
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+from microcosm_flask.sync.cache import ResponseCache
+from microcosm_flask.sync.formats import get_format, load, YAML
 
 
 logger = getLogger("sync.pull")
@@ -54,42 +58,126 @@ def sort_links(resource):
     return resource
 
 
-def pull_json(args, base_url):
+class Fetcher(object):
+    """
+    Fetch JSON resources on a bounded worker pool over a shared (keep-alive) session.
+
+    URIs are prefetched in the order in which they will be consumed, so callers see
+    exactly the same results (and errors) as if each URI were fetched when needed.
+
+    If a response cache is given, fetches are conditional on the cached validators.
+
+    """
+    def __init__(self, concurrency=1, session=None, cache=None):
+        self.concurrency = max(concurrency, 1)
+        self.session = session or make_session(self.concurrency)
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        # fetches that have been started but not consumed; bounded by the concurrency
+        self.futures = {}
+
+    def get(self, uri):
+        logger.info("Fetching resource URI: {}".format(uri))
+        if self.cache is None:
+            response = self.session.get(uri)
+            response.raise_for_status()
+            return response.json()
+
+        response = self.session.get(uri, headers=self.cache.headers_for(uri))
+        if response.status_code == 304:
+            return self.cache.hit(uri)
+        response.raise_for_status()
+        data = response.json()
+        self.cache.store(uri, response.headers, data)
+        return data
+
+    def prefetch(self, uris):
+        """
+        Start fetching URIs that will be needed soon.
+
+        """
+        for uri in uris:
+            if len(self.futures) >= self.concurrency:
+                break
+            if uri not in self.futures:
+                self.futures[uri] = self.executor.submit(self.get, uri)
+
+    def fetch(self, uri):
+        future = self.futures.pop(uri, None)
+        if future is None:
+            future = self.executor.submit(self.get, uri)
+        return future.result()
+
+    def close(self):
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
+        self.executor.shutdown(wait=False)
+
+
+def make_session(concurrency):
+    """
+    Create a session with enough pooled connections for each worker.
+
+    Sessions negotiate (and transparently decode) gzip/deflate response compression.
+
+    """
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def pull_json(args, base_url, session=None):
     """
     Pull JSON resources by spidering a base url.
 
+    Resources are fetched by up to `args.concurrency` workers; the output order does
+    not depend on the concurrency.
+
+    If `args.cache` is set, fetches are conditional on the ETag/Last-Modified values from
+    the previous pull and the cache is updated once the pull completes.
+
     """
     exclude_first = args.exclude_first
     stack = [base_url]
+    cache = ResponseCache(args.cache) if args.cache else None
+    fetcher = Fetcher(args.concurrency, session, cache)
 
     seen = set()
-    while stack:
-        uri = stack.pop()
-
-        logger.info("Fetching resource URI: {}".format(uri))
-        response = get(uri)
-        response.raise_for_status()
-        data = response.json()
+    try:
+        while stack:
+            uri = stack.pop()
+            data = fetcher.fetch(uri)
+
+            for href, resource in iter_resources(data):
+                if exclude_first:
+                    # skipping the first resource - if it's a discovery resource - avoids
+                    # pushing back state that cannot be persisted
+                    exclude_first = False
+                    continue
+                sort_links(resource)
+                for relation, links in iter_links(resource):
+                    if href not in seen and any(pattern.match(relation) for pattern in args.relation_patterns):
+                        seen.add(href)
+                        stack.append(href)
+                yield href, resource
 
-        for href, resource in iter_resources(data):
-            if exclude_first:
-                # skipping the first resource - if it's a discovery resource - avoids
-                # pushing back state that cannot be persisted
-                exclude_first = False
-                continue
-            sort_links(resource)
-            for relation, links in iter_links(resource):
+            for relation, link in iter_links(data):
+                href = link["href"]
+                # follow top-level search links and pagination next links
                 if href not in seen and any(pattern.match(relation) for pattern in args.relation_patterns):
                     seen.add(href)
                     stack.append(href)
-            yield href, resource
 
-        for relation, link in iter_links(data):
-            href = link["href"]
-            # follow top-level search links and pagination next links
-            if href not in seen and any(pattern.match(relation) for pattern in args.relation_patterns):
-                seen.add(href)
-                stack.append(href)
+            # the top of the stack is fetched next
+            fetcher.prefetch(reversed(stack))
+
+        if cache is not None:
+            cache.save()
+    finally:
+        fetcher.close()
 
 
 def pull_yaml(args, source):
@@ -97,21 +185,29 @@ def pull_yaml(args, source):
     Pull YAML resources from a file-like object.
 
     """
-    for dct in load_all(source):
-        for item in dct.items():
-            yield item
+    for item in load(source, YAML):
+        yield item
+
+
+def pull_file(args, source, path):
+    """
+    Pull resources from a (YAML or JSON lines) file-like object.
+
+    """
+    for item in load(source, get_format(path, args.format)):
+        yield item
 
 
 def pull(args):
     logger.info("Pulling resources from: {}".format(args.input))
 
     if args.input == "-":
-        for href, resource in pull_yaml(args, stdin):
+        for href, resource in pull_file(args, stdin, args.input):
             yield href, resource
     elif args.input.startswith("http"):
         for href, resource in pull_json(args, args.input):
             yield href, resource
     else:
         with open(args.input) as file_:
-            for href, resource in pull_yaml(args, file_):
+            for href, resource in pull_file(args, file_, args.input):
                 yield href, resource
@@ -2,18 +2,29 @@
 Push resource definitions to an output destination.
 
 """
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from json import dumps
 from logging import getLogger
+from random import uniform
 from sys import stdout
+from threading import local, Lock
+from time import sleep, time
 
 import requests
 from requests.exceptions import ConnectionError, HTTPError
 from six.moves.urllib.parse import urlparse, urlunparse
-from yaml import safe_dump_all
+from microcosm_flask.compression import gzip_compress
+from microcosm_flask.sync.checkpoint import Checkpoint
+from microcosm_flask.sync.formats import dump, get_format, YAML
+from microcosm_flask.sync.toposort import iter_levels
 
 
 logger = getLogger("sync.push")
 
+# request bodies smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
 
 def push_yaml(inputs, destination):
     """
@@ -23,55 +34,226 @@ def push_yaml(inputs, destination):
     :param destination: a writable file-like object
 
     """
-    safe_dump_all(({href: resource} for href, resource in inputs), destination)
+    dump(inputs, destination, YAML)
+
+
+def push_file(inputs, destination, format_):
+    """
+    Write inputs to destination as YAML or JSON lines.
 
+    :param inputs: an iterable of (href, resource) pairs
+    :param destination: a writable file-like object
+    :param format_: the file format
 
-def push_json(inputs, base_url, batch_size, enable_sessions=False,  keep_instance_path=False, max_attempts=2):
+    """
+    dump(inputs, destination, format_)
+
+
+def push_json(inputs, base_url, batch_size, enable_sessions=False,  keep_instance_path=False, max_attempts=2,
+              concurrency=1, backoff=0.1, checkpoint=None, compress=False):
     """
     Write inputs to remote URL as JSON.
 
     Future implementations could perform paginated PATCH requests to a collection URI
     if our conventions support it.
 
+    If a `Checkpoint` is given, resources that it records as pushed are skipped and
+    newly pushed resources are recorded.
+
+    If `compress` is set, large request bodies are sent gzip-encoded.
+
     """
+    if checkpoint is not None:
+        inputs = checkpoint.skip_completed(inputs)
+
     # either use a session or use plain requests
     session_factory = requests.Session if enable_sessions else lambda: requests
 
+    if concurrency > 1:
+        pusher = ParallelPusher(
+            concurrency,
+            batch_size,
+            max_attempts,
+            backoff,
+            session_factory=session_factory,
+            checkpoint=checkpoint,
+            compress=compress,
+        )
+        return pusher.push(inputs, base_url, keep_instance_path)
+
     session = session_factory()
-    for uri, resources in iter_json_batches(inputs, base_url, batch_size, keep_instance_path):
-        # retry on connection failures
-        last_error = None
-        for attempt in range(max_attempts):
-            try:
-                if batch_size == 1:
-                    push_resource_json(session, uri, resources[0])
-                else:
-                    push_resource_json_batch(session, uri, resources)
-            except ConnectionError as error:
-                logger.info("Connection error for uri: {}: {}".format(uri, error))
+    try:
+        for uri, hrefs, resources in iter_json_href_batches(inputs, base_url, batch_size, keep_instance_path):
+            session = push_batch(
+                session,
+                session_factory,
+                uri,
+                resources,
+                batch_size,
+                max_attempts,
+                backoff,
+                compress,
+            )
+            if checkpoint is not None:
+                checkpoint.add(hrefs)
+    finally:
+        if checkpoint is not None:
+            checkpoint.flush()
+
+
+def push_batch(session, session_factory, uri, resources, batch_size, max_attempts, backoff, compress=False):
+    """
+    Push a batch of resources, retrying on connection failures and gateway errors.
+
+    Retries back off exponentially with (full) jitter.
+
+    :returns: the session to use for subsequent requests
+
+    """
+    last_error = None
+    for attempt in range(max_attempts):
+        if attempt and backoff:
+            sleep(uniform(0, backoff * 2 ** (attempt - 1)))
+        try:
+            if batch_size == 1:
+                push_resource_json(session, uri, resources[0], compress)
+            else:
+                push_resource_json_batch(session, uri, resources, compress)
+        except ConnectionError as error:
+            logger.info("Connection error for uri: {}: {}".format(uri, error))
+            # on connection failure, recreate the session
+            session = session_factory()
+            last_error = error
+            continue
+        except HTTPError as error:
+            if error.response.status_code in (504, 502):
+                logger.info("HTTP error for uri: {}: {}".format(uri, error))
                 # on connection failure, recreate the session
                 session = session_factory()
                 last_error = error
                 continue
-            except HTTPError as error:
-                if error.response.status_code in (504, 502):
-                    logger.info("HTTP error for uri: {}: {}".format(uri, error))
-                    # on connection failure, recreate the session
-                    session = session_factory()
-                    last_error = error
-                    continue
-                raise
-            else:
-                break
+            raise
         else:
-            # If reached here, all attempts were unsuccessful - raise last error encountered
-            raise last_error
+            return session
+
+    # If reached here, all attempts were unsuccessful - raise last error encountered
+    raise last_error
+
+
+class ParallelPusher(object):
+    """
+    Push resources one topological level at a time across a pool of workers.
+
+    Each worker reuses its own session (and therefore its own connections) if the session
+    factory creates sessions. At most `2 * concurrency` batches are read ahead of the
+    workers, so a level's resources are not all held in memory at once.
+
+    """
+    def __init__(self, concurrency, batch_size, max_attempts=2, backoff=0.1, session_factory=requests.Session,
+                 checkpoint=None, compress=False):
+        self.concurrency = concurrency
+        self.checkpoint = checkpoint
+        self.compress = compress
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.session_factory = session_factory
+        self.sessions = local()
+        self.lock = Lock()
+        self.in_flight = 0
+        # the largest number of requests in flight, for the current level and overall
+        self.level_max_in_flight = 0
+        self.max_in_flight = 0
+
+    def push(self, inputs, base_url, keep_instance_path):
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        start_time, total = time(), 0
+        try:
+            for depth, level in enumerate(iter_levels(inputs)):
+                total += self.push_level(executor, depth, level, base_url, keep_instance_path)
+        finally:
+            executor.shutdown(wait=False)
+            if self.checkpoint is not None:
+                self.checkpoint.flush()
+
+        elapsed = time() - start_time
+        logger.info("Pushed {} resources in {:.2f}s ({:.1f}/s) with up to {} requests in flight".format(
+            total,
+            elapsed,
+            total / elapsed if elapsed else 0.0,
+            self.max_in_flight,
+        ))
+
+    def push_level(self, executor, depth, level, base_url, keep_instance_path):
+        """
+        Push all resources in a level, waiting for all of them to complete.
+
+        """
+        start_time = time()
+        self.level_max_in_flight = 0
+        count = 0
+        futures = deque()
+        try:
+            for uri, hrefs, resources in iter_json_href_batches(level, base_url, self.batch_size, keep_instance_path):
+                if len(futures) >= 2 * self.concurrency:
+                    futures.popleft().result()
+                futures.append(executor.submit(self.push_batch, uri, hrefs, resources))
+                count += len(resources)
+            while futures:
+                futures.popleft().result()
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+        elapsed = time() - start_time
+        logger.info("Pushed level {}: {} resources in {:.2f}s ({:.1f}/s) with up to {} requests in flight".format(
+            depth,
+            count,
+            elapsed,
+            count / elapsed if elapsed else 0.0,
+            self.level_max_in_flight,
+        ))
+        return count
+
+    def push_batch(self, uri, hrefs, resources):
+        with self.lock:
+            self.in_flight += 1
+            self.level_max_in_flight = max(self.level_max_in_flight, self.in_flight)
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            session = getattr(self.sessions, "session", None) or self.session_factory()
+            self.sessions.session = push_batch(
+                session,
+                self.session_factory,
+                uri,
+                resources,
+                self.batch_size,
+                self.max_attempts,
+                self.backoff,
+                self.compress,
+            )
+            if self.checkpoint is not None:
+                self.checkpoint.add(hrefs)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
 
 
 def iter_json_batches(inputs, base_url, batch_size, keep_instance_path):
+    for uri, hrefs, resources in iter_json_href_batches(inputs, base_url, batch_size, keep_instance_path):
+        yield uri, resources
+
+
+def iter_json_href_batches(inputs, base_url, batch_size, keep_instance_path):
+    """
+    Generate (uri, hrefs, resources) batches.
+
+    """
     parsed_base_url = urlparse(base_url)
 
     current_uri = None
+    current_hrefs = []
     current_batch = []
 
     for href, resource in inputs:
@@ -88,7 +270,7 @@ def iter_json_batches(inputs, base_url, batch_size, keep_instance_path):
         ))
 
         if batch_size == 1:
-            yield (uri, [resource])
+            yield (uri, [href], [resource])
         else:
             # batch handling
             if keep_instance_path:
@@ -100,17 +282,34 @@ def iter_json_batches(inputs, base_url, batch_size, keep_instance_path):
                     current_uri is not None and current_uri != collection_uri,
                     len(current_batch) >= batch_size,
             )):
-                yield (current_uri, current_batch)
+                yield (current_uri, current_hrefs, current_batch)
+                current_hrefs = []
                 current_batch = []
 
             current_uri = collection_uri
+            current_hrefs.append(href)
             current_batch.append(resource)
 
     if current_batch:
-        yield (current_uri, current_batch)
+        yield (current_uri, current_hrefs, current_batch)
+
+
+def encode_json(data, compress=False):
+    """
+    Encode a JSON request body, gzip-encoding it if requested and worthwhile.
+
+    :returns: a tuple of (body, headers)
+
+    """
+    body = dumps(data)
+    headers = {"Content-Type": "application/json"}
+    if compress and len(body) >= COMPRESS_MIN_SIZE:
+        body = gzip_compress(body.encode("utf-8"))
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
 
 
-def push_resource_json(session, uri, resource):
+def push_resource_json(session, uri, resource, compress=False):
     """
     Push a single resource as JSON to a URI.
 
@@ -119,10 +318,11 @@ def push_resource_json(session, uri, resource):
     """
     logger.debug("Pushing resource for {}".format(uri))
 
+    body, headers = encode_json(resource, compress)
     response = session.put(
         uri,
-        data=dumps(resource),
-        headers={"Content-Type": "application/json"},
+        data=body,
+        headers=headers,
     )
     try:
         response.raise_for_status()
@@ -133,7 +333,7 @@ def push_resource_json(session, uri, resource):
         raise
 
 
-def push_resource_json_batch(session, uri, resources):
+def push_resource_json_batch(session, uri, resources, compress=False):
     """
     Push a single resource as JSON to a URI.
 
@@ -142,12 +342,11 @@ def push_resource_json_batch(session, uri, resources):
     """
     logger.debug("Pushing resource batch of size {} for {}".format(len(resources), uri))
 
+    body, headers = encode_json(dict(items=resources), compress)
     response = session.patch(
         uri,
-        data=dumps(dict(
-            items=resources,
-        )),
-        headers={"Content-Type": "application/json"},
+        data=body,
+        headers=headers,
     )
     try:
         response.raise_for_status()
@@ -162,17 +361,31 @@ def push(args, inputs):
     """
     Push content to a destination.
 
-    If the destination is "-", YAML is written to stdout.
+    If the destination is "-", YAML (or `--format`) is written to stdout.
     If the destination has a http prefix, JSON is written to a URL.
-    Otherwise, YAML is written to a local file.
+    Otherwise, YAML or JSON lines (by `--format` or file extension) is written to a local file.
 
     """
     logger.info("Pushing resources to: {}".format(args.output))
 
     if args.output == "-":
-        push_yaml(inputs, stdout)
+        push_file(inputs, stdout, get_format(args.output, args.format))
     elif args.output.startswith("http"):
-        push_json(inputs, args.output, args.batch_size, args.enable_sessions, args.keep_instance_path)
+        checkpoint = Checkpoint(args.checkpoint, resume=args.resume) if args.checkpoint else None
+        try:
+            push_json(
+                inputs,
+                args.output,
+                args.batch_size,
+                args.enable_sessions,
+                args.keep_instance_path,
+                concurrency=args.push_concurrency,
+                checkpoint=checkpoint,
+                compress=args.compress,
+            )
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
     else:
         with open(args.output, "w") as file_:
-            push_yaml(inputs, file_)
+            push_file(inputs, file_, get_format(args.output, args.format))
@@ -2,11 +2,12 @@
 Topological sort.
 
 """
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict
 from logging import getLogger
+from os import SEEK_END
+from tempfile import TemporaryFile
 
-TEMPORARY = object()
-VISITED = object()
+from six.moves import cPickle as pickle
 
 
 logger = getLogger("sync.toposort")
@@ -23,43 +24,168 @@ def iter_parents(resource):
             yield links["href"]
 
 
-def toposorted(inputs):
+class ResourceStore(object):
     """
-    Perform a topological sort on the input (href, resource) tuples.
+    A temporary on-disk store for resource bodies.
 
-    Uses a DFS.
+    Keeps only file offsets in memory.
 
     """
-    sorted_items = []
+    def __init__(self):
+        self.file_ = TemporaryFile()
+        self.offsets = {}
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def put(self, href, resource):
+        self.file_.seek(0, SEEK_END)
+        self.offsets[href] = self.file_.tell()
+        pickle.dump(resource, self.file_, pickle.HIGHEST_PROTOCOL)
+
+    def pop(self, href):
+        self.file_.seek(self.offsets.pop(href))
+        return pickle.load(self.file_)
+
+    def close(self):
+        self.file_.close()
+
 
-    visited = {}
+class Toposorter(object):
+    """
+    Incremental topological sort using Kahn's algorithm over the link graph.
 
-    nodes = {
-        href: resource
-        for href, resource in inputs
-    }
+    A resource is ready as soon as all of its parents are ready; until then, its body
+    is kept in a temporary on-disk store.
 
-    children = defaultdict(list)
-    for href, resource in nodes.items():
-        for parent_href in iter_parents(resource):
-            children[parent_href].append(href)
+    """
+    def __init__(self):
+        self.resolved = set()
+        # unresolved parent hrefs by (pending) child href, in input order
+        self.pending = OrderedDict()
+        # pending child hrefs by parent href
+        self.children = defaultdict(list)
+        self.store = ResourceStore()
+
+    def add(self, href, resource):
+        """
+        Add a resource and generate all resources that are now ready.
+
+        """
+        if href in self.resolved:
+            logger.debug("Skipping duplicate resource: {}".format(href))
+            return
+        if href in self.pending:
+            # keep the last definition of a resource
+            self.store.put(href, resource)
+            return
 
-    def visit(href, resource):
-        if visited.get(href) == VISITED:
+        parent_hrefs = set(
+            parent_href
+            for parent_href in iter_parents(resource)
+            if parent_href not in self.resolved
+        )
+        if parent_hrefs:
+            self.pending[href] = parent_hrefs
+            for parent_href in parent_hrefs:
+                self.children[parent_href].append(href)
+            self.store.put(href, resource)
             return
-        if visited.get(href) == TEMPORARY:
-            raise Exception("Found cycle at {}".format(href))
 
-        visited[href] = TEMPORARY
-        for child_href in children[href]:
-            visit(child_href, nodes[child_href])
-        visited[href] = VISITED
+        yield href, resource
+        for item in self.resolve(href):
+            yield item
+
+    def finish(self):
+        """
+        Generate all remaining resources once all inputs have been added.
+
+        Parents that are still unresolved (and not pending) are not part of the inputs.
+
+        """
+        logger.info("Toposorting {} remaining resources".format(len(self.pending)))
 
-        sorted_items.append((href, resource))
+        for href, parent_hrefs in list(self.pending.items()):
+            for parent_href in sorted(parent_hrefs):
+                if parent_href not in self.pending and parent_href not in self.resolved:
+                    for item in self.resolve(parent_href):
+                        yield item
 
-    logger.info("Toposorting {} resources".format(len(nodes)))
+        if self.pending:
+            raise Exception("Found cycle at {}".format(next(iter(self.pending))))
 
-    for href, resource in nodes.items():
-        visit(href, resource)
+    def resolve(self, href):
+        """
+        Mark an href as resolved and generate the children that are now ready.
 
-    return reversed(sorted_items)
+        """
+        ready = deque([href])
+        while ready:
+            parent_href = ready.popleft()
+            self.resolved.add(parent_href)
+            for child_href in self.children.pop(parent_href, []):
+                parent_hrefs = self.pending[child_href]
+                parent_hrefs.discard(parent_href)
+                if not parent_hrefs:
+                    del self.pending[child_href]
+                    ready.append(child_href)
+                    yield child_href, self.store.pop(child_href)
+
+    def close(self):
+        self.store.close()
+
+
+def toposorted(inputs):
+    """
+    Perform a topological sort on the input (href, resource) tuples.
+
+    Resources are generated as soon as all of their parents have been generated (roots
+    immediately), so downstream stages can start before all inputs have been read.
+
+    """
+    toposorter = Toposorter()
+    try:
+        for href, resource in inputs:
+            for item in toposorter.add(href, resource):
+                yield item
+        for item in toposorter.finish():
+            yield item
+    finally:
+        toposorter.close()
+
+
+def iter_levels(inputs):
+    """
+    Group topologically sorted (href, resource) tuples into levels.
+
+    Resources only depend on resources in earlier levels, so the resources within
+    a level may be processed in any order (or concurrently).
+
+    Only hrefs and depths are kept in memory; resource bodies are kept in a temporary
+    on-disk store until their level is generated. Each level is itself a generator.
+
+    """
+    depths = {}
+    levels = []
+    store = ResourceStore()
+
+    try:
+        for href, resource in inputs:
+            if href in depths:
+                logger.debug("Skipping duplicate resource: {}".format(href))
+                continue
+            depth = max([
+                depths[parent_href] + 1
+                for parent_href in iter_parents(resource)
+                if parent_href in depths
+            ] or [0])
+            depths[href] = depth
+            if depth == len(levels):
+                levels.append([])
+            levels[depth].append(href)
+            store.put(href, resource)
+
+        for level in levels:
+            yield ((href, store.pop(href)) for href in level)
+    finally:
+        store.close()
@@ -6,6 +6,7 @@ from uuid import uuid4
 
 from marshmallow import fields, Schema
 
+from microcosm_flask.fields import QueryStringList
 from microcosm_flask.linking import Links, Link
 from microcosm_flask.namespaces import Namespace
 from microcosm_flask.operations import Operation
@@ -38,6 +39,18 @@ class NewPersonBatchSchema(Schema):
     items = fields.List(fields.Nested(NewPersonSchema))
 
 
+class PersonIdentifierSchema(Schema):
+    id = fields.UUID(required=True)
+
+
+class DeletePersonBatchSchema(Schema):
+    items = fields.List(fields.Nested(PersonIdentifierSchema))
+
+
+class RetrievePersonBatchSchema(Schema):
+    ids = QueryStringList(fields.UUID(), required=True)
+
+
 class UpdatePersonSchema(Schema):
     firstName = fields.Str(attribute="first_name")
     lastName = fields.Str(attribute="last_name")
@@ -96,6 +109,19 @@ def person_create(**kwargs):
     return Person(id=PERSON_ID_2, **kwargs)
 
 
+def person_create_batch(items):
+    return dict(
+        items=[
+            Person(id=uuid4(), **item)
+            for item in items
+        ]
+    )
+
+
+def person_delete_batch(items):
+    return all(item["id"] == PERSON_ID_1 for item in items)
+
+
 def person_search(offset, limit):
     return [PERSON_1], 1
 
@@ -116,6 +142,14 @@ def person_retrieve(person_id):
         return None
 
 
+def person_retrieve_batch(ids):
+    return [
+        PERSON_1
+        for person_id in ids
+        if person_id == str(PERSON_ID_1)
+    ]
+
+
 def person_delete(person_id):
     return person_id == PERSON_ID_1
 
@@ -0,0 +1,127 @@
+"""
+Compiled schema tests.
+
+"""
+from hamcrest import (
+    assert_that,
+    equal_to,
+    instance_of,
+    is_,
+)
+from marshmallow import fields, post_dump, Schema
+
+from microcosm.api import create_object_graph
+from microcosm_flask.conventions.compiled import CompiledSchema, compile_schema
+from microcosm_flask.conventions.crud import configure_crud
+from microcosm_flask.namespaces import Namespace
+from microcosm_flask.operations import Operation
+from microcosm_flask.paging import Page, PageSchema, PaginatedList, make_paginated_list_schema
+from microcosm_flask.tests.conventions.fixtures import (
+    NewPersonSchema,
+    person_create,
+    person_retrieve,
+    person_search,
+    Person,
+    PersonSchema,
+    PERSON_1,
+    PERSON_ID_1,
+)
+
+
+class ChildSchema(Schema):
+    name = fields.String()
+    age = fields.Integer(default=0)
+
+
+class ParentSchema(Schema):
+    name = fields.String(dump_to="fullName")
+    secret = fields.String(load_only=True)
+    child = fields.Nested(ChildSchema)
+    children = fields.Nested(ChildSchema, many=True)
+    siblings = fields.List(fields.Nested(ChildSchema))
+
+
+class ProcessedSchema(Schema):
+    name = fields.String()
+
+    @post_dump
+    def uppercase(self, data):
+        data["name"] = data["name"].upper()
+        return data
+
+
+class InvalidSchema(Schema):
+    value = fields.Integer()
+
+
+def test_compiled_schema_matches_dump():
+    schema = ParentSchema()
+    obj = dict(
+        name="parent",
+        secret="secret",
+        child=dict(name="child"),
+        children=[dict(name="first", age=1), dict(name="second", age=2)],
+        siblings=None,
+    )
+
+    compiled = compile_schema(schema)
+
+    assert_that(compiled, is_(instance_of(CompiledSchema)))
+    assert_that(compiled.dump(obj).data, is_(equal_to(schema.dump(obj).data)))
+    assert_that(compiled.dump(dict(name="empty")).data, is_(equal_to(schema.dump(dict(name="empty")).data)))
+
+
+def test_compiled_schema_skips_processors():
+    schema = ProcessedSchema()
+    assert_that(compile_schema(schema), is_(equal_to(schema)))
+
+
+def test_compiled_schema_falls_back_on_errors():
+    schema = InvalidSchema()
+    compiled = compile_schema(schema)
+
+    assert_that(compiled, is_(instance_of(CompiledSchema)))
+    assert_that(compiled.dump(dict(value="foo")), is_(equal_to(schema.dump(dict(value="foo")))))
+
+
+def test_compiled_paginated_list_matches_dump():
+    graph = create_object_graph(name="example", testing=True)
+    ns = Namespace(subject=Person)
+    configure_crud(graph, ns, {
+        Operation.Retrieve: (person_retrieve, PersonSchema()),
+        Operation.Search: (person_search, PageSchema(), PersonSchema()),
+    })
+    schema = make_paginated_list_schema(ns, PersonSchema())()
+    compiled = compile_schema(schema)
+
+    with graph.flask.test_request_context():
+        paginated_list = PaginatedList(ns, Page(0, 10), [PERSON_1], 1)
+        assert_that(compiled.dump(paginated_list).data, is_(equal_to(schema.dump(paginated_list).data)))
+
+
+def test_crud_with_compiled_dumpers():
+    def loader(metadata):
+        return dict(
+            route=dict(
+                enable_compiled_dumpers=True,
+            ),
+        )
+
+    def make_client(loader=None):
+        kwargs = dict(loader=loader) if loader else dict()
+        graph = create_object_graph(name="example", testing=True, **kwargs)
+        configure_crud(graph, Person, {
+            Operation.Create: (person_create, NewPersonSchema(), PersonSchema()),
+            Operation.Retrieve: (person_retrieve, PersonSchema()),
+            Operation.Search: (person_search, PageSchema(), PersonSchema()),
+        })
+        return graph.flask.test_client()
+
+    client = make_client()
+    compiled_client = make_client(loader)
+
+    for uri in ["/api/person", "/api/person/{}".format(PERSON_ID_1)]:
+        response = client.get(uri)
+        compiled_response = compiled_client.get(uri)
+        assert_that(compiled_response.status_code, is_(equal_to(200)))
+        assert_that(compiled_response.get_data(), is_(equal_to(response.get_data())))
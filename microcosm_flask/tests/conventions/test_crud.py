@@ -3,36 +3,52 @@ CRUD convention tests.
 
 """
 from json import dumps, loads
+from uuid import uuid4
 
 from hamcrest import (
     assert_that,
+    contains,
     contains_inanyorder,
     equal_to,
+    has_key,
+    has_length,
     is_,
+    is_not,
 )
 
 from microcosm.api import create_object_graph
-from microcosm_flask.conventions.crud import configure_crud
+from microcosm_flask.conventions.crud import configure_crud, CRUDConvention
 from microcosm_flask.namespaces import Namespace
 from microcosm_flask.operations import Operation
-from microcosm_flask.paging import PageSchema
+from microcosm_flask.paging import (
+    CountHintPageSchema,
+    CursorPage,
+    CursorPageSchema,
+    CursorPaginatedList,
+    PageSchema,
+)
 from microcosm_flask.tests.conventions.fixtures import (
     Address,
     AddressSchema,
+    DeletePersonBatchSchema,
     NewPersonBatchSchema,
     NewPersonSchema,
     address_retrieve,
     address_search,
     person_create,
+    person_create_batch,
     person_delete,
+    person_delete_batch,
     person_replace,
     person_retrieve,
+    person_retrieve_batch,
     person_search,
     person_update,
     person_update_batch,
     Person,
     PersonBatchSchema,
     PersonSchema,
+    RetrievePersonBatchSchema,
     ADDRESS_ID_1,
     PERSON_ID_1,
     PERSON_ID_2,
@@ -41,10 +57,13 @@ from microcosm_flask.tests.conventions.fixtures import (
 
 PERSON_MAPPINGS = {
     Operation.Create: (person_create, NewPersonSchema(), PersonSchema()),
+    Operation.CreateBatch: (person_create_batch, NewPersonBatchSchema(), PersonBatchSchema()),
     Operation.Delete: (person_delete,),
+    Operation.DeleteBatch: (person_delete_batch, DeletePersonBatchSchema(), None),
     Operation.UpdateBatch: (person_update_batch, NewPersonBatchSchema(), PersonBatchSchema()),
     Operation.Replace: (person_replace, NewPersonSchema(), PersonSchema()),
     Operation.Retrieve: (person_retrieve, PersonSchema()),
+    Operation.RetrieveBatch: (person_retrieve_batch, RetrievePersonBatchSchema(), PersonSchema()),
     Operation.Search: (person_search, PageSchema(), PersonSchema()),
     Operation.Update: (person_update, NewPersonSchema(), PersonSchema()),
 }
@@ -205,6 +224,42 @@ class TestCrud(object):
             }],
         })
 
+    def test_create_batch(self):
+        request_data = {
+            "items": [{
+                "firstName": "Bob",
+                "lastName": "Jones",
+            }, {
+                "firstName": "Carol",
+                "lastName": "Brown",
+            }],
+        }
+        response = self.client.post("/api/person/batch", data=dumps(request_data))
+        self.assert_response(response, 201)
+
+        items = loads(response.get_data().decode("utf-8"))["items"]
+        assert_that([item["firstName"] for item in items], contains("Bob", "Carol"))
+
+    def test_delete_batch(self):
+        request_data = {
+            "items": [{
+                "id": str(PERSON_ID_1),
+            }],
+        }
+        response = self.client.delete("/api/person/batch", data=dumps(request_data))
+        self.assert_response(response, 204)
+
+    def test_delete_batch_not_found(self):
+        request_data = {
+            "items": [{
+                "id": str(PERSON_ID_1),
+            }, {
+                "id": str(PERSON_ID_2),
+            }],
+        }
+        response = self.client.delete("/api/person/batch", data=dumps(request_data))
+        self.assert_response(response, 404)
+
     def test_retrieve(self):
         uri = "/api/person/{}".format(PERSON_ID_1)
         response = self.client.get(uri)
@@ -219,6 +274,26 @@ class TestCrud(object):
             },
         })
 
+    def test_retrieve_batch(self):
+        uri = "/api/person/batch?ids={},{}".format(PERSON_ID_1, PERSON_ID_2)
+        response = self.client.get(uri)
+        self.assert_response(response, 200, {
+            "items": [{
+                "id": str(PERSON_ID_1),
+                "firstName": "Alice",
+                "lastName": "Smith",
+                "_links": {
+                    "self": {
+                        "href": "http://localhost/api/person/{}".format(PERSON_ID_1),
+                    }
+                },
+            }],
+        })
+
+    def test_retrieve_batch_requires_ids(self):
+        response = self.client.get("/api/person/batch")
+        self.assert_response(response, 422)
+
     def test_retrieve_not_found(self):
         uri = "/api/person/{}".format(PERSON_ID_2)
         response = self.client.get(uri)
@@ -276,3 +351,166 @@ class TestCrud(object):
         }
         response = self.client.patch(uri, data=dumps(request_data))
         self.assert_response(response, 404)
+
+
+def test_search_streaming():
+    def loader(metadata):
+        return dict(
+            route=dict(
+                enable_streaming_search=True,
+            ),
+        )
+
+    def person_search_generator(offset, limit):
+        # NB: other tests modify PERSON_1
+        return (Person(PERSON_ID_1, "Alice", "Smith") for _ in range(1)), 1
+
+    graph = create_object_graph(name="example", testing=True, loader=loader)
+    configure_crud(graph, Person, {
+        Operation.Retrieve: (person_retrieve, PersonSchema()),
+        Operation.Search: (person_search_generator, PageSchema(), PersonSchema()),
+    })
+    client = graph.flask.test_client()
+
+    response = client.get("/api/person")
+    assert_that(response.status_code, is_(equal_to(200)))
+    assert_that(response.headers["Content-Type"], is_(equal_to("application/json")))
+    assert_that(loads(response.get_data().decode("utf-8")), is_(equal_to({
+        "count": 1,
+        "offset": 0,
+        "limit": 20,
+        "items": [{
+            "id": str(PERSON_ID_1),
+            "firstName": "Alice",
+            "lastName": "Smith",
+            "_links": {
+                "self": {
+                    "href": "http://localhost/api/person/{}".format(PERSON_ID_1),
+                }
+            },
+        }],
+        "_links": {
+            "self": {
+                "href": "http://localhost/api/person?offset=0&limit=20",
+            }
+        }
+    })))
+
+
+def test_retrieve_with_etags():
+    def loader(metadata):
+        return dict(
+            route=dict(
+                enable_etags=True,
+            ),
+        )
+
+    graph = create_object_graph(name="example", testing=True, loader=loader)
+    configure_crud(graph, Person, PERSON_MAPPINGS)
+    client = graph.flask.test_client()
+
+    uri = "/api/person/{}".format(PERSON_ID_1)
+    first = client.get(uri)
+    second = client.get(uri, headers={"If-None-Match": first.headers["ETag"]})
+    third = client.get(uri, headers={"If-None-Match": "\"other\""})
+
+    assert_that(first.status_code, is_(equal_to(200)))
+    assert_that(second.status_code, is_(equal_to(304)))
+    assert_that(second.get_data(), is_(equal_to(b"")))
+    assert_that(third.status_code, is_(equal_to(200)))
+    assert_that(third.headers["ETag"], is_(equal_to(first.headers["ETag"])))
+
+
+def test_search_with_etags():
+    def loader(metadata):
+        return dict(
+            route=dict(
+                enable_etags=True,
+            ),
+        )
+
+    graph = create_object_graph(name="example", testing=True, loader=loader)
+    configure_crud(graph, Person, PERSON_MAPPINGS)
+    client = graph.flask.test_client()
+
+    first = client.get("/api/person")
+    second = client.get("/api/person", headers={"If-None-Match": first.headers["ETag"]})
+    other_page = client.get("/api/person?limit=1", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert_that(first.status_code, is_(equal_to(200)))
+    assert_that(second.status_code, is_(equal_to(304)))
+    assert_that(other_page.status_code, is_(equal_to(200)))
+
+
+class CursorCRUDConvention(CRUDConvention):
+    page_cls = CursorPage
+    paginated_list_cls = CursorPaginatedList
+
+
+def test_search_with_cursor():
+    def loader(metadata):
+        return dict(
+            flask=dict(
+                secret_key="secret",
+            ),
+        )
+
+    people = sorted(
+        [Person(uuid4(), "Alice", "Smith") for _ in range(3)],
+        key=lambda person: str(person.id),
+    )
+
+    def person_search_after(limit, cursor=None):
+        items = [person for person in people if cursor is None or str(person.id) > cursor[0]]
+        return items[:limit], None
+
+    graph = create_object_graph(name="example", testing=True, loader=loader)
+    ns = Namespace(subject=Person)
+    CursorCRUDConvention(graph).configure(ns, {
+        Operation.Retrieve: (person_retrieve, PersonSchema()),
+        Operation.Search: (person_search_after, CursorPageSchema(), PersonSchema()),
+    })
+    client = graph.flask.test_client()
+
+    uri, ids = "/api/person?limit=2", []
+    while uri:
+        response = client.get(uri)
+        assert_that(response.status_code, is_(equal_to(200)))
+        data = loads(response.get_data().decode("utf-8"))
+        ids.extend(item["id"] for item in data["items"])
+        uri = data["_links"].get("next", {}).get("href")
+
+    assert_that(ids, contains(*[str(person.id) for person in people]))
+
+
+def test_search_with_count_hint():
+    people = [Person(uuid4(), "Alice", "Smith") for _ in range(3)]
+
+    def person_search_counted(offset, limit, count_hint="exact"):
+        items = people[offset:offset + limit + 1]
+        count = None if count_hint == "none" else 100
+        return items, count
+
+    graph = create_object_graph(name="example", testing=True)
+    configure_crud(graph, Person, {
+        Operation.Retrieve: (person_retrieve, PersonSchema()),
+        Operation.Search: (person_search_counted, CountHintPageSchema(), PersonSchema()),
+    })
+    client = graph.flask.test_client()
+
+    response = client.get("/api/person?limit=2&count_hint=none")
+    data = loads(response.get_data().decode("utf-8"))
+    assert_that(data, is_not(has_key("count")))
+    assert_that(data, is_not(has_key("count_estimated")))
+    assert_that(data["items"], has_length(2))
+    assert_that(data["_links"], has_key("next"))
+
+    response = client.get("/api/person?limit=2&count_hint=estimate")
+    data = loads(response.get_data().decode("utf-8"))
+    assert_that(data["count"], is_(equal_to(100)))
+    assert_that(data["count_estimated"], is_(equal_to(True)))
+
+    response = client.get("/api/person?limit=2")
+    data = loads(response.get_data().decode("utf-8"))
+    assert_that(data["count"], is_(equal_to(100)))
+    assert_that(data, is_not(has_key("count_estimated")))
@@ -0,0 +1,251 @@
+"""
+CRUD store adapter tests.
+
+"""
+from uuid import uuid4
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains,
+    equal_to,
+    is_,
+    raises,
+)
+from werkzeug.exceptions import NotFound
+
+from microcosm.api import create_object_graph
+from microcosm_flask.conventions.crud_adapter import CRUDStoreAdapter
+
+
+class Person(object):
+
+    def __init__(self, id=None, first_name=None, last_name=None, group_id=None):
+        self.id = id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.group_id = group_id
+
+
+class PersonStore(object):
+    """
+    A store that counts calls.
+
+    """
+    model_class = Person
+
+    def __init__(self):
+        self.calls = []
+
+    def count(self, **kwargs):
+        self.calls.append("count")
+        return 2
+
+    def create(self, model):
+        self.calls.append("create")
+        return model
+
+    def delete(self, identifier):
+        self.calls.append("delete")
+        return True
+
+    def replace(self, identifier, model):
+        self.calls.append("replace")
+        return model
+
+    def retrieve(self, identifier):
+        self.calls.append("retrieve")
+        if identifier not in PEOPLE:
+            raise NotFound()
+        return PEOPLE[identifier]
+
+    def search(self, offset, limit, **kwargs):
+        self.calls.append("search")
+        self.limit = limit
+        return [Person(**item) for item in ITEMS][offset:offset + limit]
+
+
+class BulkPersonStore(PersonStore):
+    """
+    A store that supports bulk operations.
+
+    """
+    def create_batch(self, models):
+        self.calls.append("create_batch")
+        return models
+
+    def delete_batch(self, identifiers):
+        self.calls.append("delete_batch")
+        self.identifiers = identifiers
+        return True
+
+    def replace_batch(self, models):
+        self.calls.append("replace_batch")
+        return models
+
+    def retrieve_batch(self, identifiers):
+        self.calls.append("retrieve_batch")
+        return [PEOPLE[identifier] for identifier in reversed(identifiers) if identifier in PEOPLE]
+
+    def estimate_count(self, **kwargs):
+        self.calls.append("estimate_count")
+        return 1
+
+    def search_with_count(self, offset, limit, **kwargs):
+        self.calls.append("search_with_count")
+        return [Person(**item) for item in ITEMS][offset:offset + limit], 2
+
+
+ITEMS = [
+    dict(first_name="Alice", last_name="Smith"),
+    dict(first_name="Bob", last_name="Jones"),
+]
+
+PEOPLE = {
+    person.id: person
+    for person in (Person(id=uuid4(), **item) for item in ITEMS)
+}
+
+
+class TestCRUDStoreAdapter(object):
+
+    def setup(self):
+        self.graph = create_object_graph(name="example", testing=True)
+
+    def test_create_batch(self):
+        store = PersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+        group_id = uuid4()
+
+        result = adapter.create_batch(items=[dict(item) for item in ITEMS], group_id=group_id)
+
+        assert_that([item.first_name for item in result["items"]], contains("Alice", "Bob"))
+        assert_that([item.group_id for item in result["items"]], contains(group_id, group_id))
+        assert_that(store.calls, contains("create", "create"))
+
+    def test_create_batch_bulk(self):
+        store = BulkPersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+
+        result = adapter.create_batch(items=[dict(item) for item in ITEMS])
+
+        assert_that([item.first_name for item in result["items"]], contains("Alice", "Bob"))
+        assert_that(store.calls, contains("create_batch"))
+
+    def test_delete_batch(self):
+        store = PersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+
+        assert_that(adapter.delete_batch(items=[dict(id=uuid4()), dict(id=uuid4())]), is_(equal_to(True)))
+        assert_that(store.calls, contains("delete", "delete"))
+
+    def test_delete_batch_bulk(self):
+        store = BulkPersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+
+        assert_that(adapter.delete_batch(items=[dict(id=uuid4()), dict(id=uuid4())]), is_(equal_to(True)))
+        assert_that(store.calls, contains("delete_batch"))
+
+    def test_delete_batch_identifier_key(self):
+        store = BulkPersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+        identifiers = [uuid4(), uuid4()]
+
+        adapter.delete_batch(items=[dict(person_id=identifiers[0]), dict(id=identifiers[1])])
+
+        assert_that(store.identifiers, contains(*identifiers))
+
+    def test_update_batch(self):
+        store = PersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+
+        result = adapter.update_batch(items=[dict(id=uuid4(), **item) for item in ITEMS])
+
+        assert_that([item.last_name for item in result["items"]], contains("Smith", "Jones"))
+        assert_that(store.calls, contains("replace", "replace"))
+
+    def test_update_batch_bulk(self):
+        store = BulkPersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+
+        result = adapter.update_batch(items=[dict(id=uuid4(), **item) for item in ITEMS])
+
+        assert_that([item.last_name for item in result["items"]], contains("Smith", "Jones"))
+        assert_that(store.calls, contains("replace_batch"))
+
+    def test_search(self):
+        store = PersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+
+        items, count = adapter.search(offset=0, limit=1)
+
+        assert_that([item.first_name for item in items], contains("Alice"))
+        assert_that(count, is_(equal_to(2)))
+        assert_that(store.calls, contains("search", "count"))
+
+    def test_search_with_count(self):
+        store = BulkPersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+
+        items, count = adapter.search(offset=0, limit=1)
+
+        assert_that([item.first_name for item in items], contains("Alice"))
+        assert_that(count, is_(equal_to(2)))
+        assert_that(store.calls, contains("search_with_count"))
+
+    def test_search_count_estimate(self):
+        store = BulkPersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+
+        items, count = adapter.search(offset=0, limit=1, count_hint="estimate")
+
+        assert_that(count, is_(equal_to(1)))
+        assert_that(store.calls, contains("search", "estimate_count"))
+
+    def test_search_count_estimate_unsupported(self):
+        store = PersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+
+        items, count = adapter.search(offset=0, limit=1, count_hint="estimate")
+
+        assert_that(count, is_(equal_to(2)))
+        assert_that(store.calls, contains("search", "count"))
+
+    def test_search_count_none(self):
+        store = BulkPersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+
+        items, count = adapter.search(offset=0, limit=1, count_hint="none")
+
+        assert_that(count, is_(equal_to(None)))
+        assert_that(store.calls, contains("search"))
+        # looks ahead by one item
+        assert_that(len(items), is_(equal_to(2)))
+        assert_that(store.limit, is_(equal_to(2)))
+
+    def test_retrieve_batch(self):
+        store = PersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+        ids = list(PEOPLE.keys())
+
+        items = adapter.retrieve_batch(ids=ids + ids[:1])
+
+        assert_that([item.id for item in items], contains(*ids))
+        assert_that(store.calls, contains("retrieve", "retrieve"))
+
+    def test_retrieve_batch_bulk(self):
+        store = BulkPersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+        ids = list(PEOPLE.keys())
+
+        items = adapter.retrieve_batch(ids=ids)
+
+        assert_that([item.id for item in items], contains(*ids))
+        assert_that(store.calls, contains("retrieve_batch"))
+
+    def test_retrieve_batch_bulk_not_found(self):
+        store = BulkPersonStore()
+        adapter = CRUDStoreAdapter(self.graph, store)
+        ids = list(PEOPLE.keys()) + [uuid4()]
+
+        assert_that(calling(adapter.retrieve_batch).with_args(ids=ids), raises(NotFound))
@@ -3,7 +3,9 @@ Health check convention tests.
 
 """
 from json import loads
+from threading import Event
 
+from flask import current_app
 from hamcrest import (
     assert_that,
     equal_to,
@@ -87,3 +89,139 @@ def test_health_check_custom_check_failed():
             },
         },
     })))
+
+
+def make_graph(**health_convention):
+    def loader(metadata):
+        return dict(
+            health_convention=health_convention,
+        )
+
+    graph = create_object_graph(name="example", testing=True, loader=loader)
+    graph.use("health_convention")
+    return graph
+
+
+def test_health_check_parallel_timeout():
+    """
+    Slow checks time out without failing other checks.
+
+    """
+    graph = make_graph(max_workers=2, timeout=0.05)
+    client = graph.flask.test_client()
+    done = Event()
+
+    graph.health_convention.checks["fast"] = lambda graph: None
+    graph.health_convention.checks["slow"] = lambda graph: done.wait(5)
+
+    try:
+        response = client.get("/api/health")
+    finally:
+        done.set()
+        graph.health_convention.stop()
+
+    assert_that(response.status_code, is_(equal_to(503)))
+    data = loads(response.get_data().decode("utf-8"))
+    assert_that(data["checks"], is_(equal_to({
+        "fast": {
+            "message": "ok",
+            "ok": True,
+        },
+        "slow": {
+            "message": "timed out after 0.05 seconds",
+            "ok": False,
+        },
+    })))
+
+
+def test_health_check_timeout_without_max_workers():
+    """
+    A timeout alone runs checks on a default pool so that it is enforced.
+
+    """
+    graph = make_graph(timeout=0.05, cache_ttl=60)
+    client = graph.flask.test_client()
+    done = Event()
+
+    graph.health_convention.checks["slow"] = lambda graph: done.wait(5)
+
+    try:
+        response = client.get("/api/health")
+    finally:
+        done.set()
+        graph.health_convention.stop()
+
+    assert_that(response.status_code, is_(equal_to(503)))
+    data = loads(response.get_data().decode("utf-8"))
+    assert_that(data["checks"]["slow"]["message"], is_(equal_to("timed out after 0.05 seconds")))
+
+
+def test_health_check_cached():
+    """
+    Check results are cached for the configured TTL.
+
+    """
+    graph = make_graph(cache_ttl=60)
+    client = graph.flask.test_client()
+    calls = []
+
+    graph.health_convention.checks["foo"] = calls.append
+
+    for _ in range(3):
+        response = client.get("/api/health")
+        assert_that(response.status_code, is_(equal_to(200)))
+
+    assert_that(len(calls), is_(equal_to(1)))
+
+
+def test_health_check_refresher():
+    """
+    The background refresher keeps results up to date.
+
+    """
+    graph = make_graph(refresh_interval=0.01)
+    client = graph.flask.test_client()
+    refreshed = Event()
+    calls = []
+
+    def check(graph):
+        calls.append(graph)
+        if len(calls) > 1:
+            refreshed.set()
+
+    graph.health_convention.checks["foo"] = check
+
+    try:
+        response = client.get("/api/health")
+        assert_that(refreshed.wait(5), is_(equal_to(True)))
+    finally:
+        graph.health_convention.stop()
+
+    assert_that(response.status_code, is_(equal_to(200)))
+
+
+def test_health_check_app_context():
+    """
+    Checks run off the request thread can use the application context.
+
+    """
+    graph = make_graph(max_workers=2, refresh_interval=0.01)
+    client = graph.flask.test_client()
+    refreshed = Event()
+    names = []
+
+    def check(graph):
+        names.append(current_app.name)
+        if len(names) > 1:
+            refreshed.set()
+
+    graph.health_convention.checks["foo"] = check
+
+    try:
+        response = client.get("/api/health")
+        assert_that(refreshed.wait(5), is_(equal_to(True)))
+    finally:
+        graph.health_convention.stop()
+
+    assert_that(response.status_code, is_(equal_to(200)))
+    assert_that(set(names), is_(equal_to({graph.flask.name})))
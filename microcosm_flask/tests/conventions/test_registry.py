@@ -0,0 +1,139 @@
+"""
+Route registry tests.
+
+"""
+from hamcrest import (
+    assert_that,
+    contains,
+    contains_inanyorder,
+    equal_to,
+    greater_than,
+    instance_of,
+    is_,
+    none,
+)
+
+from marshmallow import fields, Schema
+from microcosm.api import create_object_graph
+from microcosm_flask.conventions.registry import iter_endpoints, iter_path_prefixes, qs, response
+from microcosm_flask.namespaces import Namespace
+from microcosm_flask.operations import Operation
+
+
+class FooSchema(Schema):
+    id = fields.String()
+
+
+class FooQuerySchema(Schema):
+    name = fields.String()
+
+
+class TestRouteRegistry(object):
+
+    def setup(self):
+        self.graph = create_object_graph(name="example", testing=True)
+        self.foo_ns = Namespace(subject="foo")
+        self.bar_ns = Namespace(subject="bar", version="v2")
+
+        for ns in (self.foo_ns, self.bar_ns):
+            self.add_routes(ns)
+
+        @self.graph.app.route("/api/unconventional")
+        def unconventional():
+            pass
+
+    def add_routes(self, ns):
+        @self.graph.route(ns.collection_path, Operation.Search, ns)
+        @qs(FooQuerySchema())
+        @response(FooSchema())
+        def search():
+            pass
+
+        @self.graph.route(ns.instance_path, Operation.Retrieve, ns)
+        def retrieve():
+            pass
+
+    def names(self, entries):
+        return [
+            (entry.operation, entry.ns.subject_name, entry.ns.version)
+            for entry in entries
+        ]
+
+    def test_registered_routes(self):
+        assert_that(len(self.graph.route_registry), is_(equal_to(4)))
+
+    def test_find_by_operation(self):
+        entries = self.graph.route_registry.find(operations={Operation.Search})
+        assert_that(self.names(entries), contains_inanyorder(
+            (Operation.Search, "foo", "v1"),
+            (Operation.Search, "bar", "v2"),
+        ))
+
+    def test_find_by_subject_and_version(self):
+        assert_that(self.names(self.graph.route_registry.find(subject="bar", version="v2")), contains(
+            (Operation.Search, "bar", "v2"),
+            (Operation.Retrieve, "bar", "v2"),
+        ))
+        assert_that(self.graph.route_registry.find(subject="bar", version="v1"), is_(equal_to([])))
+
+    def test_find_by_path_prefix(self):
+        assert_that(self.names(self.graph.route_registry.find(path_prefix="/api/v2")), contains(
+            (Operation.Search, "bar", "v2"),
+            (Operation.Retrieve, "bar", "v2"),
+        ))
+        # prefixes need not end on a segment boundary
+        assert_that(self.names(self.graph.route_registry.find(path_prefix="/api/fo")), contains(
+            (Operation.Search, "foo", "v1"),
+            (Operation.Retrieve, "foo", "v1"),
+        ))
+
+    def test_get(self):
+        entry = self.graph.route_registry.get("foo.search.v1")
+        assert_that(entry.rule.rule, is_(equal_to("/api/foo")))
+        assert_that(entry.func, is_(equal_to(self.graph.flask.view_functions["foo.search.v1"])))
+        assert_that(self.graph.route_registry.get("unconventional"), is_(none()))
+
+    def test_entry_schemas(self):
+        entry = self.graph.route_registry.get("foo.search.v1")
+        assert_that(entry.qs_schema, is_(instance_of(FooQuerySchema)))
+        assert_that(entry.response_schema, is_(instance_of(FooSchema)))
+        assert_that(entry.request_schema, is_(none()))
+
+    def test_app_routes(self):
+        generation = self.graph.route_registry.generation
+
+        @self.graph.app.route("/api/baz", endpoint="baz.search.v1")
+        def search_baz():
+            pass
+
+        entry = self.graph.route_registry.get("baz.search.v1")
+        assert_that(entry.operation, is_(equal_to(Operation.Search)))
+        assert_that(entry.rule.rule, is_(equal_to("/api/baz")))
+        assert_that(self.graph.route_registry.generation, is_(greater_than(generation)))
+
+    def test_find_matches_iter_endpoints(self):
+        def match_func(operation, ns, rule):
+            return operation in (Operation.Search, Operation.Retrieve)
+
+        with self.graph.flask.test_request_context():
+            # binding the url map sorts its rules
+            self.graph.flask.url_map.bind("localhost").match("/api/foo")
+            expected = list(iter_endpoints(self.graph, match_func))
+            entries = self.graph.route_registry.find(operations={Operation.Search, Operation.Retrieve})
+
+        def describe(endpoints):
+            return [
+                (operation, ns.endpoint_for(operation), rule, func)
+                for operation, ns, rule, func in endpoints
+            ]
+
+        assert_that(describe(entries), is_(equal_to(describe(expected))))
+
+
+def test_iter_path_prefixes():
+    assert_that(list(iter_path_prefixes("/api/v1/foo/")), contains(
+        "",
+        "/api",
+        "/api/v1",
+        "/api/v1/foo",
+    ))
@@ -0,0 +1,139 @@
+"""
+Response cache tests.
+
+"""
+from json import dumps, loads
+from uuid import uuid4
+
+from hamcrest import (
+    assert_that,
+    equal_to,
+    has_entries,
+    is_,
+    same_instance,
+)
+
+from microcosm.api import create_object_graph
+from microcosm_flask.caching import LRUCache
+from microcosm_flask.conventions.crud import configure_crud
+from microcosm_flask.conventions.response_cache import RESPONSE_CACHES, ResponseCache
+from microcosm_flask.operations import Operation
+from microcosm_flask.paging import PageSchema
+from microcosm_flask.tests.conventions.fixtures import (
+    NewPersonSchema,
+    person_retrieve,
+    person_search,
+    person_update,
+    Person,
+    PersonSchema,
+    PERSON_ID_1,
+)
+
+
+class TestResponseCache(object):
+
+    def setup(self):
+        self.graph = create_object_graph(name="example", testing=True)
+        self.calls = []
+        self.response_cache = ResponseCache(backend=LRUCache(maxsize=16))
+
+        def retrieve(**kwargs):
+            self.calls.append("retrieve")
+            return person_retrieve(**kwargs)
+
+        def search(**kwargs):
+            self.calls.append("search")
+            return person_search(**kwargs)
+
+        configure_crud(self.graph, Person, {
+            Operation.Retrieve: (retrieve, PersonSchema()),
+            Operation.Search: (search, PageSchema(), PersonSchema()),
+            Operation.Update: (person_update, NewPersonSchema(), PersonSchema()),
+        }, response_cache=self.response_cache)
+        self.client = self.graph.flask.test_client()
+
+    def test_retrieve_is_cached(self):
+        uri = "/api/person/{}".format(PERSON_ID_1)
+        first = self.client.get(uri)
+        second = self.client.get(uri)
+
+        assert_that(second.status_code, is_(equal_to(200)))
+        assert_that(second.get_data(), is_(equal_to(first.get_data())))
+        assert_that(second.headers["Content-Type"], is_(equal_to("application/json")))
+        assert_that(self.calls, is_(equal_to(["retrieve"])))
+        assert_that(self.response_cache.stats(), has_entries(hits=1, misses=1))
+
+    def test_not_found_is_not_cached(self):
+        uri = "/api/person/{}".format(uuid4())
+        self.client.get(uri)
+        response = self.client.get(uri)
+
+        assert_that(response.status_code, is_(equal_to(404)))
+        assert_that(self.calls, is_(equal_to(["retrieve", "retrieve"])))
+
+    def test_key_normalizes_query_string(self):
+        self.client.get("/api/person?offset=0&limit=10")
+        self.client.get("/api/person?limit=10&offset=0")
+        self.client.get("/api/person?limit=5&offset=0")
+
+        assert_that(self.calls, is_(equal_to(["search", "search"])))
+
+    def test_key_includes_selected_headers(self):
+        self.client.get("/api/person")
+        self.client.get("/api/person", headers={"X-Response-Skip-Null": "true"})
+
+        assert_that(self.calls, is_(equal_to(["search", "search"])))
+
+    def test_write_invalidates_namespace(self):
+        self.client.get("/api/person")
+        self.client.get("/api/person/{}".format(PERSON_ID_1))
+
+        response = self.client.patch(
+            "/api/person/{}".format(PERSON_ID_1),
+            data=dumps(dict(firstName="Alice")),
+        )
+        assert_that(response.status_code, is_(equal_to(200)))
+
+        self.client.get("/api/person")
+        response = self.client.get("/api/person/{}".format(PERSON_ID_1))
+
+        assert_that(loads(response.get_data().decode("utf-8"))["firstName"], is_(equal_to("Alice")))
+        assert_that(self.calls, is_(equal_to(["search", "retrieve", "search", "retrieve"])))
+        assert_that(self.response_cache.stats(), has_entries(hits=0, misses=4, invalidations=1))
+
+    def test_failed_write_does_not_invalidate(self):
+        response = self.client.patch(
+            "/api/person/{}".format(uuid4()),
+            data=dumps(dict(firstName="Alice")),
+        )
+        assert_that(response.status_code, is_(equal_to(404)))
+        assert_that(self.response_cache.stats(), has_entries(invalidations=0))
+
+    def test_cache_is_registered(self):
+        response_caches = self.graph.flask.extensions[RESPONSE_CACHES]
+        assert_that(response_caches["/person"], is_(same_instance(self.response_cache)))
+
+
+def test_cached_retrieve_with_etags():
+    def loader(metadata):
+        return dict(
+            route=dict(
+                enable_etags=True,
+            ),
+        )
+
+    graph = create_object_graph(name="example", testing=True, loader=loader)
+    configure_crud(graph, Person, {
+        Operation.Retrieve: (person_retrieve, PersonSchema()),
+    }, response_cache=ResponseCache())
+    client = graph.flask.test_client()
+
+    uri = "/api/person/{}".format(PERSON_ID_1)
+    first = client.get(uri)
+    second = client.get(uri, headers={"If-None-Match": first.headers["ETag"]})
+    third = client.get(uri)
+
+    assert_that(second.status_code, is_(equal_to(304)))
+    assert_that(third.status_code, is_(equal_to(200)))
+    assert_that(third.headers["ETag"], is_(equal_to(first.headers["ETag"])))
+    assert_that(third.get_data(), is_(equal_to(first.get_data())))
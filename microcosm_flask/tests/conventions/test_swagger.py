@@ -0,0 +1,117 @@
+"""
+Swagger convention tests.
+
+"""
+from json import loads
+
+from hamcrest import (
+    assert_that,
+    equal_to,
+    is_,
+)
+from mock import patch
+
+from microcosm.api import create_object_graph
+from microcosm_flask.conventions.crud import configure_crud
+from microcosm_flask.namespaces import Namespace
+from microcosm_flask.operations import Operation
+from microcosm_flask.paging import PageSchema
+from microcosm_flask.tests.conventions.fixtures import (
+    person_retrieve_batch,
+    person_search,
+    Person,
+    PersonSchema,
+    RetrievePersonBatchSchema,
+)
+
+
+def make_swagger(graph, ns, operations):
+    return dict(
+        paths=sorted(
+            operation.value.name
+            for operation, ns, rule, func in operations
+        ),
+    )
+
+
+class TestSwagger(object):
+
+    def setup(self):
+        def loader(metadata):
+            return dict(
+                swagger_convention=dict(
+                    version="v1",
+                ),
+            )
+
+        self.graph = create_object_graph(name="example", testing=True, loader=loader)
+        self.graph.use("swagger_convention")
+        self.client = self.graph.flask.test_client()
+
+        self.add_route(Namespace(subject="foo", version="v1"))
+
+    def add_route(self, ns):
+        @self.graph.route(ns.collection_path, Operation.Search, ns)
+        def search():
+            pass
+
+    def test_swagger_is_cached(self):
+        with patch("microcosm_flask.conventions.swagger.build_swagger", side_effect=make_swagger) as mocked:
+            first = self.client.get("/api/v1/swagger")
+            second = self.client.get("/api/v1/swagger")
+
+        assert_that(mocked.call_count, is_(equal_to(1)))
+        assert_that(first.status_code, is_(equal_to(200)))
+        assert_that(second.get_data(), is_(equal_to(first.get_data())))
+        assert_that(second.headers["ETag"], is_(equal_to(first.headers["ETag"])))
+        assert_that(loads(first.get_data().decode("utf-8")), is_(equal_to(dict(paths=["search"]))))
+
+    def test_swagger_not_modified(self):
+        with patch("microcosm_flask.conventions.swagger.build_swagger", side_effect=make_swagger):
+            first = self.client.get("/api/v1/swagger")
+            second = self.client.get("/api/v1/swagger", headers={"If-None-Match": first.headers["ETag"]})
+
+        assert_that(second.status_code, is_(equal_to(304)))
+        assert_that(second.get_data(), is_(equal_to(b"")))
+
+    def test_swagger_invalidated_by_new_routes(self):
+        with patch("microcosm_flask.conventions.swagger.build_swagger", side_effect=make_swagger) as mocked:
+            first = self.client.get("/api/v1/swagger")
+            self.add_route(Namespace(subject="bar", version="v1"))
+            second = self.client.get("/api/v1/swagger", headers={"If-None-Match": first.headers["ETag"]})
+
+        assert_that(mocked.call_count, is_(equal_to(2)))
+        assert_that(second.status_code, is_(equal_to(200)))
+        assert_that(loads(second.get_data().decode("utf-8")), is_(equal_to(dict(paths=["search", "search"]))))
+
+
+def test_swagger_with_search():
+    def loader(metadata):
+        return dict(
+            swagger_convention=dict(
+                version="v1",
+            ),
+        )
+
+    graph = create_object_graph(name="example", testing=True, loader=loader)
+    graph.use("swagger_convention")
+    ns = Namespace(subject=Person, version="v1")
+    configure_crud(graph, ns.subject, {
+        Operation.RetrieveBatch: (person_retrieve_batch, RetrievePersonBatchSchema(), PersonSchema()),
+        Operation.Search: (person_search, PageSchema(), PersonSchema()),
+    }, ns.path)
+    client = graph.flask.test_client()
+
+    # validation fetches the swagger json schema over the network
+    with patch("microcosm_flask.swagger.definitions.swagger.Swagger.validate"):
+        response = client.get("/api/v1/swagger")
+
+    assert_that(response.status_code, is_(equal_to(200)))
+    definitions = loads(response.get_data().decode("utf-8"))["definitions"]
+    for name in ("PersonList", "PersonBatchList"):
+        assert_that(definitions[name]["properties"]["items"], is_(equal_to({
+            "type": "array",
+            "items": {
+                "$ref": "#/definitions/Person",
+            },
+        })))
@@ -0,0 +1,63 @@
+"""
+Test nested list.
+
+"""
+from hamcrest import (
+    assert_that,
+    equal_to,
+    is_,
+)
+from marshmallow import fields, post_dump, Schema
+from mock import patch
+
+from microcosm_flask.fields import NestedList
+
+
+class ItemSchema(Schema):
+    name = fields.String()
+    value = fields.Integer()
+
+
+class PassManySchema(Schema):
+    name = fields.String()
+
+    @post_dump(pass_many=True)
+    def count(self, data, many):
+        if many:
+            return [dict(item, count=len(data)) for item in data]
+        return data
+
+
+class NestedListSchema(Schema):
+    items = NestedList(fields.Nested(ItemSchema))
+
+
+class GenericListSchema(Schema):
+    items = fields.List(fields.Nested(ItemSchema))
+
+
+class PassManyListSchema(Schema):
+    items = NestedList(fields.Nested(PassManySchema))
+
+
+def test_nested_list_dumps_in_batch():
+    obj = dict(items=[dict(name="foo", value=1), dict(name="bar", value=2)])
+
+    with patch.object(ItemSchema, "dump", autospec=True, side_effect=ItemSchema.dump) as mocked:
+        result = NestedListSchema().dump(obj)
+
+    assert_that(mocked.call_count, is_(equal_to(1)))
+    assert_that(result.data, is_(equal_to(GenericListSchema().dump(obj).data)))
+
+
+def test_nested_list_dumps_pass_many_per_item():
+    obj = dict(items=[dict(name="foo"), dict(name="bar")])
+    result = PassManyListSchema().dump(obj)
+
+    assert_that(result.data, is_(equal_to(dict(items=[dict(name="foo"), dict(name="bar")]))))
+
+
+def test_nested_list_errors():
+    obj = dict(items=[dict(name="foo", value=1), dict(name="bar", value="bar")])
+
+    assert_that(NestedListSchema().dump(obj), is_(equal_to(GenericListSchema().dump(obj))))
@@ -11,7 +11,7 @@ from hamcrest import (
 from enum import Enum, IntEnum, unique
 from marshmallow import Schema, fields
 
-from microcosm_flask.fields import EnumField
+from microcosm_flask.fields import CursorField, EnumField, NestedList
 from microcosm_flask.swagger.schema import build_schema, build_parameter
 from microcosm_flask.tests.conventions.fixtures import NewPersonSchema
 
@@ -35,6 +35,7 @@ class TestSchema(Schema):
     names = fields.List(fields.String)
     payload = fields.Dict()
     ref = fields.Nested(NewPersonSchema)
+    cursor = CursorField()
 
 
 def test_schema_generation():
@@ -73,6 +74,13 @@ def test_field_format():
     })))
 
 
+def test_field_cursor():
+    parameter = build_parameter(TestSchema().fields["cursor"])
+    assert_that(parameter, is_(equal_to({
+        "type": "string",
+    })))
+
+
 def test_field_enum():
     parameter = build_parameter(TestSchema().fields["choice"])
     assert_that(parameter, is_(equal_to({
@@ -116,3 +124,13 @@ def test_field_nested():
     assert_that(parameter, is_(equal_to({
         "$ref": "#/definitions/NewPerson",
     })))
+
+
+def test_field_nested_list():
+    parameter = build_parameter(NestedList(fields.Nested(NewPersonSchema)))
+    assert_that(parameter, is_(equal_to({
+        "type": "array",
+        "items": {
+            "$ref": "#/definitions/NewPerson",
+        },
+    })))
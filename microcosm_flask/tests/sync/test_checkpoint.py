@@ -0,0 +1,78 @@
+"""
+Sync checkpoint tests.
+
+"""
+from os import remove
+from tempfile import NamedTemporaryFile
+
+from hamcrest import (
+    assert_that,
+    contains,
+    equal_to,
+    is_,
+)
+
+from microcosm_flask.sync.checkpoint import Checkpoint
+from microcosm_flask.sync.push import ParallelPusher
+from microcosm_flask.tests.sync.test_push import INPUTS, SessionFactory
+
+
+def read_lines(path):
+    with open(path) as file_:
+        return file_.read().splitlines()
+
+
+class TestCheckpoint(object):
+
+    def setup(self):
+        with NamedTemporaryFile(suffix=".checkpoint", delete=False) as file_:
+            self.path = file_.name
+
+    def teardown(self):
+        remove(self.path)
+
+    def test_flush_in_batches(self):
+        checkpoint = Checkpoint(self.path, flush_size=2)
+
+        checkpoint.add(["foo"])
+        assert_that(read_lines(self.path), is_(equal_to([])))
+
+        checkpoint.add(["bar"])
+        assert_that(read_lines(self.path), contains("foo", "bar"))
+
+        checkpoint.add(["baz"])
+        checkpoint.close()
+        assert_that(read_lines(self.path), contains("foo", "bar", "baz"))
+
+    def test_resume(self):
+        checkpoint = Checkpoint(self.path)
+        checkpoint.add(["foo"])
+        checkpoint.close()
+
+        resumed = Checkpoint(self.path, resume=True)
+        assert_that("foo" in resumed, is_(equal_to(True)))
+        assert_that(list(resumed.skip_completed([("foo", {}), ("bar", {})])), contains(("bar", {})))
+        resumed.close()
+
+        # without resume, the checkpoint starts over
+        restarted = Checkpoint(self.path)
+        assert_that(len(restarted), is_(equal_to(0)))
+        restarted.close()
+        assert_that(read_lines(self.path), is_(equal_to([])))
+
+    def test_push_with_checkpoint(self):
+        checkpoint = Checkpoint(self.path, flush_size=100)
+        checkpoint.add([href for href, resource in INPUTS[:3]])
+
+        session_factory = SessionFactory()
+        pusher = ParallelPusher(
+            concurrency=2,
+            batch_size=1,
+            session_factory=session_factory,
+            checkpoint=checkpoint,
+        )
+        pusher.push(checkpoint.skip_completed(INPUTS), "http://localhost/api", keep_instance_path=False)
+        checkpoint.close()
+
+        assert_that(sorted(session_factory.uris), is_(equal_to(sorted(href for href, resource in INPUTS[3:]))))
+        assert_that(sorted(read_lines(self.path)), is_(equal_to(sorted(href for href, resource in INPUTS))))
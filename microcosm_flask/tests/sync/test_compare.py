@@ -0,0 +1,54 @@
+"""
+Sync compare tests.
+
+"""
+from os import remove
+from tempfile import NamedTemporaryFile
+
+from hamcrest import (
+    assert_that,
+    contains,
+    equal_to,
+    is_,
+)
+from yaml import safe_dump_all
+
+from microcosm_flask.sync.compare import compare, to_index
+
+
+def write_yaml(resources):
+    with NamedTemporaryFile("w", suffix=".yaml", delete=False) as file_:
+        safe_dump_all(({href: resource} for href, resource in resources), file_)
+    return file_.name
+
+
+class TestCompare(object):
+
+    def setup(self):
+        self.left = write_yaml([
+            ("foo", dict(name="foo", tags=["a", "b"])),
+            ("bar", dict(name="bar")),
+            ("baz", dict(name="baz")),
+        ])
+        self.right = write_yaml([
+            ("qux", dict(name="qux")),
+            ("baz", dict(name="other")),
+            ("foo", dict(tags=["a", "b"], name="foo")),
+        ])
+
+    def teardown(self):
+        remove(self.left)
+        remove(self.right)
+
+    def test_to_index(self):
+        assert_that(sorted(to_index(self.left).keys()), contains("bar", "baz", "foo"))
+
+    def test_compare(self):
+        only_left, only_right, different = compare(to_index(self.left), to_index(self.right))
+
+        assert_that(only_left, contains("bar"))
+        assert_that(only_right, contains("qux"))
+        assert_that(different, contains("baz"))
+
+    def test_compare_same(self):
+        assert_that(compare(to_index(self.left), to_index(self.left)), is_(equal_to(([], [], []))))
@@ -0,0 +1,42 @@
+"""
+Sync format tests.
+
+"""
+from six import StringIO
+
+from hamcrest import (
+    assert_that,
+    equal_to,
+    is_,
+)
+
+from microcosm_flask.sync.formats import dump, get_format, JSONL, load, YAML
+
+
+RESOURCES = [
+    ("http://localhost/api/foo/1", dict(name="foo", _links=dict(self=dict(href="http://localhost/api/foo/1")))),
+    ("http://localhost/api/foo/2", dict(name="bar", tags=["a", "b"], count=2)),
+]
+
+
+def test_get_format():
+    assert_that(get_format("resources.yaml"), is_(equal_to(YAML)))
+    assert_that(get_format("resources.jsonl"), is_(equal_to(JSONL)))
+    assert_that(get_format("resources.ndjson"), is_(equal_to(JSONL)))
+    assert_that(get_format("-"), is_(equal_to(YAML)))
+    assert_that(get_format("resources.yaml", JSONL), is_(equal_to(JSONL)))
+
+
+def test_round_trip():
+    for format_ in (JSONL, YAML):
+        destination = StringIO()
+        dump(iter(RESOURCES), destination, format_)
+        destination.seek(0)
+        assert_that(list(load(destination, format_)), is_(equal_to(RESOURCES)))
+
+
+def test_jsonl_one_resource_per_line():
+    destination = StringIO()
+    dump(RESOURCES, destination, JSONL)
+
+    assert_that(len(destination.getvalue().splitlines()), is_(equal_to(2)))
@@ -0,0 +1,158 @@
+"""
+Sync pull tests.
+
+"""
+from argparse import Namespace as Arguments
+from os import remove
+from re import compile as compile_regex
+from tempfile import NamedTemporaryFile
+from threading import Lock
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains,
+    equal_to,
+    is_,
+    raises,
+)
+from requests.exceptions import HTTPError
+
+from microcosm_flask.sync.pull import pull_json
+
+
+BASE_URL = "http://localhost/api/"
+
+
+def make_item(subject, index):
+    return dict(
+        id=index,
+        _links=dict(
+            self=dict(href="http://localhost/api/{}/{}".format(subject, index)),
+        ),
+    )
+
+
+def make_page(subject, offset, count=4, limit=2):
+    page = dict(
+        items=[make_item(subject, index) for index in range(offset, min(offset + limit, count))],
+        _links=dict(
+            self=dict(href="http://localhost/api/{}?offset={}".format(subject, offset)),
+        ),
+    )
+    if offset + limit < count:
+        page["_links"]["next"] = dict(href="http://localhost/api/{}?offset={}".format(subject, offset + limit))
+    return page
+
+
+RESOURCES = {
+    BASE_URL: dict(
+        _links=dict(
+            self=dict(href=BASE_URL),
+            search=[
+                dict(href="http://localhost/api/{}?offset=0".format(subject))
+                for subject in ("bar", "baz", "foo")
+            ],
+        ),
+    ),
+}
+for subject in ("bar", "baz", "foo"):
+    for offset in (0, 2):
+        RESOURCES["http://localhost/api/{}?offset={}".format(subject, offset)] = make_page(subject, offset)
+
+
+class Response(object):
+
+    def __init__(self, uri, resources, status_code=200):
+        self.uri = uri
+        self.resources = resources
+        self.status_code = status_code
+        self.headers = dict(ETag="etag-{}".format(uri))
+
+    def raise_for_status(self):
+        if self.uri not in self.resources:
+            raise HTTPError("Not found: {}".format(self.uri))
+
+    def json(self):
+        return self.resources[self.uri]
+
+
+class Session(object):
+    """
+    A fake session that serves a fixed set of resources.
+
+    """
+    def __init__(self, resources=RESOURCES, modified=None):
+        self.resources = resources
+        self.modified = modified
+        self.uris = []
+        self.lock = Lock()
+
+    def get(self, uri, headers=None):
+        with self.lock:
+            self.uris.append(uri)
+        if headers and self.modified is not None and uri not in self.modified:
+            if headers.get("If-None-Match") == "etag-{}".format(uri):
+                return Response(uri, {}, status_code=304)
+        return Response(uri, self.resources)
+
+
+def make_args(concurrency, cache=None):
+    return Arguments(
+        cache=cache,
+        concurrency=concurrency,
+        exclude_first=True,
+        relation_patterns=[compile_regex("search"), compile_regex("next")],
+    )
+
+
+def test_pull_json():
+    session = Session()
+    hrefs = [href for href, resource in pull_json(make_args(1), BASE_URL, session=session)]
+
+    assert_that(hrefs, contains(*[
+        "http://localhost/api/{}/{}".format(subject, index)
+        for subject in ("foo", "baz", "bar")
+        for index in range(4)
+    ]))
+    assert_that(sorted(session.uris), is_(equal_to(sorted(RESOURCES.keys()))))
+
+
+def test_pull_json_concurrent_order():
+    expected = list(pull_json(make_args(1), BASE_URL, session=Session()))
+
+    for concurrency in (2, 4, 8):
+        session = Session()
+        assert_that(list(pull_json(make_args(concurrency), BASE_URL, session=session)), is_(equal_to(expected)))
+        assert_that(sorted(session.uris), is_(equal_to(sorted(RESOURCES.keys()))))
+
+
+def test_pull_json_concurrent_error():
+    resources = dict(RESOURCES)
+    del resources["http://localhost/api/baz?offset=2"]
+
+    assert_that(
+        calling(list).with_args(pull_json(make_args(4), BASE_URL, session=Session(resources))),
+        raises(HTTPError),
+    )
+
+
+class TestPullWithCache(object):
+
+    def setup(self):
+        with NamedTemporaryFile(suffix=".jsonl", delete=False) as file_:
+            self.path = file_.name
+        remove(self.path)
+
+    def teardown(self):
+        remove(self.path)
+
+    def test_pull_json_conditional(self):
+        expected = list(pull_json(make_args(2, self.path), BASE_URL, session=Session()))
+
+        modified = {"http://localhost/api/foo?offset=0"}
+        session = Session(modified=modified)
+        resources = list(pull_json(make_args(2, self.path), BASE_URL, session=session))
+
+        assert_that(resources, is_(equal_to(expected)))
+        assert_that(sorted(session.uris), is_(equal_to(sorted(RESOURCES.keys()))))
@@ -0,0 +1,155 @@
+"""
+Sync push tests.
+
+"""
+from json import loads
+from threading import Lock
+import zlib
+
+from hamcrest import (
+    assert_that,
+    contains,
+    contains_inanyorder,
+    equal_to,
+    is_,
+)
+from mock import patch
+from requests.exceptions import ConnectionError
+
+from microcosm_flask.sync.push import encode_json, ParallelPusher, push_json
+from microcosm_flask.sync.toposort import iter_levels
+
+
+def make_resource(href, parent_href=None):
+    links = dict(self=dict(href=href))
+    if parent_href is not None:
+        links["parent"] = dict(href=parent_href)
+    return href, dict(_links=links)
+
+
+INPUTS = [
+    make_resource("http://localhost/api/foo/1"),
+    make_resource("http://localhost/api/foo/2"),
+    make_resource("http://localhost/api/bar/1", "http://localhost/api/foo/1"),
+    make_resource("http://localhost/api/bar/2", "http://localhost/api/foo/2"),
+    make_resource("http://localhost/api/baz/1", "http://localhost/api/bar/1"),
+    make_resource("http://localhost/api/qux/1", "http://localhost/api/external/1"),
+]
+
+
+class Response(object):
+
+    def raise_for_status(self):
+        pass
+
+
+class Session(object):
+    """
+    A fake session that records pushed URIs (and fails as often as requested).
+
+    """
+    def __init__(self, uris, lock, failures):
+        self.uris = uris
+        self.lock = lock
+        self.failures = failures
+
+    def put(self, uri, data, headers):
+        with self.lock:
+            if self.failures:
+                self.failures.pop()
+                raise ConnectionError("failed")
+            self.uris.append(uri)
+        return Response()
+
+
+class SessionFactory(object):
+
+    def __init__(self, failures=0):
+        self.uris = []
+        self.lock = Lock()
+        self.failures = [None] * failures
+        self.count = 0
+
+    def __call__(self):
+        self.count += 1
+        return Session(self.uris, self.lock, self.failures)
+
+
+def test_iter_levels():
+    levels = iter_levels(INPUTS)
+
+    assert_that([[href for href, resource in level] for level in levels], contains(
+        [
+            "http://localhost/api/foo/1",
+            "http://localhost/api/foo/2",
+            "http://localhost/api/qux/1",
+        ],
+        [
+            "http://localhost/api/bar/1",
+            "http://localhost/api/bar/2",
+        ],
+        [
+            "http://localhost/api/baz/1",
+        ],
+    ))
+
+
+def test_iter_levels_preserves_resources():
+    levels = iter_levels(INPUTS + INPUTS[:1])
+
+    assert_that([item for level in levels for item in level], contains_inanyorder(*INPUTS))
+
+
+def test_parallel_push():
+    session_factory = SessionFactory()
+    pusher = ParallelPusher(concurrency=4, batch_size=1, session_factory=session_factory)
+
+    pusher.push(INPUTS, "http://example.com/api", keep_instance_path=False)
+
+    uris = [uri.replace("http://example.com/api/", "") for uri in session_factory.uris]
+    assert_that(uris[:3], contains_inanyorder("foo/1", "foo/2", "qux/1"))
+    assert_that(uris[3:5], contains_inanyorder("bar/1", "bar/2"))
+    assert_that(uris[5:], contains("baz/1"))
+    assert_that(pusher.in_flight, is_(equal_to(0)))
+
+
+def test_parallel_push_retries():
+    session_factory = SessionFactory(failures=1)
+    pusher = ParallelPusher(concurrency=2, batch_size=1, backoff=0.001, session_factory=session_factory)
+
+    pusher.push(INPUTS[:1], "http://example.com/api", keep_instance_path=False)
+
+    assert_that(session_factory.uris, contains("http://example.com/api/foo/1"))
+    # the session is recreated after a connection error
+    assert_that(session_factory.count, is_(equal_to(2)))
+
+
+def test_parallel_push_without_sessions():
+    with patch("microcosm_flask.sync.push.requests") as mocked:
+        push_json(INPUTS[:2], "http://example.com/api", batch_size=1, concurrency=2)
+
+    assert_that(mocked.put.call_count, is_(equal_to(2)))
+    assert_that(mocked.Session.call_count, is_(equal_to(0)))
+
+
+def test_parallel_push_with_sessions():
+    with patch("microcosm_flask.sync.push.requests") as mocked:
+        push_json(INPUTS[:2], "http://example.com/api", batch_size=1, enable_sessions=True, concurrency=2)
+
+    assert_that(mocked.put.call_count, is_(equal_to(0)))
+    assert_that(mocked.Session.return_value.put.call_count, is_(equal_to(2)))
+
+
+def test_encode_json_compressed():
+    data = dict(items=["x"] * 1000)
+    body, headers = encode_json(data, compress=True)
+
+    assert_that(headers["Content-Encoding"], is_(equal_to("gzip")))
+    assert_that(loads(zlib.decompress(body, 16 + zlib.MAX_WBITS).decode("utf-8")), is_(equal_to(data)))
+
+
+def test_encode_json_small():
+    body, headers = encode_json(dict(id=1), compress=True)
+
+    assert_that(headers, is_(equal_to({"Content-Type": "application/json"})))
+    assert_that(loads(body), is_(equal_to(dict(id=1))))
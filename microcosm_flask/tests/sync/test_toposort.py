@@ -0,0 +1,79 @@
+"""
+Sync toposort tests.
+
+"""
+from datetime import datetime
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains,
+    equal_to,
+    is_,
+    raises,
+)
+
+from microcosm_flask.sync.toposort import toposorted
+
+
+def make_resource(href, *parent_hrefs, **kwargs):
+    links = dict(self=dict(href=href))
+    if parent_hrefs:
+        links["parent"] = [dict(href=parent_href) for parent_href in parent_hrefs]
+    return href, dict(_links=links, **kwargs)
+
+
+def test_toposorted():
+    inputs = [
+        make_resource("baz", "bar"),
+        make_resource("bar", "foo", "external"),
+        make_resource("foo"),
+        make_resource("qux", "foo"),
+    ]
+
+    assert_that([href for href, resource in toposorted(inputs)], contains("foo", "qux", "bar", "baz"))
+
+
+def test_toposorted_preserves_resources():
+    created_at = datetime(2016, 1, 1)
+    inputs = [
+        make_resource("bar", "foo", created_at=created_at),
+        make_resource("foo"),
+    ]
+
+    assert_that(list(toposorted(inputs)), is_(equal_to([inputs[1], inputs[0]])))
+
+
+def test_toposorted_streams_roots():
+    consumed = []
+
+    def iter_inputs():
+        for item in [make_resource("foo"), make_resource("bar", "foo"), make_resource("baz")]:
+            consumed.append(item[0])
+            yield item
+
+    items = toposorted(iter_inputs())
+
+    assert_that(next(items)[0], is_(equal_to("foo")))
+    assert_that(consumed, contains("foo"))
+    assert_that(next(items)[0], is_(equal_to("bar")))
+    assert_that(consumed, contains("foo", "bar"))
+
+
+def test_toposorted_deep_chain():
+    count = 5000
+    inputs = [
+        make_resource(str(index), str(index - 1))
+        for index in reversed(range(1, count))
+    ] + [make_resource("0")]
+
+    assert_that([href for href, resource in toposorted(inputs)], is_(equal_to([str(index) for index in range(count)])))
+
+
+def test_toposorted_cycle():
+    inputs = [
+        make_resource("foo", "bar"),
+        make_resource("bar", "foo"),
+    ]
+
+    assert_that(calling(list).with_args(toposorted(inputs)), raises(Exception, "Found cycle at foo"))
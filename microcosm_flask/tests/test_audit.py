@@ -0,0 +1,134 @@
+"""
+Audit sink tests.
+
+"""
+from hamcrest import (
+    assert_that,
+    calling,
+    contains,
+    equal_to,
+    is_,
+    raises,
+)
+from flask import g
+from mock import MagicMock, patch
+
+from microcosm.api import create_object_graph
+from microcosm_flask.audit import AUDIT_SINK, QueuedAuditSink
+from microcosm_flask.namespaces import Namespace
+from microcosm_flask.operations import Operation
+
+
+def make_record(value):
+    return lambda: value
+
+
+def queued_records(sink):
+    return [
+        format_record()
+        for logger, format_record, snapshot in list(sink.queue.queue)
+    ]
+
+
+def test_queued_sink_unsupported_overflow():
+    assert_that(calling(QueuedAuditSink).with_args(overflow="ignore"), raises(ValueError))
+
+
+@patch.object(QueuedAuditSink, "start")
+def test_queued_sink_drop_oldest(start):
+    sink = QueuedAuditSink(maxsize=2)
+    logger = MagicMock()
+
+    for value in range(4):
+        sink.emit(logger, make_record(value))
+
+    assert_that(queued_records(sink), contains(2, 3))
+    assert_that(sink.dropped, is_(equal_to(2)))
+
+
+@patch.object(QueuedAuditSink, "start")
+def test_queued_sink_sample(start):
+    sink = QueuedAuditSink(maxsize=2, overflow="sample", sample_rate=0.5)
+    logger = MagicMock()
+
+    with patch("microcosm_flask.audit.random", side_effect=[0.9, 0.1]):
+        for value in range(4):
+            sink.emit(logger, make_record(value))
+
+    # the third record is discarded; the fourth replaces the oldest
+    assert_that(queued_records(sink), contains(1, 3))
+    assert_that(sink.dropped, is_(equal_to(2)))
+
+
+def test_queued_sink_writes_records():
+    sink = QueuedAuditSink(maxsize=2, overflow="block")
+    logger = MagicMock()
+
+    for value in range(4):
+        sink.emit(logger, make_record(value))
+    sink.flush()
+
+    assert_that([args[0] for args, kwargs in logger.info.call_args_list], contains(0, 1, 2, 3))
+    assert_that(sink.emitted, is_(equal_to(4)))
+    assert_that(sink.dropped, is_(equal_to(0)))
+
+
+def test_audit_with_queued_sink():
+    def loader(metadata):
+        return dict(
+            audit=dict(
+                enable_queue=True,
+            ),
+        )
+
+    graph = create_object_graph(name="example", testing=True, loader=loader)
+    ns = Namespace(subject="foo")
+
+    @graph.route(ns.collection_path, Operation.Search, ns)
+    def search_foo():
+        return "", 200
+
+    client = graph.flask.test_client()
+    sink = graph.flask.extensions[AUDIT_SINK]
+
+    with patch("microcosm_flask.audit.getLogger") as mocked:
+        response = client.get("/api/foo")
+        sink.flush()
+
+    assert_that(response.status_code, is_(equal_to(200)))
+    audit_dict = mocked.return_value.info.call_args[0][0]
+    assert_that(audit_dict["operation"], is_(equal_to("foo.search.v1")))
+    assert_that(audit_dict["status_code"], is_(equal_to(200)))
+    assert_that(sink.emitted, is_(equal_to(1)))
+
+
+def test_audit_with_queued_sink_context():
+    """
+    Records are formatted and logged with the request thread's `g` values.
+
+    """
+    def loader(metadata):
+        return dict(
+            audit=dict(
+                enable_queue=True,
+            ),
+        )
+
+    graph = create_object_graph(name="example", testing=True, loader=loader)
+    ns = Namespace(subject="foo")
+
+    @graph.route(ns.collection_path, Operation.Search, ns)
+    def search_foo():
+        g.request_id = "request-id"
+        return "", 200
+
+    client = graph.flask.test_client()
+    sink = graph.flask.extensions[AUDIT_SINK]
+    request_ids = []
+
+    with patch("microcosm_flask.audit.getLogger") as mocked:
+        mocked.return_value.info.side_effect = lambda audit_dict: request_ids.append(g.get("request_id"))
+        client.get("/api/foo")
+        sink.flush()
+
+    assert_that(request_ids, contains("request-id"))
@@ -0,0 +1,37 @@
+"""
+Caching tests.
+
+"""
+from hamcrest import (
+    assert_that,
+    equal_to,
+    is_,
+    none,
+)
+
+from microcosm_flask.caching import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("foo", 1)
+    cache.set("bar", 2)
+
+    # touch "foo" so that "bar" is evicted next
+    assert_that(cache.get("foo"), is_(equal_to(1)))
+    cache.set("baz", 3)
+
+    assert_that(len(cache), is_(equal_to(2)))
+    assert_that(cache.get("bar"), is_(none()))
+    assert_that(cache.get("foo"), is_(equal_to(1)))
+    assert_that(cache.get("baz"), is_(equal_to(3)))
+
+
+def test_lru_cache_expires_keys():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("foo", 1)
+    cache.set("bar", 2, ttl=-1)
+
+    assert_that(cache.get("foo"), is_(equal_to(1)))
+    assert_that(cache.get("bar"), is_(none()))
+    assert_that("bar" in cache, is_(equal_to(False)))
@@ -0,0 +1,171 @@
+"""
+Compression tests.
+
+"""
+from json import dumps, loads
+from uuid import uuid4
+import zlib
+
+from hamcrest import (
+    assert_that,
+    calling,
+    equal_to,
+    is_,
+    has_key,
+    is_not,
+    raises,
+)
+
+from marshmallow import fields, Schema
+from microcosm.api import create_object_graph
+from microcosm_flask.compression import CODECS, Compression, DecompressedSizeExceeded, gzip_compress
+from microcosm_flask.conventions.encoding import dump_response_data, load_request_data, make_response
+from microcosm_flask.namespaces import Namespace
+from microcosm_flask.operations import Operation
+
+
+class FooSchema(Schema):
+    name = fields.String()
+
+
+def gunzip(data):
+    return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+
+
+class TestCompression(object):
+
+    def setup(self):
+        def loader(metadata):
+            return dict(
+                compression=dict(
+                    enable_responses=True,
+                    min_size=100,
+                ),
+            )
+
+        self.graph = create_object_graph(name="example", testing=True, loader=loader)
+        self.graph.use("compression")
+        ns = Namespace(subject="foo")
+
+        @self.graph.route(ns.collection_path, Operation.Search, ns)
+        def search_foo():
+            return dump_response_data(None, dict(items=["x"] * 100), conditional=True)
+
+        @self.graph.route(ns.instance_path, Operation.Retrieve, ns)
+        def retrieve_foo(foo_id):
+            return make_response(dict(id=str(foo_id)))
+
+        @self.graph.route(ns.collection_path, Operation.Create, ns)
+        def create_foo():
+            return make_response(load_request_data(FooSchema()), 201)
+
+        self.client = self.graph.flask.test_client()
+
+    def test_compress_response(self):
+        response = self.client.get("/api/foo", headers={"Accept-Encoding": "gzip, deflate"})
+
+        assert_that(response.status_code, is_(equal_to(200)))
+        assert_that(response.headers["Content-Encoding"], is_(equal_to("gzip")))
+        assert_that(response.headers["Vary"], is_(equal_to("Accept-Encoding")))
+        assert_that(loads(gunzip(response.get_data()).decode("utf-8")), is_(equal_to(dict(items=["x"] * 100))))
+
+    def test_compress_response_conditional(self):
+        first = self.client.get("/api/foo", headers={"Accept-Encoding": "gzip"})
+        second = self.client.get("/api/foo", headers={
+            "Accept-Encoding": "gzip",
+            "If-None-Match": first.headers["ETag"],
+        })
+
+        assert_that(first.headers["ETag"].startswith("W/"), is_(equal_to(True)))
+        assert_that(second.status_code, is_(equal_to(304)))
+
+    def test_skip_unaccepted(self):
+        response = self.client.get("/api/foo", headers={"Accept-Encoding": "gzip;q=0, identity"})
+
+        assert_that(response.headers, is_not(has_key("Content-Encoding")))
+        assert_that(loads(response.get_data().decode("utf-8")), is_(equal_to(dict(items=["x"] * 100))))
+
+    def test_skip_small(self):
+        foo_id = str(uuid4())
+        response = self.client.get("/api/foo/{}".format(foo_id), headers={"Accept-Encoding": "gzip"})
+
+        assert_that(response.status_code, is_(equal_to(200)))
+        assert_that(response.headers, is_not(has_key("Content-Encoding")))
+        assert_that(loads(response.get_data().decode("utf-8")), is_(equal_to(dict(id=foo_id))))
+
+    def test_decompress_request(self):
+        response = self.client.post(
+            "/api/foo",
+            data=gzip_compress(dumps(dict(name="foo")).encode("utf-8")),
+            headers={"Content-Encoding": "gzip"},
+        )
+
+        assert_that(response.status_code, is_(equal_to(201)))
+        assert_that(loads(response.get_data().decode("utf-8")), is_(equal_to(dict(name="foo"))))
+
+    def test_decompress_request_unsupported(self):
+        response = self.client.post(
+            "/api/foo",
+            data=b"data",
+            headers={"Content-Encoding": "compress"},
+        )
+
+        assert_that(response.status_code, is_(equal_to(415)))
+
+    def test_decompress_request_invalid(self):
+        response = self.client.post(
+            "/api/foo",
+            data=b"data",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+        assert_that(response.status_code, is_(equal_to(400)))
+
+    def test_decompress_request_too_large(self):
+        self.graph.flask.config["MAX_CONTENT_LENGTH"] = 1024
+        response = self.client.post(
+            "/api/foo",
+            data=gzip_compress(dumps(dict(name="x" * 2048)).encode("utf-8")),
+            headers={"Content-Encoding": "gzip"},
+        )
+
+        assert_that(response.status_code, is_(equal_to(413)))
+
+    def test_decompress_request_default_limit(self):
+        # without MAX_CONTENT_LENGTH, decompressed bodies are bounded by `max_request_size`
+        response = self.client.post(
+            "/api/foo",
+            data=gzip_compress(b" " * (11 * 1024 * 1024)),
+            headers={"Content-Encoding": "gzip"},
+        )
+
+        assert_that(response.status_code, is_(equal_to(413)))
+
+
+def test_decompress_bounded():
+    for name in ("gzip", "deflate"):
+        codec = CODECS[name]
+        data = codec.compress(b"x" * 4096)
+
+        assert_that(codec.decompress(data, 4096), is_(equal_to(b"x" * 4096)))
+        assert_that(calling(codec.decompress).with_args(data, 4095), raises(DecompressedSizeExceeded))
+        assert_that(calling(codec.decompress).with_args(data[:-8], 4096), raises(zlib.error))
+        assert_that(calling(codec.decompress).with_args(data[:8], 4096), raises(zlib.error))
+        assert_that(codec.decompress(data + b"junk", 4096), is_(equal_to(b"x" * 4096)))
+
+
+def test_compression_opt_in():
+    graph = create_object_graph(name="example", testing=True)
+    graph.use("app")
+
+    assert_that(graph.flask.extensions, is_not(has_key("compression")))
+
+
+def test_choose_encoding():
+    compression = Compression(encodings=["gzip", "deflate"])
+
+    assert_that(compression.choose_encoding("deflate, gzip;q=0.5"), is_(equal_to("gzip")))
+    assert_that(compression.choose_encoding("deflate"), is_(equal_to("deflate")))
+    assert_that(compression.choose_encoding("*"), is_(equal_to("gzip")))
+    assert_that(compression.choose_encoding("br"), is_(equal_to(None)))
+    assert_that(compression.choose_encoding(None), is_(equal_to(None)))
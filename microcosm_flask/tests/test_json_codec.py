@@ -0,0 +1,95 @@
+"""
+JSON codec tests.
+
+"""
+from json import dumps, loads
+from uuid import uuid4
+
+from hamcrest import (
+    assert_that,
+    calling,
+    equal_to,
+    instance_of,
+    is_,
+    raises,
+)
+from mock import patch
+
+from microcosm.api import create_object_graph
+from microcosm_flask.conventions.crud import configure_crud
+from microcosm_flask.json_codec import BACKENDS, JSONCodec, make_json_codec
+from microcosm_flask.operations import Operation
+from microcosm_flask.tests.conventions.fixtures import (
+    NewPersonSchema,
+    person_create,
+    person_retrieve,
+    Person,
+    PersonSchema,
+    PERSON_ID_2,
+)
+
+
+def missing_backend():
+    raise ImportError("missing")
+
+
+def test_make_json_codec_default():
+    codec = make_json_codec("json")
+    assert_that(codec, is_(instance_of(JSONCodec)))
+    assert_that(codec.name, is_(equal_to("json")))
+
+
+def test_make_json_codec_unsupported():
+    assert_that(calling(make_json_codec).with_args("yaml"), raises(ValueError))
+
+
+def test_make_json_codec_fallback():
+    with patch.dict(BACKENDS, ujson=missing_backend):
+        codec = make_json_codec("ujson")
+
+    assert_that(codec.name, is_(equal_to("json")))
+
+
+def test_fast_codec_round_trip():
+    graph = create_object_graph(name="example", testing=True)
+    codec = make_json_codec("auto")
+    uid = uuid4()
+
+    with graph.flask.test_request_context():
+        # values unsupported by the backend fall back to flask's encoder
+        data = dict(foo="bar", uid=uid, items=[1, 2, 3])
+        assert_that(loads(codec.dumps(data)), is_(equal_to(dict(foo="bar", uid=str(uid), items=[1, 2, 3]))))
+        assert_that(codec.loads(codec.dumps(dict(foo="bar"))), is_(equal_to(dict(foo="bar"))))
+
+
+def test_crud_with_json_codec():
+    def loader(metadata):
+        return dict(
+            json_codec=dict(
+                backend="auto",
+            ),
+        )
+
+    graph = create_object_graph(name="example", testing=True, loader=loader)
+    configure_crud(graph, Person, {
+        Operation.Create: (person_create, NewPersonSchema(), PersonSchema()),
+        Operation.Retrieve: (person_retrieve, PersonSchema()),
+    })
+    client = graph.flask.test_client()
+
+    response = client.post("/api/person", data=dumps(dict(firstName="Bob", lastName="Jones")))
+    assert_that(response.status_code, is_(equal_to(201)))
+    assert_that(loads(response.get_data().decode("utf-8")), is_(equal_to({
+        "id": str(PERSON_ID_2),
+        "firstName": "Bob",
+        "lastName": "Jones",
+        "_links": {
+            "self": {
+                "href": "http://localhost/api/person/{}".format(PERSON_ID_2),
+            }
+        },
+    })))
+
+    response = client.post("/api/person", data="not json")
+    assert_that(response.status_code, is_(equal_to(400)))
+    assert_that(loads(response.get_data().decode("utf-8"))["code"], is_(equal_to(400)))
@@ -7,6 +7,8 @@ from hamcrest import (
     equal_to,
     is_,
     none,
+    not_,
+    same_instance,
 )
 from mock import Mock
 
@@ -158,3 +160,15 @@ def test_namespace_accepts_controller():
         url = ns.url_for(Operation.Search)
         assert_that(url, is_(equal_to("http://localhost/api/foo")))
         assert_that(ns.controller, is_(equal_to(controller)))
+
+
+def test_parse_endpoint_returns_new_namespace():
+    """
+    Parsed endpoints are memoized without sharing namespace instances.
+
+    """
+    _, first = Namespace.parse_endpoint("foo.search_for.bar.v1")
+    _, second = Namespace.parse_endpoint("foo.search_for.bar.v1")
+    first.subject = "baz"
+    assert_that(first, is_(not_(same_instance(second))))
+    assert_that(second.subject, is_(equal_to("foo")))
@@ -4,8 +4,11 @@ Operation tests.
 """
 from hamcrest import (
     assert_that,
+    calling,
     equal_to,
     is_,
+    raises,
+    same_instance,
 )
 
 from microcosm_flask.operations import Operation
@@ -37,3 +40,20 @@ def test_endpoint_pattern():
         Operation.SearchFor.endpoint_pattern,
         is_(equal_to("(?P<subject>[^.]*)[.](?P<operation>[^.]*)[.](?P<object_>[^.]*)[.](?P<version>[^.]*)")),
     )
+
+
+def test_from_name_unknown():
+    """
+    Unknown operation names are rejected.
+
+    """
+    assert_that(calling(Operation.from_name).with_args("unknown"), raises(ValueError))
+
+
+def test_endpoint_regex():
+    """
+    Operations precompile their endpoint patterns.
+
+    """
+    assert_that(Operation.SearchFor.endpoint_regex.pattern, is_(equal_to(Operation.SearchFor.endpoint_pattern)))
+    assert_that(Operation.SearchFor.endpoint_regex, is_(same_instance(Operation.SearchFor.endpoint_regex)))
@@ -3,19 +3,39 @@ Paging tests.
 
 """
 from enum import Enum, unique
+from json import dumps, loads
 from uuid import uuid4
 
 from hamcrest import (
     assert_that,
+    calling,
     equal_to,
+    has_key,
     is_,
+    is_not,
+    raises,
+    same_instance,
 )
+from marshmallow import fields, Schema
 from microcosm.api import create_object_graph
+from werkzeug.exceptions import UnprocessableEntity
 
 from microcosm_flask.conventions.encoding import load_query_string_data
 from microcosm_flask.namespaces import Namespace
 from microcosm_flask.operations import Operation
-from microcosm_flask.paging import Page, PageSchema, PaginatedList
+from microcosm_flask.fields.cursor_field import encode_cursor
+from microcosm_flask.paging import (
+    CountHintPageSchema,
+    CursorPage,
+    CursorPageSchema,
+    CursorPaginatedList,
+    make_cursor_paginated_list_schema,
+    make_list_schema_for,
+    make_paginated_list_schema,
+    Page,
+    PageSchema,
+    PaginatedList,
+)
 
 
 def test_page_from_query_string():
@@ -81,6 +101,102 @@ def test_paginated_list_to_dict():
         })))
 
 
+def test_paginated_list_without_count():
+    graph = create_object_graph(name="example", testing=True)
+    ns = Namespace(subject="foo")
+
+    @graph.route(ns.collection_path, Operation.Search, ns)
+    def search_foo():
+        pass
+
+    full_page = PaginatedList(ns, Page(2, 2), ["1", "2"], None)
+    last_page = PaginatedList(ns, Page(4, 2), ["3"], None)
+
+    with graph.flask.test_request_context():
+        assert_that(full_page.to_dict(), is_not(has_key("count")))
+        assert_that(full_page.to_dict()["_links"]["next"], is_(equal_to({
+            "href": "http://localhost/api/foo?offset=4&limit=2",
+        })))
+        assert_that(last_page.to_dict()["_links"], is_not(has_key("next")))
+
+
+def test_paginated_list_lookahead():
+    graph = create_object_graph(name="example", testing=True)
+    ns = Namespace(subject="foo")
+
+    @graph.route(ns.collection_path, Operation.Search, ns)
+    def search_foo():
+        pass
+
+    page = Page.from_query_string(dict(offset=2, limit=2, count_hint="none"))
+    paginated_list = PaginatedList(ns, page, ["1", "2", "3"], None)
+    last_page = PaginatedList(ns, page, ["1", "2"], None)
+
+    with graph.flask.test_request_context():
+        assert_that(paginated_list.to_dict(), is_(equal_to({
+            "items": [
+                "1",
+                "2",
+            ],
+            "offset": 2,
+            "limit": 2,
+            "count_hint": "none",
+            "_links": {
+                "self": {
+                    "href": "http://localhost/api/foo?offset=2&limit=2&count_hint=none",
+                },
+                "next": {
+                    "href": "http://localhost/api/foo?offset=4&limit=2&count_hint=none",
+                },
+                "prev": {
+                    "href": "http://localhost/api/foo?offset=0&limit=2&count_hint=none",
+                },
+            },
+        })))
+        assert_that(last_page.to_dict()["_links"], is_not(has_key("next")))
+
+
+def test_paginated_list_estimated_count():
+    graph = create_object_graph(name="example", testing=True)
+    ns = Namespace(subject="foo")
+
+    @graph.route(ns.collection_path, Operation.Search, ns)
+    def search_foo():
+        pass
+
+    # the estimate is too low; the next link must not depend on it
+    page = Page.from_query_string(dict(offset=2, limit=2, count_hint="estimate"))
+    paginated_list = PaginatedList(ns, page, (item for item in ["1", "2", "3"]), 3)
+
+    with graph.flask.test_request_context():
+        dct = loads("".join(paginated_list.iter_json(dumps)))
+        assert_that(dct["count"], is_(equal_to(3)))
+        assert_that(dct["count_estimated"], is_(equal_to(True)))
+        assert_that(dct["items"], is_(equal_to(["1", "2"])))
+        assert_that(dct["_links"]["next"], is_(equal_to({
+            "href": "http://localhost/api/foo?offset=4&limit=2&count_hint=estimate",
+        })))
+
+
+def test_paginated_list_schema_count():
+    ns = Namespace(subject="foo")
+    schema = make_paginated_list_schema(ns, PageSchema())()
+
+    assert_that(schema.fields["count"].required, is_(equal_to(False)))
+    assert_that(schema.fields, has_key("count_estimated"))
+
+
+def test_count_hint_page_schema():
+    graph = create_object_graph(name="example", testing=True)
+
+    with graph.flask.test_request_context("/?count_hint=none"):
+        qs = load_query_string_data(CountHintPageSchema())
+        assert_that(qs, is_(equal_to(dict(offset=0, limit=20, count_hint="none"))))
+
+    with graph.flask.test_request_context("/?count_hint=other"):
+        assert_that(calling(load_query_string_data).with_args(CountHintPageSchema()), raises(UnprocessableEntity))
+
+
 def test_paginated_list_relation_to_dict():
     graph = create_object_graph(name="example", testing=True)
     ns = Namespace(subject="foo", object_="bar")
@@ -174,3 +290,225 @@ def test_custom_paginated_list():
             "uid": str(uid),
             "value": "ONE",
         })))
+
+
+def test_paginated_list_iter_json():
+    graph = create_object_graph(name="example", testing=True)
+    ns = Namespace(subject="foo")
+
+    @graph.route(ns.collection_path, Operation.Search, ns)
+    def search_foo():
+        pass
+
+    paginated_list = PaginatedList(ns, Page(2, 2), (item for item in ["1", "2"]), 10)
+
+    with graph.flask.test_request_context():
+        assert_that(loads("".join(paginated_list.iter_json(dumps))), is_(equal_to({
+            "count": 10,
+            "items": [
+                "1",
+                "2",
+            ],
+            "offset": 2,
+            "limit": 2,
+            "_links": {
+                "self": {
+                    "href": "http://localhost/api/foo?offset=2&limit=2",
+                },
+                "next": {
+                    "href": "http://localhost/api/foo?offset=4&limit=2",
+                },
+                "prev": {
+                    "href": "http://localhost/api/foo?offset=0&limit=2",
+                },
+            }
+        })))
+
+
+def test_paginated_list_to_dict_with_schema():
+    graph = create_object_graph(name="example", testing=True)
+    ns = Namespace(subject="foo")
+
+    @graph.route(ns.collection_path, Operation.Search, ns)
+    def search_foo():
+        pass
+
+    class FooSchema(Schema):
+        name = fields.String(dump_to="fullName")
+
+    paginated_list = PaginatedList(ns, Page(0, 2), [dict(name="foo"), dict(name="bar")], 2, schema=FooSchema())
+
+    with graph.flask.test_request_context():
+        assert_that(paginated_list.to_dict()["items"], is_(equal_to([
+            dict(fullName="foo"),
+            dict(fullName="bar"),
+        ])))
+
+
+def make_cursor_graph():
+    def loader(metadata):
+        return dict(
+            flask=dict(
+                secret_key="secret",
+            ),
+        )
+
+    return create_object_graph(name="example", testing=True, loader=loader)
+
+
+def test_cursor_page_schema():
+    graph = make_cursor_graph()
+
+    with graph.flask.test_request_context():
+        cursor = encode_cursor([1, "foo"])
+
+    with graph.flask.test_request_context("/?cursor={}&limit=2".format(cursor)):
+        page = CursorPage.from_query_string(load_query_string_data(CursorPageSchema()))
+        assert_that(page.cursor, is_(equal_to([1, "foo"])))
+        assert_that(page.limit, is_(equal_to(2)))
+
+    with graph.flask.test_request_context("/?cursor={}x".format(cursor)):
+        assert_that(calling(load_query_string_data).with_args(CursorPageSchema()), raises(UnprocessableEntity))
+
+
+def test_cursor_paginated_list_to_dict():
+    graph = make_cursor_graph()
+    ns = Namespace(subject="foo")
+
+    @graph.route(ns.collection_path, Operation.Search, ns)
+    def search_foo():
+        pass
+
+    uid = uuid4()
+    items = [dict(id="1"), dict(id=uid)]
+
+    with graph.flask.test_request_context():
+        paginated_list = CursorPaginatedList(ns, CursorPage(["0"], 2), iter(items))
+        dct = paginated_list.to_dict()
+        cursor = encode_cursor(["0"])
+        next_cursor = encode_cursor([str(uid)])
+
+    assert_that(dct, is_(equal_to({
+        "cursor": cursor,
+        "limit": 2,
+        "items": items,
+        "_links": {
+            "self": {
+                "href": "http://localhost/api/foo?cursor={}&limit=2".format(cursor),
+            },
+            "next": {
+                "href": "http://localhost/api/foo?cursor={}&limit=2".format(next_cursor),
+            },
+        },
+    })))
+
+
+def test_cursor_paginated_list_last_page():
+    graph = make_cursor_graph()
+    ns = Namespace(subject="foo")
+
+    @graph.route(ns.collection_path, Operation.Search, ns)
+    def search_foo():
+        pass
+
+    with graph.flask.test_request_context():
+        paginated_list = CursorPaginatedList(ns, CursorPage(None, 2), [dict(id="1")])
+        assert_that(paginated_list.to_dict()["_links"], is_(equal_to({
+            "self": {
+                "href": "http://localhost/api/foo?limit=2",
+            },
+        })))
+
+
+def test_cursor_paginated_list_schema_dump():
+    graph = make_cursor_graph()
+    ns = Namespace(subject="foo")
+
+    @graph.route(ns.collection_path, Operation.Search, ns)
+    def search_foo():
+        pass
+
+    schema = make_cursor_paginated_list_schema(ns, ItemSchema())()
+
+    with graph.flask.test_request_context():
+        dct = schema.dump(CursorPaginatedList(ns, CursorPage(["0"], 2), [dict(name="bar")])).data
+        cursor = encode_cursor(["0"])
+
+    assert_that(dct["cursor"], is_(equal_to(cursor)))
+    assert_that(dct["items"], is_(equal_to([dict(name="bar")])))
+
+
+class ItemSchema(Schema):
+    name = fields.String()
+
+
+def test_make_list_schema_for():
+    ns = Namespace(subject="foo")
+    item_schema = ItemSchema()
+
+    class LegacyPaginatedList(object):
+        pass
+
+    assert_that(
+        make_list_schema_for(LegacyPaginatedList, ns, item_schema),
+        is_(same_instance(make_paginated_list_schema(ns, item_schema))),
+    )
+    assert_that(
+        make_list_schema_for(CursorPaginatedList, ns, item_schema),
+        is_(same_instance(make_cursor_paginated_list_schema(ns, item_schema))),
+    )
+
+
+def test_make_paginated_list_schema_memoized():
+    ns = Namespace(subject="memoized")
+    item_schema = ItemSchema()
+
+    schema = make_paginated_list_schema(ns, item_schema)
+    other_version = Namespace(subject="memoized", version="v2")
+
+    assert_that(make_paginated_list_schema(other_version, item_schema), same_instance(schema))
+    assert_that(make_paginated_list_schema(ns, ItemSchema(only=("name",))), is_not(same_instance(schema)))
+    assert_that(make_paginated_list_schema(Namespace(subject="other"), item_schema), is_not(same_instance(schema)))
+    assert_that(make_paginated_list_schema(ns, ItemSchema), same_instance(make_paginated_list_schema(ns, ItemSchema)))
+
+
+class FlaggedItemSchema(ItemSchema):
+
+    def __init__(self, flag=False, **kwargs):
+        super(FlaggedItemSchema, self).__init__(**kwargs)
+        self.flag = flag
+
+    def get_attribute(self, attr, obj, default):
+        if attr == "name" and self.flag:
+            return "flagged"
+        return super(FlaggedItemSchema, self).get_attribute(attr, obj, default)
+
+
+def test_make_paginated_list_schema_configured_instances():
+    ns = Namespace(subject="configured")
+    graph = create_object_graph(name="example", testing=True)
+
+    @graph.route(ns.collection_path, Operation.Search, ns)
+    def search_foo():
+        pass
+
+    def dump(item_schema):
+        schema = make_paginated_list_schema(ns, item_schema)()
+        paginated_list = PaginatedList(ns, Page(0, 10), [dict(name="bar")], 1)
+        with graph.flask.test_request_context():
+            return schema.dump(paginated_list).data["items"]
+
+    assert_that(dump(FlaggedItemSchema()), is_(equal_to([dict(name="bar")])))
+    assert_that(dump(FlaggedItemSchema(flag=True)), is_(equal_to([dict(name="flagged")])))
+    assert_that(dump(ItemSchema()), is_(equal_to([dict(name="bar")])))
+    assert_that(dump(ItemSchema(extra=dict(kind="item"))), is_(equal_to([dict(name="bar", kind="item")])))
+
+
+def test_make_paginated_list_schema_with_context():
+    ns = Namespace(subject="memoized")
+    item_schema = ItemSchema(context=dict(foo="bar"))
+
+    schema = make_paginated_list_schema(ns, item_schema)
+
+    assert_that(make_paginated_list_schema(ns, item_schema), same_instance(schema))
+    assert_that(make_paginated_list_schema(ns, ItemSchema(context=dict(foo="bar"))), is_not(same_instance(schema)))
@@ -0,0 +1,118 @@
+"""
+URL template tests.
+
+"""
+from uuid import uuid4
+
+from flask import request, url_for
+from mock import patch
+from hamcrest import (
+    assert_that,
+    calling,
+    equal_to,
+    is_,
+    none,
+    not_none,
+    raises,
+)
+from six.moves.urllib.parse import urlencode, urljoin
+from werkzeug.routing import BuildError
+
+from microcosm.api import create_object_graph
+from microcosm_flask.linking import Link
+from microcosm_flask.namespaces import Namespace
+from microcosm_flask.operations import Operation
+from microcosm_flask.url_templates import build_href, URLTemplate
+
+
+def expected_href_for(ns, operation, qs=None, **kwargs):
+    """
+    Build an href the way `Namespace.href_for` did before templates.
+
+    """
+    url = urljoin(request.url_root, url_for(ns.endpoint_for(operation), _external=True, **kwargs))
+    qs_character = "?" if url.find("?") == -1 else "&"
+    return "{}{}".format(
+        url,
+        "{}{}".format(qs_character, urlencode(qs)) if qs else "",
+    )
+
+
+class TestURLTemplates(object):
+
+    def setup(self):
+        self.graph = create_object_graph(name="example", testing=True)
+        self.ns = Namespace(subject="foo")
+        self.relation_ns = Namespace(subject="foo", object_="bar")
+
+        @self.graph.route(self.ns.collection_path, Operation.Search, self.ns)
+        def search():
+            pass
+
+        @self.graph.route(self.ns.instance_path, Operation.Retrieve, self.ns)
+        def retrieve(foo_id):
+            pass
+
+        @self.graph.route("/foo/<uuid:foo_id>/bar/", Operation.SearchFor, self.relation_ns)
+        def search_for(foo_id):
+            pass
+
+    def assert_same_href(self, operation, ns, qs=None, **kwargs):
+        href = ns.href_for(operation, qs=qs, **kwargs)
+        assert_that(href, is_(equal_to(expected_href_for(ns, operation, qs=qs, **kwargs))))
+
+    def test_templates_apply(self):
+        with self.graph.flask.test_request_context():
+            assert_that(build_href("foo.search.v1", {}), is_(equal_to("http://localhost/api/foo")))
+            assert_that(build_href("foo.retrieve.v1", dict(foo_id="bar")), is_(not_none()))
+            assert_that(build_href("foo.search_for.bar.v1", dict(foo_id=uuid4())), is_(not_none()))
+
+    def test_templates_do_not_apply(self):
+        with self.graph.flask.test_request_context():
+            # extra arguments are encoded in the query string by url_for
+            assert_that(build_href("foo.search.v1", dict(offset=0)), is_(none()))
+            # missing arguments
+            assert_that(build_href("foo.retrieve.v1", dict()), is_(none()))
+            assert_that(build_href("foo.retrieve.v1", dict(foo_id=None)), is_(none()))
+            # path parameters
+            assert_that(build_href("foo.retrieve.v1", dict(foo_id="a;b")), is_(none()))
+            # unknown endpoints
+            assert_that(build_href("bar.search.v1", dict()), is_(none()))
+
+    def test_href_for_matches_url_for(self):
+        for base_url in ["http://localhost/", "https://example.com:8443/prefix/"]:
+            with self.graph.flask.test_request_context(base_url=base_url):
+                self.assert_same_href(Operation.Search, self.ns)
+                self.assert_same_href(Operation.Search, self.ns, qs=[("offset", 0), ("limit", 20)])
+                self.assert_same_href(Operation.Search, self.ns, offset=0)
+                self.assert_same_href(Operation.Search, self.ns, qs=dict(limit=20), offset=0)
+                self.assert_same_href(Operation.SearchFor, self.relation_ns, foo_id=uuid4())
+                for foo_id in ["bar", "b a/r", "b%a+r", u"bär", "a;b", ".", "..", "a.b", "{foo_id}"]:
+                    self.assert_same_href(Operation.Retrieve, self.ns, foo_id=foo_id)
+
+    def test_href_for_build_error(self):
+        with self.graph.flask.test_request_context():
+            assert_that(calling(self.ns.href_for).with_args(Operation.Retrieve), raises(BuildError))
+
+    def test_link_for_templated(self):
+        with self.graph.flask.test_request_context():
+            link = Link.for_(Operation.Retrieve, self.ns, allow_templates=True)
+
+        assert_that(link.href, is_(equal_to("http://localhost/api/foo/{foo_id}")))
+        assert_that(link.templated, is_(equal_to(True)))
+
+    def test_href_for_without_templates(self):
+        # e.g. a werkzeug version without the rule internals that templates are compiled from
+        assert_that(URLTemplate.for_rule(object()), is_(none()))
+
+        self.graph.route_registry.templates["foo.retrieve.v1"] = None
+        with self.graph.flask.test_request_context():
+            assert_that(build_href("foo.retrieve.v1", dict(foo_id="bar")), is_(none()))
+            self.assert_same_href(Operation.Retrieve, self.ns, foo_id="bar")
+
+    def test_href_for_without_request_context_stack(self):
+        with patch("microcosm_flask.url_templates._request_ctx_stack", None):
+            with self.graph.flask.test_request_context():
+                assert_that(build_href("foo.search.v1", {}), is_(none()))
+                self.assert_same_href(Operation.Search, self.ns)
+                self.assert_same_href(Operation.Retrieve, self.ns, foo_id="bar")
@@ -0,0 +1,149 @@
+"""
+Precomputed URL templates for link building.
+
+Building an href via `flask.url_for` searches werkzeug's URL map and re-quotes the rule's
+static text on every call, which adds up when every item in a page has links. Instead,
+routes registered via `graph.route` precompute a template of static text and path parameter
+slots; hrefs are then built by string substitution plus the current request's URL root.
+
+Templates only apply where substitution produces exactly what `url_for` would; in all other
+cases (e.g. extra arguments, missing arguments, url defaults) callers fall back to `url_for`.
+
+Templates are compiled from werkzeug's (private) rule internals, which `setup.py` pins to a
+known range of versions; if these internals are unavailable, templates are not used and all
+hrefs are built with `url_for`.
+
+"""
+from flask import current_app, request
+from six import text_type
+from six.moves.urllib.parse import urljoin
+from werkzeug.routing import ValidationError
+from werkzeug.urls import url_quote
+
+from microcosm_flask.caching import LRUCache
+
+
+try:
+    from flask import _request_ctx_stack
+except ImportError:
+    _request_ctx_stack = None
+
+
+ROUTE_REGISTRY = "route_registry"
+
+# href prefixes (e.g. "http://localhost/") by request url root and url adapter state
+URL_PREFIXES = LRUCache(maxsize=64)
+
+
+class URLTemplate(object):
+    """
+    A URL rule's path as a sequence of static text and path parameter slots.
+
+    """
+    def __init__(self, arguments, parts):
+        self.arguments = frozenset(arguments)
+        # a list of (converter, text) tuples; the converter is None for static text,
+        # otherwise the text is the name of the path parameter
+        self.parts = parts
+
+    @classmethod
+    def for_rule(cls, rule):
+        """
+        Compile the template for a (bound) werkzeug rule.
+
+        Returns None for rules that cannot be built by substitution.
+
+        """
+        trace = getattr(rule, "_trace", None)
+        converters = getattr(rule, "_converters", None)
+        if not trace or converters is None or trace[0] != (False, "|"):
+            # not supported by this werkzeug version or the rule has a subdomain/host part
+            return None
+        if rule.map.host_matching or rule.defaults or rule.build_only or rule.redirect_to:
+            return None
+
+        charset = rule.map.charset
+        parts = [
+            (converters[data], data) if is_dynamic else (None, url_quote(encode(data, charset), safe="/:|+"))
+            for is_dynamic, data in trace[1:]
+        ]
+        return cls(rule.arguments, parts)
+
+    def build(self, values):
+        """
+        Build a path from path parameter values.
+
+        Returns None if the values do not exactly match the path parameters.
+
+        """
+        if len(values) != len(self.arguments) or any(
+            key not in self.arguments or value is None
+            for key, value in values.items()
+        ):
+            return None
+
+        try:
+            return u"".join(
+                text if converter is None else converter.to_url(values[text])
+                for converter, text in self.parts
+            )
+        except ValidationError:
+            return None
+
+
+def encode(text, charset):
+    if isinstance(text, text_type):
+        return text.encode(charset)
+    return text
+
+
+def get_url_prefix(url_adapter):
+    """
+    Compute the href prefix (scheme, host, and script root) for paths built by a url adapter.
+
+    Equivalent to joining the external URL that `url_for` builds for an empty path
+    to the request's url root.
+
+    """
+    key = (request.url_root, url_adapter.url_scheme, url_adapter.server_name, url_adapter.script_name)
+    url_prefix = URL_PREFIXES.get(key)
+    if url_prefix is None:
+        url_prefix = urljoin(request.url_root, "{}//{}{}/".format(
+            url_adapter.url_scheme + ":" if url_adapter.url_scheme else "",
+            url_adapter.server_name,
+            url_adapter.script_name[:-1],
+        ))
+        URL_PREFIXES.set(key, url_prefix)
+    return url_prefix
+
+
+def build_href(endpoint, values):
+    """
+    Build an href for an endpoint from its precomputed template.
+
+    Equivalent to `urljoin(request.url_root, url_for(endpoint, _external=True, **values))`,
+    but returns None if the endpoint has no template or if the template does not apply.
+
+    """
+    registry = current_app.extensions.get(ROUTE_REGISTRY)
+    if registry is None or any(current_app.url_default_functions.values()):
+        return None
+
+    template = registry.templates.get(endpoint)
+    if template is None:
+        return None
+
+    if _request_ctx_stack is None:
+        return None
+
+    request_context = _request_ctx_stack.top
+    url_adapter = request_context.url_adapter if request_context is not None else None
+    if url_adapter is None:
+        return None
+
+    path = template.build(values)
+    # joining to the url root would split path parameters (";") from the path
+    if path is None or ";" in path:
+        return None
+
+    return get_url_prefix(url_adapter) + path.lstrip("/")
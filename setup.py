@@ -21,6 +21,7 @@ setup(
         "Flask-BasicAuth>=0.2.0",
         "flask-cors>=2.1.2",
         "Flask-UUID>=0.2",
+        "futures>=3.0.0; python_version < '3.0'",
         "marshmallow>=2.6.0",
         "microcosm>=0.12.0",
         "microcosm-logging>=0.12.0",
@@ -28,6 +29,8 @@ setup(
         "python-dateutil>=2.5.2",
         "PyYAML>=3.11",
         "rfc3986>=0.4.1",
+        # url templates depend on werkzeug's rule internals
+        "Werkzeug>=0.11,<2.2",
     ],
     setup_requires=[
         "nose>=1.3.6",
@@ -43,13 +46,16 @@ setup(
             "app = microcosm_flask.factories:configure_flask_app",
             "audit = microcosm_flask.audit:configure_audit_decorator",
             "basic_auth = microcosm_flask.basic_auth:configure_basic_auth_decorator",
+            "compression = microcosm_flask.compression:configure_compression",
             "discovery_convention = microcosm_flask.conventions.discovery:configure_discovery",
             "error_handlers = microcosm_flask.errors:configure_error_handlers",
             "flask = microcosm_flask.factories:configure_flask",
             "health_convention = microcosm_flask.conventions.health:configure_health",
+            "json_codec = microcosm_flask.json_codec:configure_json_codec",
             "port_forwarding = microcosm_flask.forwarding:configure_port_forwarding",
             "request_context = microcosm_flask.context:configure_request_context",
             "route = microcosm_flask.routing:configure_route_decorator",
+            "route_registry = microcosm_flask.conventions.registry:configure_route_registry",
             "swagger_convention = microcosm_flask.conventions.swagger:configure_swagger",
             "uuid = microcosm_flask.converters:configure_uuid",
         ],